@@ -1,7 +1,7 @@
 #!/bin/bash
 #
 # HelloHistory Deploy Script
-# Syncs code to Raspberry Pi and restarts the service
+# Deploys code and audio to the Raspberry Pi as a delta release and restarts the service
 #
 # Usage:
 #   ./deploy/deploy.sh              # Deploy to delmonte.local
@@ -38,21 +38,15 @@ echo "✓ Connected to ${PI_HOST}"
 # Step 2: Ensure remote directory exists
 echo ""
 echo "▶ Preparing remote directory..."
-ssh "${PI_USER}@${PI_HOST}" "mkdir -p ${REMOTE_PATH}/src ${REMOTE_PATH}/logs"
+ssh "${PI_USER}@${PI_HOST}" "mkdir -p ${REMOTE_PATH}/logs"
 echo "✓ Remote directory ready"
 
-# Step 3: Sync files
+# Step 3: Send changed files as a new release and switch to it
+# (content-addressed delta, atomic symlink swap; see scripts/deploy_release.py)
 echo ""
-echo "▶ Syncing files..."
-rsync -avz --delete \
-    --exclude='.git' \
-    --exclude='venv' \
-    --exclude='__pycache__' \
-    --exclude='*.pyc' \
-    --exclude='.DS_Store' \
-    --exclude='*.egg-info' \
-    --exclude='.amplifier' \
-    ./src/ "${PI_USER}@${PI_HOST}:${REMOTE_PATH}/src/"
+echo "▶ Deploying release..."
+python3 scripts/build_checksums.py > /dev/null
+python3 scripts/deploy_release.py --host "${PI_USER}@${PI_HOST}" --root "${REMOTE_PATH}"
 
 # Also sync deploy files (for service management)
 rsync -avz \
@@ -28,8 +28,11 @@ echo ""
 echo "▶ Installing dependencies..."
 sudo apt install -y \
     python3-pip \
+    python3-numpy \
     python3-pygame \
     python3-rpi.gpio \
+    python3-alsaaudio \
+    mpg123 \
     alsa-utils \
     git
 echo "✓ Dependencies installed"
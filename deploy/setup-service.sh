@@ -15,13 +15,18 @@ Description=Del Monte Phone Player
 After=sound.target
 
 [Service]
-Type=simple
+# Started once the player sends READY=1 (it can answer a pickup)
+Type=notify
+NotifyAccess=main
+TimeoutStartSec=60
 User=pi
 Group=pi
 WorkingDirectory=/home/pi/delmonte
 ExecStart=/usr/bin/python3 /home/pi/delmonte/src/phone_player.py
 Restart=always
 RestartSec=5
+# Allow the decoded intro/chapter heads to be mlock()ed (see PCM_BUDGET_MB)
+LimitMEMLOCK=64M
 
 [Install]
 WantedBy=multi-user.target
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+HelloHistory - Audio QA
+
+Decodes every chapter (and the older copies in src/audio/backup) and
+checks what the listener actually hears: silence baked into the start and
+end of each file, long gaps mid-chapter, clipping, and loudness. All of
+the analysis is vectorised NumPy over short windows, so the whole program
+takes a few seconds, most of it spent in mpg123.
+
+    head / tail  - silence before the first and after the last window
+                   louder than --threshold (default -50 dBFS)
+    gap          - longest silent stretch between those two points
+    peak         - highest sample, dBFS
+    clipped      - samples at digital full scale
+    rms          - RMS over the non-silent part, dBFS
+    lufs         - integrated loudness (ITU-R BS.1770 K-weighting, gated)
+
+With --trim DIR, writes copies with the head and tail silence cut down to
+a short margin. Whole MPEG frames are dropped, so there is no re-encode;
+review the copies and move them over the originals by hand.
+
+With --write-gains, turns the chapters' loudness into per-chapter gains:
+each chapter's offset from the median loudness of the set, which the
+player applies at the mixer when the chapter starts. They go into the
+audio directory's tracks.json when it has one (the player picks them up
+without a restart), otherwise into TRACK_GAIN_DB in src/tracks.py.
+
+Usage:
+    python3 scripts/audio_qa.py
+    python3 scripts/audio_qa.py --json qa.json
+    python3 scripts/audio_qa.py --trim /tmp/hellohistory-trimmed
+    python3 scripts/audio_qa.py --no-backup --write-gains
+"""
+
+import re
+import sys
+import json
+import time
+import argparse
+import subprocess
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+from tracks import TRACK_MANIFEST, load_track_table
+from pcm_cache import PCM_RATE, PCM_CHANNELS, decode_pcm
+from mp3_frames import iter_frames, audio_start
+
+WINDOW_MS = 10  # Analysis window for RMS, peak and silence
+SILENCE_DBFS = -50.0  # Windows quieter than this count as silence
+CLIP_LEVEL = 32767 / 32768  # Full scale for 16-bit PCM
+HEAD_LIMIT_S = 0.3  # Flag more leading silence than this (adds to pickup delay)
+TAIL_LIMIT_S = 1.0  # Flag more trailing silence than this (adds to chapter gaps)
+GAP_LIMIT_S = 3.0  # Flag a mid-chapter silence longer than this
+KEEP_HEAD_MS = 50  # Silence left in place when trimming
+KEEP_TAIL_MS = 300
+MAX_GAIN_DB = 6.0  # Largest correction either way; beyond this, fix the file
+DECODE_WORKERS = 4
+TRACKS_MODULE = PROJECT_ROOT / "src" / "tracks.py"
+
+
+def decode(path):
+    """MP3 to float32 (frames, channels) in [-1, 1), at PCM_RATE."""
+    pcm = subprocess.run(decode_pcm(path), capture_output=True, check=True).stdout
+    samples = np.frombuffer(pcm, dtype="<i2").reshape(-1, PCM_CHANNELS)
+    return samples.astype(np.float32) / 32768.0
+
+
+def db(power):
+    """Power ratio to decibels, with silence clamped instead of -inf."""
+    return 10 * np.log10(np.maximum(power, 1e-12))
+
+
+def window_stats(x, rate, window_ms=WINDOW_MS):
+    """Per-window mean square (over channels) and absolute peak."""
+    size = rate * window_ms // 1000
+    count = len(x) // size
+    if count == 0:
+        return np.zeros(0), np.zeros(0)
+    windows = x[:count * size].reshape(count, size * x.shape[1])
+    power = np.einsum("ij,ij->i", windows, windows, dtype=np.float64) / windows.shape[1]
+    return power, np.abs(windows).max(axis=1)
+
+
+def runs(mask):
+    """(start, length) of every run of True in a 1-D boolean array."""
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    return starts, np.flatnonzero(edges == -1) - starts
+
+
+def biquad_response(b, a, w):
+    """Magnitude of a biquad at normalised angular frequencies w."""
+    z = np.exp(-1j * w)
+    return np.abs((b[0] + b[1] * z + b[2] * z * z) / (a[0] + a[1] * z + a[2] * z * z))
+
+
+def k_weighting(rate, w):
+    """
+    Magnitude of the BS.1770 K-weighting filter (high shelf, then high
+    pass), with the published 48 kHz coefficients re-derived for `rate`.
+    """
+    k = np.tan(np.pi * 1681.974450955533 / rate)
+    q = 0.7071752369554196
+    vh = 10 ** (3.999843853973347 / 20)
+    vb = vh ** 0.4996667741545416
+    shelf = biquad_response((vh + vb * k / q + k * k, 2 * (k * k - vh), vh - vb * k / q + k * k),
+                            (1 + k / q + k * k, 2 * (k * k - 1), 1 - k / q + k * k), w)
+    k = np.tan(np.pi * 38.13547087602444 / rate)
+    q = 0.5003270373238773
+    a0 = 1 + k / q + k * k  # The spec leaves this stage's numerator unnormalised
+    high_pass = biquad_response((a0, -2 * a0, a0), (a0, 2 * (k * k - 1), 1 - k / q + k * k), w)
+    return shelf * high_pass
+
+
+def integrated_loudness(x, rate):
+    """
+    Gated integrated loudness in LUFS. Only energy matters, so instead of
+    running the K-weighting filter over the signal, each 100 ms slice's
+    spectrum is weighted by the filter's power response and summed
+    (Parseval). 400 ms blocks with 75% overlap are then gated at -70 LUFS
+    absolute and -10 LU relative.
+    """
+    hop = rate // 10  # 100 ms
+    count = len(x) // hop
+    if count < 4:
+        return float("-inf")
+    spectra = np.fft.rfft(x[:count * hop].reshape(count, hop, -1), axis=1)
+    bins = spectra.shape[1]
+    weights = k_weighting(rate, np.pi * np.arange(bins) / (hop / 2)) ** 2
+    weights[1:bins - (hop % 2 == 0)] *= 2  # Negative frequencies, folded in by rfft
+    power = spectra.real ** 2 + spectra.imag ** 2
+    quarters = (power * weights[:, None]).sum(axis=(1, 2)) / hop ** 2  # Mean square, channels summed
+    blocks = np.convolve(quarters, np.ones(4) / 4, mode="valid")  # 400 ms, 100 ms hop
+    blocks = blocks[-0.691 + db(blocks) > -70]
+    if len(blocks) == 0:
+        return float("-inf")
+    relative = -0.691 + db(blocks.mean()) - 10
+    blocks = blocks[-0.691 + db(blocks) > relative]
+    return float(-0.691 + db(blocks.mean()))
+
+
+def analyse(x, rate=PCM_RATE, threshold=SILENCE_DBFS):
+    """QA figures for one decoded track (see module docstring)."""
+    window = WINDOW_MS / 1000
+    power, peaks = window_stats(x, rate)
+    loud = np.flatnonzero(db(power) > threshold)
+    duration = len(x) / rate
+    result = {
+        "duration": duration,
+        "peak_dbfs": float(20 * np.log10(max(float(peaks.max(initial=0)), 1e-6))),
+        "clipped": int(np.count_nonzero(np.abs(x) >= CLIP_LEVEL)),
+    }
+    if len(loud) == 0:
+        return {**result, "head": duration, "tail": duration, "gap": 0.0,
+                "rms_dbfs": float("-inf"), "lufs": float("-inf")}
+    first, last = loud[0], loud[-1] + 1
+    _, lengths = runs(db(power[first:last]) <= threshold)
+    start, end = first * rate * WINDOW_MS // 1000, last * rate * WINDOW_MS // 1000
+    return {
+        **result,
+        "head": float(first * window),
+        "tail": float(duration - last * window),
+        "gap": float(lengths.max(initial=0) * window),
+        "rms_dbfs": float(db(power[first:last].mean())),
+        "lufs": integrated_loudness(x[start:end], rate),
+    }
+
+
+def flags(stats):
+    found = []
+    if stats["head"] > HEAD_LIMIT_S:
+        found.append("head")
+    if stats["tail"] > TAIL_LIMIT_S:
+        found.append("tail")
+    if stats["gap"] > GAP_LIMIT_S:
+        found.append("gap")
+    if stats["clipped"]:
+        found.append("clip")
+    return found
+
+
+def trim(source, target, head, tail):
+    """
+    Copy source to target without the whole MPEG frames that fall inside
+    the head and tail silence (less the keep margins). One extra frame is
+    kept before the cut so the first audible frame still has its bit
+    reservoir. Returns (frames_dropped_at_head, frames_dropped_at_tail).
+    """
+    data = source.read_bytes()
+    frames = list(iter_frames(data))
+    ends = np.cumsum([frame.samples / frame.sample_rate for frame in frames])
+    cut_head = max(head - KEEP_HEAD_MS / 1000, 0.0)
+    cut_tail = ends[-1] - max(tail - KEEP_TAIL_MS / 1000, 0.0)
+    first = max(int(np.searchsorted(ends, cut_head, side="right")) - 1, 0)
+    last = int(np.searchsorted(ends, cut_tail, side="left")) + 1
+    kept = frames[first:last]
+    body = b"".join(data[f.offset:f.offset + f.size] for f in kept)
+    tmp = target.with_suffix(".tmp")
+    tmp.write_bytes(data[:audio_start(data)] + body)
+    tmp.replace(target)
+    return first, len(frames) - last
+
+
+def chapter_gains(loudness):
+    """Gain per chapter in dB that brings each one to the median loudness."""
+    values = [lufs for lufs in loudness.values() if np.isfinite(lufs)]
+    if not values:
+        return {name: 0.0 for name in loudness}
+    reference = float(np.median(values))
+    return {name: round(float(np.clip(reference - lufs, -MAX_GAIN_DB, MAX_GAIN_DB)), 1)
+            if np.isfinite(lufs) else 0.0
+            for name, lufs in loudness.items()}
+
+
+def write_manifest_gains(gains, path):
+    """Replace the gains in a tracks.json, keeping the rest of it."""
+    data = json.loads(path.read_text())
+    data["gains"] = gains
+    temp = path.with_name(path.name + ".tmp")
+    temp.write_text(json.dumps(data, indent=2) + "\n")
+    temp.replace(path)  # One rename, so the player never reads half a file
+
+
+def write_gains(gains, path=TRACKS_MODULE):
+    """Replace the TRACK_GAIN_DB table in tracks.py."""
+    lines = "".join(f'    "{name}": {gain},\n' for name, gain in gains.items())
+    source = path.read_text()
+    updated, count = re.subn(r"TRACK_GAIN_DB = \{\n.*?\n\}", f"TRACK_GAIN_DB = {{\n{lines}}}",
+                             source, flags=re.DOTALL)
+    if count != 1:
+        raise ValueError(f"no TRACK_GAIN_DB table in {path}")
+    path.write_text(updated)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check chapter audio for silence, gaps, clipping and loudness")
+    parser.add_argument("--audio-dir", type=Path, default=PROJECT_ROOT / "src" / "audio",
+                        help="Directory with the chapter MP3s (default: src/audio)")
+    parser.add_argument("--no-backup", action="store_true",
+                        help="Skip the copies in <audio-dir>/backup")
+    parser.add_argument("--threshold", type=float, default=SILENCE_DBFS,
+                        help=f"Silence threshold in dBFS (default: {SILENCE_DBFS})")
+    parser.add_argument("--json", type=Path, metavar="PATH",
+                        help="Also write the figures as JSON")
+    parser.add_argument("--trim", type=Path, metavar="DIR",
+                        help="Write copies with head/tail silence trimmed to DIR")
+    parser.add_argument("--write-gains", action="store_true",
+                        help="Store per-chapter gains in tracks.json or src/tracks.py (needs every chapter)")
+    args = parser.parse_args()
+
+    try:
+        tracks, _ = load_track_table(args.audio_dir)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    paths = [args.audio_dir / name for name in tracks if (args.audio_dir / name).exists()]
+    if not args.no_backup:
+        paths += sorted((args.audio_dir / "backup").glob("*.mp3"))
+    if not paths:
+        print(f"Error: no MP3s found in {args.audio_dir}")
+        sys.exit(1)
+
+    started = time.monotonic()
+    results = {}
+
+    def check(path):
+        return analyse(decode(path), threshold=args.threshold)
+
+    with ThreadPoolExecutor(max_workers=DECODE_WORKERS) as pool:
+        futures = {path: pool.submit(check, path) for path in paths}
+        for path, future in futures.items():
+            try:
+                results[path] = future.result()
+            except (OSError, subprocess.CalledProcessError) as e:
+                print(f"  ✗ {path.relative_to(args.audio_dir)}: could not decode: {e}")
+    elapsed = time.monotonic() - started
+
+    print(f"\n{'Track':<28} {'Length':>7} {'Head':>6} {'Tail':>6} {'Gap':>6} "
+          f"{'Peak':>6} {'Clip':>6} {'RMS':>6} {'LUFS':>6}  Flags")
+    for path, stats in results.items():
+        print(f"{str(path.relative_to(args.audio_dir)):<28} {stats['duration']:>7.1f} "
+              f"{stats['head']:>6.2f} {stats['tail']:>6.2f} {stats['gap']:>6.2f} "
+              f"{stats['peak_dbfs']:>6.1f} {stats['clipped']:>6} {stats['rms_dbfs']:>6.1f} "
+              f"{stats['lufs']:>6.1f}  {' '.join(flags(stats))}")
+    total = sum(stats["duration"] for stats in results.values())
+    print(f"\n{total / 60:.1f} min of audio analysed in {elapsed:.1f}s")
+
+    if args.json:
+        report = {str(path.relative_to(args.audio_dir)): {**stats, "flags": flags(stats)}
+                  for path, stats in results.items()}
+        args.json.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"Report: {args.json}")
+
+    if args.write_gains:
+        loudness = {name: results[args.audio_dir / name]["lufs"]
+                    for name in tracks if args.audio_dir / name in results}
+        if len(loudness) != len(tracks):
+            print("Error: --write-gains needs every chapter decoded")
+            sys.exit(1)
+        gains = chapter_gains(loudness)
+        manifest = args.audio_dir / TRACK_MANIFEST
+        if manifest.exists():
+            write_manifest_gains(gains, manifest)
+        else:
+            manifest = TRACKS_MODULE
+            write_gains(gains)
+        print(f"\nChapter gains (dB) written to {manifest}:")
+        for name, gain in gains.items():
+            print(f"  {name:<22} {gain:+5.1f}")
+
+    if args.trim:
+        args.trim.mkdir(parents=True, exist_ok=True)
+        print(f"\nTrimmed copies in {args.trim}:")
+        for path, stats in results.items():
+            if path.parent != args.audio_dir or not ({"head", "tail"} & set(flags(stats))):
+                continue  # Only current chapters, and only where it matters
+            dropped = trim(path, args.trim / path.name, stats["head"], stats["tail"])
+            print(f"  ✓ {path.name:<22} -{dropped[0]} frames head, -{dropped[1]} frames tail")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+HelloHistory - MP3 vs Pre-Decoded Asset Benchmark
+
+Compares what the player's stream thread has to do per track when it
+decodes MP3 on the fly versus streaming a pre-decoded asset from a memory
+map (scripts/build_pcm_assets.py). For each track it reports:
+
+    first_audio_ms - play request to the first period of PCM in hand
+                     (decoder spawn + first read, or mmap + first slice)
+    cpu_pct        - CPU time per second of audio, in percent of one core
+    rss_mb         - peak resident memory of whoever produces the PCM
+
+The MP3 side needs mpg123 and the asset side needs built assets. Run it
+on the Pi for numbers that matter.
+
+Usage:
+    python3 scripts/bench_assets.py
+    python3 scripts/bench_assets.py --tracks 3
+"""
+
+import sys
+import time
+import argparse
+import resource
+import subprocess
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+from tracks import TRACKS
+from pcm_cache import PCM_RATE, PCM_FRAME_BYTES, PERIOD_FRAMES, decode_pcm
+from pcm_assets import load_assets
+
+
+def rss_mb():
+    """Current resident set size of this process."""
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def bench_mp3(path):
+    before = resource.getrusage(resource.RUSAGE_CHILDREN)
+    started = time.perf_counter()
+    decoder = subprocess.Popen(decode_pcm(path), stdout=subprocess.PIPE,
+                               stderr=subprocess.DEVNULL)
+    step = PERIOD_FRAMES * PCM_FRAME_BYTES
+    first = decoder.stdout.read(step)
+    first_ms = (time.perf_counter() - started) * 1000
+    total = len(first)
+    while data := decoder.stdout.read(step):
+        total += len(data)
+    decoder.wait()
+    after = resource.getrusage(resource.RUSAGE_CHILDREN)
+    cpu = (after.ru_utime - before.ru_utime) + (after.ru_stime - before.ru_stime)
+    seconds = total / PCM_FRAME_BYTES / PCM_RATE
+    # ru_maxrss is the largest child so far, which is the decoder here
+    return first_ms, cpu / seconds * 100, after.ru_maxrss / 1024
+
+
+def bench_asset(assets, name):
+    rss_before = rss_mb()
+    cpu_before = time.process_time()
+    started = time.perf_counter()
+    view = assets.view(name)
+    step = PERIOD_FRAMES * assets.frame_bytes
+    first = bytes(view[:step])
+    first_ms = (time.perf_counter() - started) * 1000
+    peak = rss_mb()
+    for start in range(len(first), len(view), step):
+        bytes(view[start:start + step])  # What pcm.write() reads, period by period
+        if start % (step * 4096) == 0:
+            peak = max(peak, rss_mb())
+    cpu = time.process_time() - cpu_before
+    seconds = len(view) / assets.frame_bytes / assets.rate
+    view.release()
+    return first_ms, cpu / seconds * 100, max(peak, rss_mb()) - rss_before
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare MP3 decoding with pre-decoded PCM assets")
+    parser.add_argument("--audio-dir", type=Path, default=PROJECT_ROOT / "src" / "audio",
+                        help="Directory with the chapter MP3s (default: src/audio)")
+    parser.add_argument("--tracks", type=int, default=len(TRACKS),
+                        help="How many tracks to measure (default: all)")
+    args = parser.parse_args()
+
+    names = TRACKS[:args.tracks]
+    assets = load_assets(args.audio_dir, names)
+    if assets is None:
+        print("No up-to-date PCM assets (run scripts/build_pcm_assets.py); measuring MP3 only")
+
+    print(f"\n{'Track':<20} {'Source':<6} {'first ms':>9} {'cpu %':>7} {'rss MB':>7}")
+    for name in names:
+        rows = []
+        try:
+            rows.append(("mp3", bench_mp3(args.audio_dir / name)))
+        except OSError as e:
+            print(f"{name:<20} mp3    skipped: {e}")
+        if assets:
+            rows.append(("pcm", bench_asset(assets, name)))
+        for source, (first_ms, cpu_pct, rss) in rows:
+            print(f"{name:<20} {source:<6} {first_ms:>9.2f} {cpu_pct:>7.2f} {rss:>7.1f}")
+    if assets:
+        print("\npcm rss is page cache mapped into the player (reclaimable), not heap")
+        assets.close()
+
+
+if __name__ == "__main__":
+    main()
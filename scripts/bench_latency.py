@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+HelloHistory - Hook Latency Benchmark
+
+Runs the production PhonePlayer loop against a simulated hook switch and
+audio sink (see fake_hardware.py) and measures how quickly it responds:
+
+    hook_to_sound     - pickup edge to first non-silent frame at the sink
+    hangup_to_silence - hang-up edge to first silent frame at the sink
+    track_gap         - last sound of one chapter to first sound of the next
+    repickup_to_sound - as hook_to_sound, for a pickup shortly after hang-up
+
+Results (p50/p95/p99/max in ms) are printed and written as JSON so runs
+can be compared between deploys.
+
+Usage:
+    python3 scripts/bench_latency.py
+    python3 scripts/bench_latency.py --cycles 5000 --output bench.json
+"""
+
+import json
+import time
+import random
+import logging
+import argparse
+import platform
+import threading
+import subprocess
+from pathlib import Path
+
+from fake_hardware import PROJECT_ROOT, FakeChip, FakeSink, install_fake_gpiod
+
+install_fake_gpiod()
+import phone_player
+from phone_player import PhonePlayer
+
+
+class BenchPhonePlayer(PhonePlayer):
+    """PhonePlayer that leaves the host's mixer alone."""
+
+    def set_volume(self, percent):
+        pass
+
+
+def percentiles(samples):
+    """Summary stats in ms for a list of ms samples."""
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+
+    def pick(p):
+        return round(ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))], 3)
+
+    return {
+        "count": len(ordered),
+        "p50": pick(50),
+        "p95": pick(95),
+        "p99": pick(99),
+        "max": round(ordered[-1], 3),
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True, cwd=PROJECT_ROOT,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(args):
+    rng = random.Random(args.seed)
+    phone_player.RESUME_WINDOW_S = args.resume_window
+    chip = FakeChip()
+    sink = FakeSink(track_seconds=args.track_seconds, period_s=args.period_ms / 1000)
+    player = BenchPhonePlayer(chip=chip, backend=sink, mixer=sink)
+    line = chip.request
+    hook = phone_player.HOOK_LINE
+    # Edges closer than the debounce window are deliberately dropped
+    spacing = player.debounce_ns / 1e9 + 0.005
+
+    loop = threading.Thread(target=player.run, daemon=True)
+    loop.start()
+
+    samples = {
+        "hook_to_sound": [],
+        "hangup_to_silence": [],
+        "repickup_to_sound": [],
+    }
+    missed = 0
+
+    for cycle in range(args.cycles):
+        bounce = args.bounce if rng.random() < 0.5 else 0
+
+        edge = line.set_level(hook, True, bounce=bounce)
+        sound = sink.wait_for("sound", edge)
+        if sound is None:
+            missed += 1
+        else:
+            samples["hook_to_sound"].append((sound - edge) / 1e6)
+
+        # Every few cycles stay on the line long enough to cross chapters
+        if cycle % args.gap_every == 0:
+            time.sleep(args.track_seconds * 2.5)
+        else:
+            time.sleep(spacing)
+
+        edge = line.set_level(hook, False, bounce=bounce)
+        silence = sink.wait_for("silence", edge)
+        if silence is not None:
+            samples["hangup_to_silence"].append((silence - edge) / 1e6)
+        time.sleep(spacing)
+
+        if cycle % args.repickup_every == 0:
+            # Rapid re-pickup right after the debounce window
+            edge = line.set_level(hook, True)
+            sound = sink.wait_for("sound", edge)
+            if sound is None:
+                missed += 1
+            else:
+                samples["repickup_to_sound"].append((sound - edge) / 1e6)
+            time.sleep(spacing)
+            line.set_level(hook, False)
+            time.sleep(spacing)
+
+    player.running = False
+    line.wake()
+    loop.join(timeout=1)
+    sink.cleanup()
+
+    results = {name: percentiles(values) for name, values in samples.items()}
+    results["track_gap"] = percentiles(sink.gaps_ms)
+    results["missed_pickups"] = missed
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure PhonePlayer hook and track latency on simulated hardware"
+    )
+    parser.add_argument("--cycles", type=int, default=1000,
+                        help="Pickup/hang-up cycles to run (default: 1000)")
+    parser.add_argument("--track-seconds", type=float, default=0.05,
+                        help="Simulated length of every track (default: 0.05)")
+    parser.add_argument("--period-ms", type=float, default=2.0,
+                        help="Sink render period in ms (default: 2.0)")
+    parser.add_argument("--bounce", type=int, default=2,
+                        help="Extra contact-bounce toggles on half the edges (default: 2)")
+    parser.add_argument("--gap-every", type=int, default=10,
+                        help="Let tracks run into the next chapter every N cycles")
+    parser.add_argument("--repickup-every", type=int, default=5,
+                        help="Add a rapid re-pickup every N cycles")
+    parser.add_argument("--resume-window", type=float, default=0,
+                        help="Player resume-on-pickup window in seconds (default: 0, off)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", type=Path,
+                        default=PROJECT_ROOT / "bench_results.json",
+                        help="JSON results file (default: bench_results.json)")
+    args = parser.parse_args()
+
+    logging.getLogger("phone").setLevel(logging.ERROR)
+
+    print(f"Running {args.cycles} hook cycles...")
+    started = time.monotonic()
+    results = run_benchmark(args)
+    elapsed = time.monotonic() - started
+
+    print(f"\n{'Metric':<20} {'count':>6} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+    for name, stats in results.items():
+        if isinstance(stats, dict) and stats.get("count"):
+            print(f"{name:<20} {stats['count']:>6} {stats['p50']:>8.2f} "
+                  f"{stats['p95']:>8.2f} {stats['p99']:>8.2f} {stats['max']:>8.2f}")
+    print(f"Missed pickups: {results['missed_pickups']}")
+    print(f"Elapsed: {elapsed:.1f}s")
+
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "git_revision": git_revision(),
+        "host": platform.node(),
+        "python": platform.python_version(),
+        "config": {k: str(v) if isinstance(v, Path) else v for k, v in vars(args).items()},
+        "results_ms": results,
+    }
+    args.output.write_text(json.dumps(report, indent=2) + "\n")
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+HelloHistory - Logging Overhead Benchmark
+
+Fires a burst of player-style log events and compares the old synchronous
+FileHandler + StreamHandler setup with the queued, batching pipeline in
+src/log_pipeline.py. Reports, per mode:
+
+    call latency - time spent inside log.info() on the calling thread
+    throughput   - events per second the caller could issue
+    drain        - time from the last call until everything is on disk
+    writes       - write() calls that reached the file
+
+--stall-ms adds a delay to every file write to mimic a slow SD card.
+
+Usage:
+    python3 scripts/bench_logging.py
+    python3 scripts/bench_logging.py --events 20000 --stall-ms 5
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+import tempfile
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+import log_pipeline
+from log_pipeline import LogPipeline, BatchingFileHandler
+
+FORMAT = "%(asctime)s - %(message)s"
+
+
+class SlowFile:
+    """File wrapper that sleeps on every write, like a busy SD card."""
+
+    def __init__(self, stream, stall_s):
+        self.stream = stream
+        self.stall_s = stall_s
+        self.writes = 0
+
+    def write(self, data):
+        self.writes += 1
+        if self.stall_s:
+            time.sleep(self.stall_s)
+        return self.stream.write(data)
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+class SlowFileHandler(logging.FileHandler):
+    def __init__(self, path, stall_s):
+        self.stall_s = stall_s
+        super().__init__(path)
+
+    def _open(self):
+        return SlowFile(super()._open(), self.stall_s)
+
+
+class SlowBatchingFileHandler(BatchingFileHandler):
+    def __init__(self, path, stall_s):
+        self.stall_s = stall_s
+        super().__init__(path)
+
+    def open(self):
+        super().open()
+        self.stream = SlowFile(self.stream, self.stall_s)
+
+
+def percentiles(samples):
+    ordered = sorted(samples)
+
+    def pick(p):
+        return round(ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))], 4)
+
+    return {"p50": pick(50), "p99": pick(99), "max": round(ordered[-1], 4)}
+
+
+def burst(logger, events):
+    """Log events as fast as possible; returns per-call latencies in ms."""
+    latencies = []
+    for n in range(events):
+        started = time.perf_counter_ns()
+        if n % 4 == 0:
+            logger.info("Handset LIFTED")
+        elif n % 4 == 1:
+            logger.info(f"Pickup latency: {n % 7 + 0.3:.1f} ms (worst of last 100: 4.2 ms)")
+        elif n % 4 == 2:
+            logger.info(f"Playing: {n % 8:02d}_chapter.mp3 (story at {n * 0.1:.1f}s)")
+        else:
+            logger.info("Handset HUNG UP")
+        latencies.append((time.perf_counter_ns() - started) / 1e6)
+    return latencies
+
+
+def run_mode(mode, path, args):
+    logger = logging.getLogger(f"bench.{mode}")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    journal = logging.StreamHandler(open(os.devnull, "w"))
+    stall_s = args.stall_ms / 1000
+
+    if mode == "sync":
+        file_handler = SlowFileHandler(path, stall_s)
+        handlers = [file_handler, journal]
+        for handler in handlers:
+            handler.setFormatter(logging.Formatter(FORMAT))
+            logger.addHandler(handler)
+        pipeline = None
+    else:
+        file_handler = SlowBatchingFileHandler(path, stall_s)
+        handlers = [file_handler, journal]
+        for handler in handlers:
+            handler.setFormatter(logging.Formatter(FORMAT))
+        pipeline = LogPipeline(handlers, flush_interval=args.flush_s)
+        logger.addHandler(pipeline.handler)
+        pipeline.start()
+
+    started = time.perf_counter()
+    latencies = burst(logger, args.events)
+    issued = time.perf_counter()
+    stream = file_handler.stream
+    if pipeline:
+        pipeline.stop()
+    else:
+        for handler in handlers:
+            handler.close()
+    drained = time.perf_counter()
+
+    lines = sum(1 for _ in open(path))
+    return {
+        "call_ms": percentiles(latencies),
+        "events_per_s": round(args.events / (issued - started)),
+        "drain_s": round(drained - issued, 3),
+        "writes": stream.writes,
+        "lines": lines,
+        "dropped": pipeline.handler.dropped if pipeline else 0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare synchronous and queued logging under a burst of events"
+    )
+    parser.add_argument("--events", type=int, default=5000,
+                        help="Log events in the burst (default: 5000)")
+    parser.add_argument("--stall-ms", type=float, default=0.0,
+                        help="Delay added to every file write (default: 0)")
+    parser.add_argument("--flush-s", type=float, default=log_pipeline.FLUSH_INTERVAL_S,
+                        help="Pipeline flush interval in seconds")
+    args = parser.parse_args()
+
+    print(f"Logging {args.events} events per mode"
+          + (f", {args.stall_ms} ms per file write" if args.stall_ms else ""))
+    with tempfile.TemporaryDirectory() as tmp:
+        results = {mode: run_mode(mode, Path(tmp) / f"{mode}.log", args)
+                   for mode in ("sync", "queued")}
+
+    print(f"\n{'Mode':<8} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} "
+          f"{'events/s':>10} {'drain s':>8} {'writes':>7} {'lines':>7} {'dropped':>8}")
+    for mode, r in results.items():
+        call = r["call_ms"]
+        print(f"{mode:<8} {call['p50']:>8.4f} {call['p99']:>8.4f} {call['max']:>8.3f} "
+              f"{r['events_per_s']:>10} {r['drain_s']:>8.3f} {r['writes']:>7} "
+              f"{r['lines']:>7} {r['dropped']:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+HelloHistory - Metrics Overhead Benchmark
+
+Measures what the runtime metrics (src/metrics.py) cost the player:
+
+    per call      - ns spent in Counter.inc() and Histogram.observe()
+    allocation    - bytes still allocated after a burst of updates, and
+                    the peak while it ran (tracemalloc)
+    player loop   - simulated-time runs of the real PhonePlayer with the
+                    metrics live and with every update stubbed out
+    export        - time to render and atomically write the textfile,
+                    and its size
+
+Usage:
+    python3 scripts/bench_metrics.py
+    python3 scripts/bench_metrics.py --calls 1000000 --hours 500
+"""
+
+import os
+import time
+import random
+import logging
+import argparse
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+from simulate import PROJECT_ROOT, Simulation, mp3_seconds, random_trace
+import metrics
+from metrics import REGISTRY, Counter, Histogram
+from tracks import TRACKS
+
+
+def per_call_ns(update, calls):
+    started = time.perf_counter_ns()
+    for _ in range(calls):
+        update()
+    return (time.perf_counter_ns() - started) / calls
+
+
+def empty_loop_ns(calls):
+    started = time.perf_counter_ns()
+    for _ in range(calls):
+        pass
+    return (time.perf_counter_ns() - started) / calls
+
+
+def allocation(calls):
+    """(bytes held after, peak bytes during) a burst of metric updates."""
+    counter = Counter("bench_total", "")
+    histogram = Histogram("bench_seconds", "", metrics.LATENCY_BUCKETS)
+    value = 0.0123
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    for _ in range(calls):
+        counter.inc()
+        histogram.observe(value)
+    after, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return after - before, peak - before
+
+
+def player_run(trace, audio_dir, live):
+    """Wall seconds and steps of a simulated run, with metric updates live or stubbed."""
+    saved = Counter.inc, Histogram.observe
+    if not live:
+        Counter.inc = lambda self, amount=1: None
+        Histogram.observe = lambda self, value: None
+    sim = Simulation(trace, audio_dir)
+    try:
+        wall_s = sim.run()
+    finally:
+        Counter.inc, Histogram.observe = saved
+        logging.getLogger("phone").removeHandler(sim.counter)
+    return wall_s, sim.steps
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the cost of the player's runtime metrics")
+    parser.add_argument("--calls", type=int, default=200_000, help="Updates per micro-benchmark")
+    parser.add_argument("--hours", type=float, default=200.0, help="Simulated visitors per player run")
+    parser.add_argument("--runs", type=int, default=5, help="Player runs per mode (best is kept)")
+    args = parser.parse_args()
+
+    counter = Counter("bench_total", "")
+    histogram = Histogram("bench_seconds", "", metrics.LATENCY_BUCKETS)
+    baseline = empty_loop_ns(args.calls)
+    print(f"Per call (loop overhead of {baseline:.0f} ns removed):")
+    print(f"  Counter.inc        {per_call_ns(counter.inc, args.calls) - baseline:6.0f} ns")
+    print(f"  Histogram.observe  {per_call_ns(lambda: histogram.observe(0.0123), args.calls) - baseline:6.0f} ns")
+
+    held, peak = allocation(args.calls)
+    print(f"\nAllocation over {args.calls} updates: {held} bytes held, {peak} bytes peak")
+
+    audio_dir = PROJECT_ROOT / "src" / "audio"
+    program_s = sum(mp3_seconds(str(audio_dir / track)) for track in TRACKS)
+    trace = random_trace(random.Random(1), args.hours, program_s)
+    print(f"\nPlayer loop, {args.hours:g} h of simulated visitors, best of {args.runs}:")
+    runs = {False: [], True: []}
+    for _ in range(args.runs):
+        for live in runs:  # Interleaved, so drift hits both modes alike
+            runs[live].append(player_run(trace, audio_dir, live))
+    results = {}
+    for live, found in runs.items():
+        wall_s, steps = min(found)
+        results[live] = wall_s / steps * 1e6
+        print(f"  {'metrics live' if live else 'metrics stubbed':<16} {results[live]:7.2f} µs/step "
+              f"({steps} steps)")
+    print(f"  Overhead: {results[True] - results[False]:+.2f} µs/step")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "hellohistory.prom"
+        started = time.perf_counter()
+        REGISTRY.write(path)
+        export_ms = (time.perf_counter() - started) * 1000
+        print(f"\nExport: {len(REGISTRY.metrics)} metrics, {os.path.getsize(path)} bytes "
+              f"in {export_ms:.2f} ms (every {metrics.EXPORT_INTERVAL_S:.0f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+HelloHistory - Startup Time Benchmark
+
+Starts the player in a fresh interpreter, the way systemd does after a
+power cut, and times how long it takes to report READY=1 on a private
+NOTIFY_SOCKET. Each run also reports the player's own startup phases:
+
+    python  - interpreter start and imports, up to PhonePlayer()
+    gpio    - hook line request
+    story   - loading the story stream seek table
+    audio   - backend setup (PCM heads, decoder, device prewarm)
+    dial    - rotary dial line request
+    volume  - waiting for the volume thread (runs alongside gpio..dial)
+    run     - from construction to READY=1
+
+Hardware is simulated (see fake_hardware.py) unless --real-audio is
+given, in which case the production audio backend is built (on the Pi).
+
+Usage:
+    python3 scripts/bench_startup.py
+    python3 scripts/bench_startup.py --runs 20 --real-audio
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import tempfile
+import threading
+import subprocess
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+
+def child(real_audio):
+    """Runs in the spawned interpreter: start the player, print its phases."""
+    from fake_hardware import FakeChip, FakeSink, install_fake_gpiod
+
+    install_fake_gpiod()
+    import phone_player
+
+    ready = threading.Event()
+
+    class StartupPhonePlayer(phone_player.PhonePlayer):
+        def set_volume(self, percent):
+            pass
+
+        def notify_ready(self):
+            super().notify_ready()
+            ready.set()
+
+    sink = None if real_audio else FakeSink()
+    player = StartupPhonePlayer(chip=FakeChip(), backend=sink, mixer=sink)
+    threading.Thread(target=player.run, daemon=True).start()
+    ready.wait()
+    print(json.dumps(player.startup_ms))
+    sys.stdout.flush()
+    os._exit(0)
+
+
+def run_once(real_audio, timeout):
+    """Spawn one player; returns (spawn_to_ready_ms, phases) or None."""
+    with tempfile.TemporaryDirectory() as tmp:
+        address = str(Path(tmp) / "notify")
+        with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sock:
+            sock.bind(address)
+            sock.settimeout(timeout)
+            cmd = [sys.executable, __file__, "--child"]
+            if real_audio:
+                cmd.append("--real-audio")
+            started = time.monotonic()
+            process = subprocess.Popen(
+                cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+                env={**os.environ, "NOTIFY_SOCKET": address},
+            )
+            try:
+                while b"READY=1" not in sock.recv(4096):
+                    pass
+                ready_ms = (time.monotonic() - started) * 1000
+            except socket.timeout:
+                process.kill()
+                process.wait()
+                return None
+            output, _ = process.communicate(timeout=timeout)
+    return ready_ms, json.loads(output)
+
+
+def summary(samples):
+    ordered = sorted(samples)
+    return {
+        "p50": ordered[len(ordered) // 2],
+        "p95": ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))],
+        "max": ordered[-1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure phone player cold start to READY=1")
+    parser.add_argument("--runs", type=int, default=10, help="Player starts to time (default: 10)")
+    parser.add_argument("--real-audio", action="store_true",
+                        help="Build the production audio backend instead of a fake sink")
+    parser.add_argument("--timeout", type=float, default=60,
+                        help="Seconds to wait for READY=1 (default: 60)")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.real_audio)
+
+    print(f"Starting the player {args.runs} times...")
+    totals = []
+    phases = {}
+    for _ in range(args.runs):
+        result = run_once(args.real_audio, args.timeout)
+        if result is None:
+            print("  no READY=1 within timeout")
+            continue
+        ready_ms, startup = result
+        totals.append(ready_ms)
+        for name, ms in startup.items():
+            phases.setdefault(name, []).append(ms)
+
+    if not totals:
+        sys.exit(1)
+    print(f"\n{'Phase':<16} {'p50':>8} {'p95':>8} {'max':>8}  (ms)")
+    for name, samples in [*phases.items(), ("spawn_to_ready", totals)]:
+        stats = summary(samples)
+        print(f"{name:<16} {stats['p50']:>8.1f} {stats['p95']:>8.1f} {stats['max']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
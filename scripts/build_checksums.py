@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+HelloHistory - Build Audio Checksums
+
+Writes src/audio/checksums.json: the size and SHA-256 of every chapter,
+the story stream (if built) and the copies in src/audio/backup/. The
+player re-hashes the files on the Pi against it in the background and
+plays the backup copy of any chapter the SD card has corrupted. Deploy
+runs this, so the manifest always describes the audio being shipped.
+
+Usage:
+    python3 scripts/build_checksums.py
+    python3 scripts/build_checksums.py --check
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+from tracks import STORY_FILE, load_track_table
+from integrity import CHECKSUM_FILE, checked_names, load_manifest, verify_now, write_manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record checksums of the audio files")
+    parser.add_argument(
+        "--audio-dir",
+        type=Path,
+        default=PROJECT_ROOT / "src" / "audio",
+        help="Directory with the chapter MP3s (default: src/audio)"
+    )
+    parser.add_argument("--check", action="store_true",
+                        help="Verify the files against the existing manifest instead")
+    args = parser.parse_args()
+
+    try:
+        tracks, _ = load_track_table(args.audio_dir)
+    except ValueError as e:
+        print(f"✗ {e}")
+        sys.exit(1)
+    names = checked_names(args.audio_dir, tracks, STORY_FILE)
+    started = time.monotonic()
+    if args.check:
+        if load_manifest(args.audio_dir) is None:
+            print(f"✗ No {CHECKSUM_FILE} in {args.audio_dir}")
+            sys.exit(1)
+        failed = verify_now(args.audio_dir, names)
+        for name in names:
+            print(f"  {'✗' if name in failed else '✓'} {name}")
+        print(f"\n{len(names) - len(failed)} of {len(names)} files match "
+              f"({(time.monotonic() - started) * 1000:.0f} ms)")
+        sys.exit(1 if failed else 0)
+
+    files = write_manifest(args.audio_dir, names)
+    for name, entry in files.items():
+        print(f"  ✓ {name:<28} {entry['size']:>9} bytes  {entry['sha256'][:12]}")
+    print(f"\n{len(files)} checksums written to {args.audio_dir / CHECKSUM_FILE} "
+          f"({(time.monotonic() - started) * 1000:.0f} ms)")
+
+
+if __name__ == "__main__":
+    main()
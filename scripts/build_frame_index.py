@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+HelloHistory - Build MP3 Frame Indexes
+
+Writes a frame byte-offset index for every chapter (and the story stream,
+if built) into src/audio/.frames/, so the player can seek and resume with
+an O(1) lookup. Run after changing audio; deploy syncs the indexes along
+with the MP3s. The player rebuilds stale indexes in memory if needed.
+
+Usage:
+    python3 scripts/build_frame_index.py
+    python3 scripts/build_frame_index.py --audio-dir /path/to/audio
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+from tracks import STORY_FILE, load_track_table
+from frame_index import FrameIndex, index_path_for
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build MP3 frame indexes for seeking")
+    parser.add_argument(
+        "--audio-dir",
+        type=Path,
+        default=PROJECT_ROOT / "src" / "audio",
+        help="Directory with the chapter MP3s (default: src/audio)"
+    )
+    args = parser.parse_args()
+
+    try:
+        tracks, _ = load_track_table(args.audio_dir)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    files = [args.audio_dir / name for name in tracks + [STORY_FILE]]
+    for path in files:
+        if not path.exists():
+            if path.name != STORY_FILE:
+                print(f"  ✗ {path.name}: not found")
+            continue
+        started = time.monotonic()
+        index = FrameIndex.build(path)
+        index.save(index_path_for(path))
+        duration = index.seconds(len(index))
+        print(f"  ✓ {path.name:<22} {len(index):>6} frames  {duration:7.1f}s  "
+              f"({(time.monotonic() - started) * 1000:.0f} ms)")
+
+    print(f"\nIndexes written to {args.audio_dir / '.frames'}")
+
+
+if __name__ == "__main__":
+    main()
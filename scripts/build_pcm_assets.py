@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+HelloHistory - Build Pre-Decoded PCM Assets
+
+Decodes every chapter (and the story stream, if built) once and writes it
+as raw PCM in the audio adapter's native format to src/audio/pcm/, with a
+manifest of format, sizes and checksums (see src/pcm_assets.py). The
+player then streams these from a memory map instead of decoding MP3 and
+letting ALSA resample on every listen.
+
+Resampling is a Kaiser-windowed sinc polyphase filter and requantisation
+to 16 or 24 bits uses TPDF dither, both vectorised with NumPy. Decoding
+uses mpg123.
+
+The native format can be read from the USB adapter on the Pi (--probe)
+or given explicitly.
+
+Usage:
+    python3 scripts/build_pcm_assets.py --probe
+    python3 scripts/build_pcm_assets.py --rate 48000 --channels 2 --bits 16
+    python3 scripts/build_pcm_assets.py --verify
+"""
+
+import re
+import sys
+import json
+import time
+import hashlib
+import argparse
+import subprocess
+from math import gcd
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+from tracks import STORY_FILE, load_track_table
+from pcm_cache import PCM_RATE, PCM_CHANNELS, decode_pcm
+from pcm_assets import ASSET_DIR, MANIFEST, MANIFEST_FORMAT, SAMPLE_BYTES
+
+FORMATS = {16: "S16_LE", 24: "S24_3LE", 32: "S32_LE"}
+FILTER_TAPS = 48  # Sinc taps per output sample
+KAISER_BETA = 8.0
+BLOCK = 1 << 16  # Output frames resampled per vectorised block
+
+
+def decode(path):
+    """MP3 to float32 (frames, channels) in [-1, 1), at PCM_RATE."""
+    pcm = subprocess.run(decode_pcm(path), capture_output=True, check=True).stdout
+    samples = np.frombuffer(pcm, dtype="<i2").reshape(-1, PCM_CHANNELS)
+    return samples.astype(np.float32) / 32768.0
+
+
+def filter_bank(up, down, taps=FILTER_TAPS, beta=KAISER_BETA):
+    """Windowed-sinc coefficients for each of the `up` output phases."""
+    cutoff = min(1.0, up / down) * 0.96  # Just below the lower Nyquist
+    half = taps // 2
+    offsets = np.arange(-half + 1, half + 1)
+    phases = np.arange(up)[:, None] * down % up / up
+    t = offsets[None, :] - phases  # Distance from each tap to the output instant
+    window = np.i0(beta * np.sqrt(np.clip(1 - (t / half) ** 2, 0, None))) / np.i0(beta)
+    bank = cutoff * np.sinc(cutoff * t) * window
+    bank /= bank.sum(axis=1, keepdims=True)  # Unity gain at DC for every phase
+    return offsets, bank.astype(np.float32)
+
+
+def resample(x, src_rate, dst_rate):
+    """
+    Polyphase resampling of (frames, channels) float32. Output samples that
+    share a filter phase read input windows at a fixed stride, so each
+    phase is one strided matrix-vector product over a sliding window view.
+    """
+    if src_rate == dst_rate:
+        return x
+    g = gcd(src_rate, dst_rate)
+    up, down = dst_rate // g, src_rate // g
+    offsets, bank = filter_bank(up, down)
+    half = len(offsets) // 2
+    # windows[j] covers input samples j - half .. j + half - 1
+    padded = np.pad(x, ((half, half), (0, 0)), mode="edge")
+    windows = np.lib.stride_tricks.sliding_window_view(padded, len(offsets), axis=0)
+    out_frames = len(x) * up // down
+    out = np.empty((out_frames, x.shape[1]), dtype=np.float32)
+    for phase in range(min(up, out_frames)):
+        count = len(range(phase, out_frames, up))
+        first = phase * down // up + 1  # Window of this phase's first output
+        for k in range(0, count, BLOCK):
+            n = min(BLOCK, count - k)
+            sel = windows[first + k * down:first + (k + n - 1) * down + 1:down]
+            out[phase + k * up:phase + (k + n) * up:up] = sel @ bank[phase]
+    return out
+
+
+def remix(x, channels):
+    if x.shape[1] == channels:
+        return x
+    if channels == 1:
+        return x.mean(axis=1, keepdims=True)
+    return np.repeat(x[:, :1], channels, axis=1) if x.shape[1] == 1 else x[:, :channels]
+
+
+def quantize(x, bits, rng):
+    """Float to little-endian integer PCM bytes, with TPDF dither below 32 bits."""
+    scale = float(2 ** (bits - 1))
+    y = x.astype(np.float64) * scale
+    if bits < 32:
+        # Triangular dither, +/- 1 LSB, decorrelates requantisation error
+        y += rng.random(y.shape) - rng.random(y.shape)
+    y = np.clip(np.round(y), -scale, scale - 1).astype("<i4")
+    if bits == 16:
+        return y.astype("<i2").tobytes()
+    if bits == 24:
+        return y.view(np.uint8).reshape(-1, 4)[:, :3].tobytes()  # S24_3LE
+    return y.tobytes()
+
+
+def probe(card):
+    """(rate, channels, bits) the USB adapter runs at natively, from /proc/asound."""
+    text = Path(f"/proc/asound/card{card}/stream0").read_text()
+    playback = text.split("Capture:")[0]
+    fmt = re.search(r"Format: (S\d+)_?(\d?LE)", playback)
+    channels = re.search(r"Channels: (\d+)", playback)
+    rates = re.search(r"Rates: ([\d, ]+)", playback)
+    if not (fmt and channels and rates):
+        raise ValueError(f"card {card}: no playback format in stream0")
+    bits = int(fmt.group(1)[1:])
+    rate_list = [int(r) for r in rates.group(1).replace(" ", "").split(",") if r]
+    rate = 48000 if 48000 in rate_list else rate_list[0]
+    return rate, int(channels.group(1)), bits
+
+
+def sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def verify(out_dir):
+    """Re-hash every asset against the manifest. True if all match."""
+    manifest = json.loads((out_dir / MANIFEST).read_text())
+    ok = True
+    for name, entry in manifest["files"].items():
+        path = out_dir / entry["file"]
+        good = path.exists() and sha256(path) == entry["sha256"]
+        print(f"  {'✓' if good else '✗'} {name:<22} {entry['file']}")
+        ok = ok and good
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Transcode chapters to device-native raw PCM")
+    parser.add_argument("--audio-dir", type=Path, default=PROJECT_ROOT / "src" / "audio",
+                        help="Directory with the chapter MP3s (default: src/audio)")
+    parser.add_argument("--rate", type=int, default=48000,
+                        help="Output sample rate (default: 48000)")
+    parser.add_argument("--channels", type=int, default=2, choices=(1, 2),
+                        help="Output channels (default: 2)")
+    parser.add_argument("--bits", type=int, default=16, choices=sorted(FORMATS),
+                        help="Output bits per sample (default: 16)")
+    parser.add_argument("--probe", type=int, nargs="?", const=1, metavar="CARD",
+                        help="Read the native format from ALSA card N (default: 1)")
+    parser.add_argument("--verify", action="store_true",
+                        help="Check existing assets against the manifest checksums")
+    parser.add_argument("--seed", type=int, default=0, help="Dither noise seed")
+    args = parser.parse_args()
+
+    out_dir = args.audio_dir / ASSET_DIR
+    if args.verify:
+        sys.exit(0 if verify(out_dir) else 1)
+
+    if args.probe is not None:
+        try:
+            args.rate, args.channels, args.bits = probe(args.probe)
+        except (OSError, ValueError) as e:
+            print(f"Error: could not probe card {args.probe}: {e}")
+            sys.exit(1)
+        if args.bits not in FORMATS:
+            print(f"Error: unsupported native sample size {args.bits} bits")
+            sys.exit(1)
+    sample_format = FORMATS[args.bits]
+    try:
+        tracks, _ = load_track_table(args.audio_dir)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    print(f"Target: {args.rate} Hz, {args.channels} ch, {sample_format}\n")
+
+    out_dir.mkdir(exist_ok=True)
+    rng = np.random.default_rng(args.seed)
+    files = {}
+    for name in tracks + [STORY_FILE]:
+        source = args.audio_dir / name
+        if not source.exists():
+            if name != STORY_FILE:
+                print(f"  ✗ {name}: not found")
+            continue
+        started = time.monotonic()
+        try:
+            x = decode(source)
+        except (OSError, subprocess.CalledProcessError) as e:
+            print(f"  ✗ {name}: could not decode: {e}")
+            continue
+        data = quantize(remix(resample(x, PCM_RATE, args.rate), args.channels), args.bits, rng)
+
+        target = out_dir / (Path(name).stem + ".pcm")
+        tmp = target.with_suffix(".tmp")
+        tmp.write_bytes(data)
+        tmp.replace(target)
+        stat = source.stat()
+        frames = len(data) // (args.channels * SAMPLE_BYTES[sample_format])
+        files[name] = {
+            "file": target.name,
+            "frames": frames,
+            "bytes": len(data),
+            "sha256": hashlib.sha256(data).hexdigest(),
+            "source_size": stat.st_size,
+            "source_mtime_ns": stat.st_mtime_ns,
+        }
+        elapsed = time.monotonic() - started
+        print(f"  ✓ {name:<22} {frames / args.rate:7.1f}s  {len(data) / 1024 / 1024:6.1f} MB  "
+              f"({elapsed:.1f}s, {frames / args.rate / elapsed:.0f}x realtime)")
+
+    manifest = {
+        "format": MANIFEST_FORMAT,
+        "rate": args.rate,
+        "channels": args.channels,
+        "sample_format": sample_format,
+        "files": files,
+    }
+    (out_dir / MANIFEST).write_text(json.dumps(manifest, indent=2) + "\n")
+    print(f"\nManifest: {out_dir / MANIFEST}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+HelloHistory - Build Gapless Story Stream
+
+Joins the chapter MP3s in src/audio into one continuous story.mp3 plus a
+story.json seek table of chapter start offsets (bytes, frames, samples).
+Frames are copied as-is, so there is no re-encode and no quality loss.
+
+The player uses the stream automatically when story.json is present and
+newer than every chapter file; otherwise it plays chapters one by one.
+
+Usage:
+    python3 scripts/build_story_stream.py
+    python3 scripts/build_story_stream.py --audio-dir /path/to/audio
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+from tracks import STORY_FILE, STORY_INDEX, load_track_table
+from story_stream import build_story
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build the gapless story stream and chapter seek table"
+    )
+    parser.add_argument(
+        "--audio-dir",
+        type=Path,
+        default=PROJECT_ROOT / "src" / "audio",
+        help="Directory with the chapter MP3s (default: src/audio)"
+    )
+    args = parser.parse_args()
+
+    try:
+        tracks, _ = load_track_table(args.audio_dir)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    missing = [t for t in tracks if not (args.audio_dir / t).exists()]
+    if missing:
+        print(f"Error: missing chapter files: {missing}")
+        sys.exit(1)
+
+    try:
+        index = build_story(args.audio_dir, tracks, STORY_FILE, STORY_INDEX)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    rate = index["sample_rate"]
+    print(f"\n{'Ch':<4} {'Track':<22} {'Start':>8} {'Byte':>10} {'Frame':>7}")
+    for number, chapter in enumerate(index["chapters"]):
+        start = chapter["sample"] / rate
+        print(f"{number:<4} {chapter['track']:<22} "
+              f"{int(start // 60)}:{start % 60:05.2f} {chapter['byte']:>10} {chapter['frame']:>7}")
+
+    total = index["total_samples"] / rate
+    print(f"\n✓ {args.audio_dir / STORY_FILE}: {index['total_bytes'] / 1024 / 1024:.1f} MB, "
+          f"{int(total // 60)}:{total % 60:04.1f}")
+    print(f"✓ Seek table: {args.audio_dir / STORY_INDEX}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+HelloHistory - Capture a Profile from the Pi
+
+Profiles the running player for a while without restarting it: sends
+SIGUSR1 (sampling profiler) or, with --memory, SIGUSR2 (tracemalloc) to
+the service's main process, waits, sends it again to stop, then copies
+the reports it wrote into the logs directory back to ./profiles/ and
+prints the summary. See src/profiling.py.
+
+Usage:
+    python3 scripts/capture_profile.py --host pi@delmonte.local
+    python3 scripts/capture_profile.py --host pi@delmonte.local --seconds 120 --memory
+"""
+
+import sys
+import time
+import shlex
+import argparse
+import subprocess
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+REMOTE_LOGS = "/home/pi/delmonte/logs"
+SERVICE = "phone-player"  # The unit setup-service.sh installs
+REPORT_WAIT_S = 15  # Writing a report takes a moment on the Pi
+
+
+def ssh(host, command):
+    result = subprocess.run(["ssh", host, command], capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip() or f"ssh exited with {result.returncode}")
+    return result.stdout.strip()
+
+
+def list_reports(host, logs):
+    """Report files in the remote logs directory."""
+    output = ssh(host, f"cd {shlex.quote(logs)} && ls -1 profile-* memory-* 2>/dev/null || true")
+    return set(output.split())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile the player on the Pi and fetch the report")
+    parser.add_argument("--host", required=True, help="user@host of the Pi")
+    parser.add_argument("--seconds", type=float, default=30, help="How long to profile (default: 30)")
+    parser.add_argument("--memory", action="store_true",
+                        help="Trace allocations (SIGUSR2) instead of sampling the CPU (SIGUSR1)")
+    parser.add_argument("--service", default=SERVICE, help=f"systemd unit of the player (default: {SERVICE})")
+    parser.add_argument("--logs", default=REMOTE_LOGS, help=f"Remote logs directory (default: {REMOTE_LOGS})")
+    parser.add_argument("--output", type=Path, default=PROJECT_ROOT / "profiles",
+                        help="Where to put the reports (default: profiles/)")
+    args = parser.parse_args()
+
+    signal_name = "USR2" if args.memory else "USR1"
+    try:
+        pid = ssh(args.host, f"systemctl show -p MainPID --value {shlex.quote(args.service)}")
+        if not pid or pid == "0":
+            print(f"✗ {args.service} is not running on {args.host}")
+            sys.exit(1)
+        before = list_reports(args.host, args.logs)
+        print(f"Profiling pid {pid} ({'allocations' if args.memory else 'CPU'}) for {args.seconds:g}s...")
+        ssh(args.host, f"kill -{signal_name} {pid}")
+        time.sleep(args.seconds)
+        ssh(args.host, f"kill -{signal_name} {pid}")
+
+        deadline = time.monotonic() + REPORT_WAIT_S
+        new = set()
+        while not any(name.endswith(".txt") for name in new) and time.monotonic() < deadline:
+            time.sleep(1)
+            new = list_reports(args.host, args.logs) - before
+        if not any(name.endswith(".txt") for name in new):
+            print("✗ No report appeared; check the player log")
+            sys.exit(1)
+
+        args.output.mkdir(exist_ok=True)
+        sources = [f"{args.host}:{args.logs}/{name}" for name in sorted(new)]
+        subprocess.run(["scp", "-q", *sources, str(args.output)], check=True)
+    except (RuntimeError, subprocess.CalledProcessError) as e:
+        print(f"✗ {e}")
+        sys.exit(1)
+
+    for name in sorted(new):
+        print(f"  ✓ {args.output / name}")
+    summary = next(name for name in sorted(new) if name.endswith(".txt"))
+    print()
+    print((args.output / summary).read_text())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+"""
+HelloHistory - Delta Release Deploy
+
+Ships src/ to the Pi as a content-addressed release instead of rsyncing
+the whole tree. The manifest of the local tree (path -> sha256, size,
+mode) is compared with the blobs already on the device, and only the
+missing blobs are sent, in one tar stream. The device builds the new
+release from hard links into its blob store and then swaps one symlink,
+so the player never sees a half-updated audio directory.
+
+Device layout under --root (/home/pi/delmonte):
+
+    blobs/<sha256>                 every file ever shipped, by content
+    releases/<id>/manifest.json    what the release contains
+    releases/<id>/src/...          hard links into blobs/
+    src -> releases/<id>/src       the live release (atomic rename)
+
+Left out of releases: caches (src/audio/.frames, whose indexes check
+the MP3's mtime to the nanosecond, which tar doesn't keep), the audio
+generator's .tts_manifest.json, and the PCM assets built on the device
+(src/audio/pcm), which are carried over from the live release instead.
+The backup/ copies do ship: the player falls back on them when a chapter
+fails its checksum (integrity.py), and as blobs they only travel once.
+Any the shipped tree lacks are carried over from the live release too,
+so a deploy never drops them. Blobs keep the mtime of their first
+upload, so re-deploying an unchanged MP3 doesn't make its PCM asset look
+stale. The first deploy moves an existing plain src/ directory aside as
+a release of its own.
+
+The device side is this same file, piped to `python3 -` over ssh, so a
+local directory standing in for the Pi exercises exactly the same code:
+
+Usage:
+    python3 scripts/deploy_release.py --host pi@delmonte.local
+    python3 scripts/deploy_release.py --local /tmp/hellohistory-pi
+    python3 scripts/deploy_release.py --host pi@delmonte.local --rollback
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import shlex
+import shutil
+import hashlib
+import tarfile
+import argparse
+import subprocess
+from pathlib import Path, PurePosixPath
+
+PROJECT_ROOT = Path(__file__).parent.parent
+REMOTE_ROOT = "/home/pi/delmonte"
+KEEP_RELEASES = 3  # Live release plus this many - 1 to roll back to
+EXCLUDE_NAMES = {"__pycache__", ".DS_Store", ".amplifier", ".git", "venv",
+                 ".frames", ".tts_manifest.json"}  # Caches and build records
+EXCLUDE_SUFFIXES = (".pyc", ".tmp", ".egg-info")
+EXCLUDE_PATHS = ("audio/pcm",)  # Device-built assets
+PRESERVE_PATHS = ("audio/pcm", "audio/backup")  # Carried from the live release into the next
+INCOMING = "blobs/.incoming"
+LEGACY_RELEASE = "00000000-000000-legacy"  # Sorts before every real release
+
+
+def excluded(rel):
+    parts = PurePosixPath(rel).parts
+    if any(part in EXCLUDE_NAMES or part.endswith(EXCLUDE_SUFFIXES) for part in parts):
+        return True
+    return any(rel == path or rel.startswith(path + "/") for path in EXCLUDE_PATHS)
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def build_manifest(src_dir):
+    """{relative path: {"sha256", "size", "mode"}} for everything that ships."""
+    files = {}
+    for dirpath, dirnames, filenames in os.walk(src_dir):
+        rel_dir = os.path.relpath(dirpath, src_dir)
+        dirnames[:] = sorted(d for d in dirnames
+                             if not excluded(os.path.normpath(os.path.join(rel_dir, d))))
+        for name in sorted(filenames):
+            rel = PurePosixPath(os.path.normpath(os.path.join(rel_dir, name))).as_posix()
+            path = Path(dirpath) / name
+            if excluded(rel) or not path.is_file():
+                continue
+            files[rel] = {
+                "sha256": file_sha256(path),
+                "size": path.stat().st_size,
+                "mode": 0o755 if os.access(path, os.X_OK) else 0o644,
+            }
+    return files
+
+
+def release_id(files):
+    digest = hashlib.sha256(json.dumps(files, sort_keys=True).encode()).hexdigest()
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{digest[:8]}"
+
+
+# Device side ----------------------------------------------------------------
+# Runs on the Pi (via `python3 -`) or in-process against a local directory.
+
+def live_release(root):
+    """Name of the release src/ points at, or None."""
+    src = Path(root) / "src"
+    if not src.is_symlink():
+        return None
+    return Path(os.readlink(src)).parent.name
+
+
+def device_state(root):
+    """Live release, its manifest, and the blobs already on the device."""
+    root = Path(root)
+    live = live_release(root)
+    manifest = {}
+    if live:
+        try:
+            manifest = json.loads((root / "releases" / live / "manifest.json").read_text())["files"]
+        except (OSError, ValueError, KeyError):
+            manifest = {}
+    blobs = root / "blobs"
+    names = [p.name for p in blobs.iterdir() if not p.name.startswith(".")] if blobs.is_dir() else []
+    return {"live": live, "files": manifest, "blobs": names}
+
+
+def link_tree(source, target):
+    """
+    Recreate a directory tree of hard links (cheap copy of device-built
+    files), leaving alone any file the new release already ships.
+    """
+    for dirpath, _, filenames in os.walk(source):
+        dest = target / os.path.relpath(dirpath, source)
+        dest.mkdir(parents=True, exist_ok=True)
+        for name in filenames:
+            if not (dest / name).exists():
+                os.link(Path(dirpath) / name, dest / name)
+
+
+def stage_release(root, release):
+    """
+    Move uploaded blobs into the store (after checking their hashes), then
+    build releases/<release>/ from the uploaded manifest. Raises ValueError
+    if anything the manifest needs is missing or corrupt.
+    """
+    root = Path(root)
+    incoming = root / INCOMING
+    blobs = root / "blobs"
+    manifest = json.loads((incoming / "manifest.json").read_text())
+    for path in incoming.iterdir():
+        if path.name == "manifest.json":
+            continue
+        if file_sha256(path) != path.name:
+            raise ValueError(f"blob {path.name[:12]} corrupted in transfer")
+        os.replace(path, blobs / path.name)
+
+    staging = root / "releases" / f".{release}"
+    if staging.exists():
+        shutil.rmtree(staging)
+    for rel, entry in manifest["files"].items():
+        blob = blobs / entry["sha256"]
+        if not blob.exists() or blob.stat().st_size != entry["size"]:
+            raise ValueError(f"missing blob for {rel}")
+        dest = staging / "src" / rel
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        os.chmod(blob, entry["mode"])
+        os.link(blob, dest)
+
+    for rel in PRESERVE_PATHS:
+        previous = root / "src" / rel  # Through the symlink, or a pre-release plain tree
+        if previous.is_dir():
+            link_tree(previous, staging / "src" / rel)
+
+    (staging / "manifest.json").write_text(json.dumps(manifest, indent=2) + "\n")
+    os.replace(staging, root / "releases" / release)
+    shutil.rmtree(incoming)
+
+
+def activate(root, release):
+    """Point src/ at a release with one rename, then prune old releases."""
+    root = Path(root)
+    src = root / "src"
+    if src.is_dir() and not src.is_symlink():
+        # First delta deploy: keep the old tree as a release of its own
+        legacy = root / "releases" / LEGACY_RELEASE
+        legacy.mkdir(parents=True, exist_ok=True)
+        os.replace(src, legacy / "src")
+        (legacy / "manifest.json").write_text(json.dumps({"files": {}}) + "\n")
+    link = root / "src.next"
+    if link.is_symlink():
+        link.unlink()
+    os.symlink(Path("releases") / release / "src", link)
+    os.replace(link, src)
+    prune(root, release)
+
+
+def prune(root, live):
+    """Drop all but the newest releases, then blobs no release links to."""
+    releases = sorted(p for p in (root / "releases").iterdir() if not p.name.startswith("."))
+    keep = {p.name for p in releases[-KEEP_RELEASES:]} | {live}
+    for path in releases:
+        if path.name not in keep:
+            shutil.rmtree(path)
+    for blob in (root / "blobs").iterdir():
+        if blob.is_file() and blob.stat().st_nlink == 1:
+            blob.unlink()  # Only the store itself refers to it
+
+
+def rollback(root):
+    """Re-activate the release before the live one. Returns its name."""
+    root = Path(root)
+    live = live_release(root)
+    releases = sorted(p.name for p in (root / "releases").iterdir() if not p.name.startswith("."))
+    older = [name for name in releases if name < live] if live else []
+    if not older:
+        raise ValueError("no earlier release to roll back to")
+    activate(root, older[-1])
+    return older[-1]
+
+
+# Targets --------------------------------------------------------------------
+
+class LocalTarget:
+    """A directory standing in for the Pi; runs the device side in-process."""
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def __str__(self):
+        return str(self.root)
+
+    def state(self):
+        return device_state(self.root)
+
+    def upload(self, files, manifest):
+        incoming = self.root / INCOMING
+        incoming.mkdir(parents=True, exist_ok=True)
+        for digest, path in files.items():
+            shutil.copy2(path, incoming / digest)  # Keep the mtime, as tar does
+        (incoming / "manifest.json").write_text(json.dumps(manifest))
+
+    def stage(self, release):
+        stage_release(self.root, release)
+
+    def activate(self, release):
+        activate(self.root, release)
+
+    def rollback(self):
+        return rollback(self.root)
+
+
+class SshTarget:
+    """The Pi over ssh: one tar stream up, this script piped in for the rest."""
+
+    def __init__(self, host, root=REMOTE_ROOT):
+        self.host = host
+        self.root = root
+
+    def __str__(self):
+        return f"{self.host}:{self.root}"
+
+    def run(self, *args):
+        """Run this file's device side on the Pi; returns its stdout."""
+        command = shlex.join(["python3", "-", *args, "--root", self.root])
+        result = subprocess.run(["ssh", self.host, command], input=Path(__file__).read_bytes(),
+                                capture_output=True)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.decode().strip() or f"{args[0]} failed on {self.host}")
+        return result.stdout.decode()
+
+    def state(self):
+        return json.loads(self.run("state"))
+
+    def upload(self, files, manifest):
+        incoming = f"{self.root}/{INCOMING}"
+        command = f"mkdir -p {shlex.quote(incoming)} && tar -C {shlex.quote(incoming)} -xf -"
+        proc = subprocess.Popen(["ssh", self.host, command], stdin=subprocess.PIPE)
+        with tarfile.open(fileobj=proc.stdin, mode="w|") as tar:
+            for digest, path in files.items():
+                tar.add(path, arcname=digest)
+            data = json.dumps(manifest).encode()
+            info = tarfile.TarInfo("manifest.json")
+            info.size = len(data)
+            info.mtime = int(time.time())
+            tar.addfile(info, fileobj=io.BytesIO(data))
+        proc.stdin.close()
+        if proc.wait() != 0:
+            raise RuntimeError(f"upload to {self.host} failed")
+
+    def stage(self, release):
+        self.run("stage", release)
+
+    def activate(self, release):
+        self.run("activate", release)
+
+    def rollback(self):
+        return self.run("rollback").strip()
+
+
+def deploy(target, src_dir, dry_run=False):
+    """Send what changed and switch the device to it. Returns the release name."""
+    files = build_manifest(src_dir)
+    state = target.state()
+    live = state["files"]
+    added = sorted(set(files) - set(live))
+    removed = sorted(set(live) - set(files))
+    changed = sorted(rel for rel in set(files) & set(live)
+                     if files[rel]["sha256"] != live[rel]["sha256"])
+    have = set(state["blobs"])
+    missing = {}
+    for rel, entry in files.items():
+        if entry["sha256"] not in have:
+            missing.setdefault(entry["sha256"], src_dir / rel)
+    size = sum(files[rel]["size"] for rel in files if files[rel]["sha256"] in missing)
+
+    print(f"Live release: {state['live'] or '(none)'}")
+    for label, paths in (("+", added), ("~", changed), ("-", removed)):
+        for rel in paths:
+            print(f"  {label} {rel}")
+    print(f"{len(files)} files, {len(missing)} blobs to send ({size / 1024 / 1024:.1f} MB)")
+    if not (added or changed or removed) and state["live"]:
+        print("✓ Already up to date")
+        return state["live"]
+    if dry_run:
+        return None
+
+    release = release_id(files)
+    started = time.monotonic()
+    target.upload(missing, {"files": files})
+    target.stage(release)
+    target.activate(release)
+    print(f"✓ {release} live on {target} ({time.monotonic() - started:.1f}s)")
+    return release
+
+
+def device_main(argv):
+    """Entry point when piped to `python3 -` on the device."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("command", choices=("state", "stage", "activate", "rollback"))
+    parser.add_argument("release", nargs="?")
+    parser.add_argument("--root", required=True)
+    args = parser.parse_args(argv)
+    try:
+        if args.command == "state":
+            print(json.dumps(device_state(args.root)))
+        elif args.command == "stage":
+            stage_release(args.root, args.release)
+        elif args.command == "activate":
+            activate(args.root, args.release)
+        else:
+            print(rollback(args.root))
+    except (OSError, ValueError) as e:
+        print(f"{args.command}: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Deploy src/ to the Pi as a delta release")
+    where = parser.add_mutually_exclusive_group(required=True)
+    where.add_argument("--host", help="user@host of the Pi")
+    where.add_argument("--local", type=Path, metavar="DIR",
+                       help="Deploy into a local directory standing in for the Pi")
+    parser.add_argument("--root", default=REMOTE_ROOT,
+                        help=f"Install root on the Pi (default: {REMOTE_ROOT})")
+    parser.add_argument("--src", type=Path, default=PROJECT_ROOT / "src",
+                        help="Tree to ship (default: src)")
+    parser.add_argument("--dry-run", action="store_true", help="Show what would be sent")
+    parser.add_argument("--rollback", action="store_true",
+                        help="Switch back to the previous release")
+    args = parser.parse_args()
+
+    target = LocalTarget(args.local) if args.local else SshTarget(args.host, args.root)
+    try:
+        if args.rollback:
+            print(f"✓ Rolled back to {target.rollback()}")
+        else:
+            deploy(target, args.src, args.dry_run)
+    except (OSError, ValueError, RuntimeError) as e:
+        print(f"✗ Deploy failed: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    if sys.argv[0] == "-":
+        device_main(sys.argv[1:])
+    else:
+        main()
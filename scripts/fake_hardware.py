@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+HelloHistory - Simulated Hardware
+
+Stand-ins for the hook switch and the audio device, so PhonePlayer can be
+driven without a Pi:
+
+    FakeChip  - injectable in place of gpiod.Chip("/dev/gpiochip0"). Its
+                line request has a real fd that becomes readable when an
+                edge is queued, so the player's select() loop runs as-is.
+    FakeSink  - an AudioBackend that "renders" audio in small periods on a
+                thread and timestamps the first non-silent frame of each
+                track, the return to silence, and gaps between tracks.
+
+If python3-gpiod is not installed (e.g. on a Mac), install_fake_gpiod()
+registers a minimal gpiod module with the names phone_player.py uses.
+"""
+
+import os
+import sys
+import enum
+import time
+import types
+import threading
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+from bench_player import AudioBackend
+
+
+def install_fake_gpiod():
+    """Register a minimal gpiod module if the real one is unavailable."""
+    try:
+        import gpiod
+        return gpiod
+    except ImportError:
+        pass
+
+    gpiod = types.ModuleType("gpiod")
+    line = types.ModuleType("gpiod.line")
+    line.Direction = enum.Enum("Direction", "AS_IS INPUT OUTPUT")
+    line.Bias = enum.Enum("Bias", "AS_IS UNKNOWN DISABLED PULL_UP PULL_DOWN")
+    line.Edge = enum.Enum("Edge", "NONE RISING FALLING BOTH")
+    line.Value = enum.IntEnum("Value", {"INACTIVE": 0, "ACTIVE": 1})
+
+    class EdgeEvent:
+        Type = enum.Enum("Type", "RISING_EDGE FALLING_EDGE")
+
+    class LineSettings:
+        def __init__(self, **kwargs):
+            self.__dict__.update(kwargs)
+
+    gpiod.line = line
+    gpiod.EdgeEvent = EdgeEvent
+    gpiod.LineSettings = LineSettings
+    gpiod.Chip = FakeChip
+    sys.modules["gpiod"] = gpiod
+    sys.modules["gpiod.line"] = line
+    return gpiod
+
+
+# ============================================================================
+# Fake GPIO
+# ============================================================================
+
+class FakeEdgeEvent:
+    def __init__(self, event_type, timestamp_ns, line_offset):
+        self.event_type = event_type
+        self.timestamp_ns = timestamp_ns
+        self.line_offset = line_offset
+
+
+class FakeLineRequest:
+    """Line request whose levels and edges are set by the test script."""
+
+    def __init__(self, offsets):
+        import gpiod
+        self.gpiod = gpiod
+        self.levels = {offset: False for offset in offsets}
+        self.pending = []
+        self.lock = threading.Lock()
+        self.read_fd, self.write_fd = os.pipe()
+        os.set_blocking(self.read_fd, False)
+
+    @property
+    def fd(self):
+        return self.read_fd
+
+    def get_value(self, offset):
+        Value = self.gpiod.line.Value
+        return Value.ACTIVE if self.levels[offset] else Value.INACTIVE
+
+    def set_level(self, offset, active, bounce=0, timestamp_ns=None):
+        """
+        Drive a line and queue the matching edge event. bounce adds that
+        many extra toggle pairs 0.2 ms apart, as a worn switch would.
+        Returns the timestamp of the first edge.
+        """
+        Type = self.gpiod.EdgeEvent.Type
+        first_ns = timestamp_ns or time.monotonic_ns()
+        events = []
+        level = active
+        for i in range(1 + 2 * bounce):
+            kind = Type.RISING_EDGE if level else Type.FALLING_EDGE
+            events.append(FakeEdgeEvent(kind, first_ns + i * 200_000, offset))
+            level = not level
+
+        with self.lock:
+            self.levels[offset] = active
+            self.pending.extend(events)
+        os.write(self.write_fd, b"!")
+        return first_ns
+
+    def wake(self):
+        """Make the fd readable without an edge (used to stop the loop)."""
+        os.write(self.write_fd, b"!")
+
+    def read_edge_events(self, max_events=None):
+        try:
+            while os.read(self.read_fd, 64):
+                pass
+        except BlockingIOError:
+            pass
+        with self.lock:
+            events, self.pending = self.pending, []
+        return events
+
+    def wait_edge_events(self, timeout=None):
+        import select
+        return bool(select.select([self.read_fd], [], [], timeout)[0])
+
+    def release(self):
+        os.close(self.read_fd)
+        os.close(self.write_fd)
+
+
+class FakeChip:
+    """
+    Drop-in for gpiod.Chip. Keeps every line request for the script;
+    request is the first one (the hook switch), line_request(offset)
+    finds the one that owns a line (e.g. the dial).
+    """
+
+    def __init__(self, path="/dev/gpiochip0"):
+        self.path = path
+        self.requests = []
+
+    @property
+    def request(self):
+        return self.requests[0] if self.requests else None
+
+    def line_request(self, offset):
+        for request in self.requests:
+            if offset in request.levels:
+                return request
+        return None
+
+    def request_lines(self, consumer=None, config=None):
+        offsets = []
+        for key in config:
+            offsets.extend(key if isinstance(key, tuple) else [key])
+        request = FakeLineRequest(offsets)
+        self.requests.append(request)
+        return request
+
+
+# ============================================================================
+# Fake audio sink
+# ============================================================================
+
+class FakeSink(AudioBackend):
+    """
+    AudioBackend that plays every track as lead_silence_s of silence
+    followed by track_seconds of sound, rendered in period_s periods.
+    Also stands in for the output Mixer: while muted, periods are silent.
+
+    Timeline (monotonic ns) is exposed through wait_for():
+        "sound"   - first non-silent period of a track
+        "silence" - first silent period after sound stopped
+        "ended"   - a track ran to completion
+    """
+
+    def __init__(self, track_seconds=0.05, lead_silence_s=0.0, period_s=0.002):
+        self.track_seconds = track_seconds
+        self.lead_silence_s = lead_silence_s
+        self.period_s = period_s
+        self.cond = threading.Condition()
+        self.timeline = []
+        self.gaps_ms = []
+        self.events = []
+        self.wake_r, self.wake_w = os.pipe()
+        os.set_blocking(self.wake_r, False)
+        self.track = None
+        self.position = 0.0
+        self.sounding = False
+        self.muted = False
+        self.stop_pending = False
+        self.gain_db = 0.0
+        self.last_sound_ns = None
+        self.gap_pending = False
+        self.alive = True
+        self.thread = threading.Thread(target=self.render, daemon=True)
+        self.thread.start()
+
+    # AudioBackend interface -------------------------------------------------
+
+    def play(self, filepath):
+        with self.cond:
+            self.track = filepath
+            self.position = 0.0
+
+    def stop(self):
+        with self.cond:
+            if self.track is not None:
+                # Interrupted mid-track; the next sound is not a chapter gap
+                self.gap_pending = False
+                self.stop_pending = True
+            self.track = None
+
+    def seek(self, seconds):
+        with self.cond:
+            self.position = self.lead_silence_s + seconds
+
+    def is_playing(self):
+        with self.cond:
+            return self.track is not None
+
+    def reopen(self):
+        return True
+
+    def fileno(self):
+        return self.wake_r
+
+    def poll_events(self):
+        try:
+            while os.read(self.wake_r, 64):
+                pass
+        except BlockingIOError:
+            pass
+        with self.cond:
+            events, self.events = self.events, []
+        return events
+
+    def emit(self, event):
+        self.events.append(event)
+        os.write(self.wake_w, b"!")
+
+    def cleanup(self):
+        self.alive = False
+        self.thread.join()
+
+    # Mixer interface --------------------------------------------------------
+
+    def mute(self):
+        with self.cond:
+            self.muted = True
+
+    def unmute(self):
+        with self.cond:
+            self.muted = False
+
+    def set_gain(self, db):
+        self.gain_db = db
+
+    def reset(self):
+        pass
+
+    # Rendering ----------------------------------------------------------------
+
+    def record(self, kind, now):
+        self.timeline.append((kind, now))
+        self.cond.notify_all()
+
+    def render(self):
+        while self.alive:
+            time.sleep(self.period_s)
+            now = time.monotonic_ns()
+            with self.cond:
+                audible = (
+                    self.track is not None
+                    and not self.muted
+                    and self.position >= self.lead_silence_s
+                )
+                if audible and not self.sounding:
+                    self.record("sound", now)
+                    if self.gap_pending:
+                        self.gaps_ms.append((now - self.last_sound_ns) / 1e6)
+                        self.gap_pending = False
+                elif not audible and self.sounding:
+                    self.record("silence", now)
+                self.sounding = audible
+                if audible:
+                    self.last_sound_ns = now
+                if self.stop_pending:
+                    # Teardown completes on the render thread, a period after stop()
+                    self.stop_pending = False
+                    self.emit(("stopped", now))
+
+                if self.track is not None:
+                    self.position += self.period_s
+                    if self.position >= self.lead_silence_s + self.track_seconds:
+                        self.track = None
+                        self.sounding = False
+                        self.gap_pending = True
+                        self.record("ended", now)
+                        self.emit(("ended", now))
+
+    def wait_for(self, kind, after_ns, timeout=2.0):
+        """Timestamp of the first `kind` event at or after after_ns, or None."""
+        deadline = time.monotonic() + timeout
+        with self.cond:
+            while True:
+                found = [ts for event, ts in self.timeline
+                         if event == kind and ts >= after_ns]
+                if found:
+                    return found[0]
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self.cond.wait(remaining)
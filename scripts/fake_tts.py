@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+HelloHistory - Local TTS Stand-In
+
+A drop-in for the ElevenLabs client used by generate_audio.py, so the
+generation pipeline (concurrency, rate limiting, retries, caching) can be
+exercised without an API key or quota:
+
+    python3 scripts/generate_audio.py --all --fake-tts --output-dir /tmp/audio
+
+convert() sleeps for a simulated round trip, fails a configurable share
+of requests with transient API errors (some mid-stream), and otherwise
+returns silent MP3 frames (MPEG-1 Layer III, 44.1 kHz, 128 kbps) whose
+length follows the text, at roughly narration pace.
+"""
+
+import time
+import random
+import threading
+
+CHARS_PER_SECOND = 15  # Rough narration pace for the simulated audio length
+FRAME_HEADER = b"\xff\xfb\x90\x00"  # MPEG-1 Layer III, 128 kbps, 44.1 kHz, stereo
+FRAME_BYTES = 417  # 144 * 128000 / 44100, no padding
+FRAME_SECONDS = 1152 / 44100
+TRANSIENT_STATUS = (429, 500, 503)
+
+
+class FakeApiError(Exception):
+    """Mimics the SDK's ApiError closely enough for retry decisions."""
+
+    def __init__(self, status_code, body):
+        super().__init__(f"status_code: {status_code}, body: {body}")
+        self.status_code = status_code
+        self.body = body
+
+
+def silent_mp3(seconds):
+    """Silent CBR MP3 frames covering at least `seconds`."""
+    frame = FRAME_HEADER + bytes(FRAME_BYTES - len(FRAME_HEADER))
+    return frame * (int(seconds / FRAME_SECONDS) + 1)
+
+
+class FakeTTSClient:
+    """
+    Mimics ElevenLabs().text_to_speech.convert(). Latency is
+    latency_s + per_char_s * len(text), +/- 25% jitter.
+    """
+
+    def __init__(self, latency_s=0.5, per_char_s=0.0002, error_rate=0.1, seed=None):
+        self.latency_s = latency_s
+        self.per_char_s = per_char_s
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.failures = 0
+        self.text_to_speech = self
+
+    def convert(self, voice_id, text, model_id=None, voice_settings=None, output_format=None):
+        with self.lock:
+            self.calls += 1
+            jitter = self.rng.uniform(0.75, 1.25)
+            fail = self.rng.random() < self.error_rate
+            status = self.rng.choice(TRANSIENT_STATUS)
+            mid_stream = self.rng.random() < 0.3
+        time.sleep((self.latency_s + self.per_char_s * len(text)) * jitter)
+        if fail and not mid_stream:
+            with self.lock:
+                self.failures += 1
+            raise FakeApiError(status, "simulated failure")
+        return self.stream(silent_mp3(len(text) / CHARS_PER_SECOND), fail)
+
+    def stream(self, audio, fail):
+        """Yield the audio in chunks like the SDK does; optionally drop halfway."""
+        chunk = 4096
+        for start in range(0, len(audio), chunk):
+            if fail and start >= len(audio) // 2:
+                with self.lock:
+                    self.failures += 1
+                raise ConnectionError("simulated connection reset mid-stream")
+            yield audio[start:start + chunk]
@@ -26,19 +26,154 @@ Usage:
 
     # Use a specific config file
     python3 scripts/generate_audio.py --config my_config.yaml --all
+
+    # Run against the local TTS stand-in (no API key, no quota)
+    python3 scripts/generate_audio.py --all --fake-tts --output-dir /tmp/audio
+
+Chapters are generated by a pool of --jobs workers. Requests are paced by
+a token bucket (--rate per second), transient API errors are retried with
+exponential backoff, and each MP3 is written to a temp file and renamed
+into place, so a failed run never leaves a partial file in src/audio.
+
+Outputs are cached by content: each chapter's key is a hash of everything
+sent to the API (text, voice, model, voice settings, output format), kept
+with the MP3's checksum in .tts_manifest.json in the output directory. A
+chapter is only re-synthesized when its key changes or its file no longer
+matches; --force regenerates anyway and --verify checks without calling
+the API.
+
+Long chapters are split at paragraph and sentence boundaries into chunks
+of at most chunk_chars characters, synthesized in parallel (each retried
+on its own) and joined frame by frame with chunk_pause_ms of silence in
+between. Chunks are cached in .cache/tts-chunks/ by the same kind of key,
+so editing one paragraph only re-synthesizes the chunks it touches.
 """
 
 import os
+import re
 import sys
+import json
+import time
+import hashlib
+import random
 import argparse
+import threading
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Add project root to path
 PROJECT_ROOT = Path(__file__).parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+from mp3_frames import iter_frames, silent_frame
+
+DEFAULT_JOBS = 4  # Chapters synthesized at once
+DEFAULT_RATE = 2.0  # TTS requests started per second (token bucket refill)
+DEFAULT_RETRIES = 3  # Extra attempts for a transient failure
+RETRY_BASE_S = 1.0  # First backoff; doubles per attempt, with jitter
+TRANSIENT_STATUS = {408, 409, 429, 500, 502, 503, 504}
+MANIFEST_NAME = ".tts_manifest.json"
+CHUNK_CACHE_DIR = PROJECT_ROOT / ".cache" / "tts-chunks"
+DEFAULT_CHUNK_CHARS = 800  # Longest chunk sent as one request (0 = no chunking)
+DEFAULT_CHUNK_PAUSE_MS = 250  # Silence inserted between stitched chunks
+SENTENCE = re.compile(r".+?(?:[.!?]+[\"')\]”’]*(?=\s|$)|$)", re.S)
+
+try:
+    import httpx  # Transport used by the ElevenLabs SDK
+    NETWORK_ERRORS = (ConnectionError, TimeoutError, httpx.TransportError)
+except ImportError:
+    NETWORK_ERRORS = (ConnectionError, TimeoutError)
+
+
+class TokenBucket:
+    """
+    Thread-safe rate limiter: `rate` tokens per second, up to `burst` saved.
+    Also tallies what the same requests would take one at a time.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+        self.sequential_s = 0.0  # Estimated run time with --jobs 1
+
+    def acquire(self) -> None:
+        """Block until a token is available, then take it."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def note_request(self, seconds: float) -> None:
+        """One attempt took `seconds`; alone, the next couldn't start before 1/rate."""
+        with self.lock:
+            self.sequential_s += max(seconds, 1 / self.rate)
+
+    def note_backoff(self, seconds: float) -> None:
+        with self.lock:
+            self.sequential_s += seconds
+
 
+class Manifest:
+    """Cache key and output checksum for every generated chapter."""
 
-def check_dependencies():
+    def __init__(self, path: Path):
+        self.path = path
+        self.lock = threading.Lock()
+        try:
+            self.entries = json.loads(path.read_text())["chapters"]
+        except (OSError, ValueError, KeyError):
+            self.entries = {}
+
+    def is_current(self, chapter_id: str, key: str, output_path: Path) -> bool:
+        entry = self.entries.get(chapter_id)
+        return (entry is not None and entry["key"] == key
+                and output_path.exists() and file_sha256(output_path) == entry["sha256"])
+
+    def record(self, chapter_id: str, key: str, data: bytes) -> None:
+        """Note a freshly written output and save the manifest."""
+        with self.lock:
+            self.entries[chapter_id] = {
+                "key": key,
+                "sha256": hashlib.sha256(data).hexdigest(),
+                "bytes": len(data),
+                "generated": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            }
+            document = {"format": 1, "chapters": dict(sorted(self.entries.items()))}
+            write_atomic(self.path, (json.dumps(document, indent=2) + "\n").encode())
+
+    def status(self, chapter_id: str, key: str, output_path: Path) -> str:
+        """ok, missing, untracked, stale (inputs changed) or modified (file changed)."""
+        entry = self.entries.get(chapter_id)
+        if not output_path.exists():
+            return "missing"
+        if entry is None:
+            return "untracked"
+        if entry["key"] != key:
+            return "stale"
+        if file_sha256(output_path) != entry["sha256"]:
+            return "modified"
+        return "ok"
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def check_dependencies(need_sdk: bool = True):
     """Check if required packages are installed."""
     missing = []
     
@@ -47,10 +182,11 @@ def check_dependencies():
     except ImportError:
         missing.append("pyyaml")
     
-    try:
-        from elevenlabs import ElevenLabs
-    except ImportError:
-        missing.append("elevenlabs")
+    if need_sdk:
+        try:
+            from elevenlabs import ElevenLabs
+        except ImportError:
+            missing.append("elevenlabs")
     
     if missing:
         print("Missing dependencies. Install with:")
@@ -95,6 +231,10 @@ use_speaker_boost: true
 # Output settings
 output_format: "mp3_44100_128"  # mp3_44100_128, mp3_44100_192, pcm_16000, etc.
 
+# Long chapters are synthesized in parallel chunks and stitched (mp3 only)
+chunk_chars: 800  # Max characters per request; 0 sends each chapter whole
+chunk_pause_ms: 250  # Silence between chunks
+
 # Chapter definitions
 # Each chapter needs an id and either a source file or inline text
 chapters:
@@ -163,51 +303,287 @@ def get_chapter_text(chapter: dict, scripts_dir: Path) -> str:
     raise ValueError(f"Chapter {chapter['id']} has no 'text' or 'source'")
 
 
+def is_transient(error: Exception) -> bool:
+    """Worth retrying: rate limits, server errors and dropped connections."""
+    status = getattr(error, "status_code", None)
+    if status is not None:
+        return status in TRANSIENT_STATUS
+    return isinstance(error, NETWORK_ERRORS)
+
+
+def split_text(text: str, max_chars: int) -> list:
+    """
+    Split text into chunks of at most max_chars where possible. Whole
+    paragraphs are packed together; only a paragraph longer than max_chars
+    is broken up, and then only between sentences.
+    """
+    pieces = []  # (text, separator before it)
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = " ".join(paragraph.split())
+        if not paragraph:
+            continue
+        if len(paragraph) <= max_chars:
+            pieces.append((paragraph, "\n\n"))
+            continue
+        sentences = [s.strip() for s in SENTENCE.findall(paragraph) if s.strip()]
+        pieces += [(sentence, "\n\n" if n == 0 else " ") for n, sentence in enumerate(sentences)]
+
+    chunks = []
+    current = ""
+    for piece, separator in pieces:
+        if current and len(current) + len(separator) + len(piece) > max_chars:
+            chunks.append(current)
+            current = piece
+        else:
+            current = f"{current}{separator}{piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def stitch(parts: list, pause_ms: int) -> bytes:
+    """Join MP3 chunks at frame boundaries with silent frames in between."""
+    out = bytearray()
+    for n, data in enumerate(parts):
+        frames = list(iter_frames(data))  # Drops ID3 tags and Xing/Info frames
+        if not frames:
+            raise ValueError(f"chunk {n + 1} contains no MP3 frames")
+        first = frames[0]
+        if n and pause_ms:
+            count = round(pause_ms / 1000 * first.sample_rate / first.samples)
+            out += silent_frame(data[first.offset:first.offset + 4]) * count
+        for frame in frames:
+            out += data[frame.offset:frame.offset + frame.size]
+    return bytes(out)
+
+
+def chunk_settings(config: dict) -> tuple:
+    """(max chars, pause ms); chunking only applies to MP3 output."""
+    if not config.get("output_format", "mp3_44100_128").startswith("mp3"):
+        return 0, 0
+    return (config.get("chunk_chars", DEFAULT_CHUNK_CHARS),
+            config.get("chunk_pause_ms", DEFAULT_CHUNK_PAUSE_MS))
+
+
+def tts_params(text: str, config: dict) -> dict:
+    """Arguments for one TTS request - everything the audio depends on."""
+    return {
+        "voice_id": config["voice_id"],
+        "model_id": config.get("model_id", "eleven_monolingual_v1"),
+        "text": text,
+        "voice_settings": {
+            "stability": config.get("stability", 0.5),
+            "similarity_boost": config.get("similarity_boost", 0.75),
+            "style": config.get("style", 0.45),
+            "use_speaker_boost": config.get("use_speaker_boost", True),
+        },
+        "output_format": config.get("output_format", "mp3_44100_128"),
+    }
+
+
+def cache_key(params: dict) -> str:
+    return hashlib.sha256(json.dumps(params, sort_keys=True).encode()).hexdigest()
+
+
+def chapter_key(text: str, config: dict) -> str:
+    """Cache key for a whole chapter: its request plus how it is chunked."""
+    max_chars, pause_ms = chunk_settings(config)
+    params = tts_params(text, config)
+    if max_chars:
+        params["chunking"] = {"chars": max_chars, "pause_ms": pause_ms}
+    return cache_key(params)
+
+
+def synthesize_chunk(client, params: dict, limiter: TokenBucket,
+                     retries: int, label: str, force: bool = False) -> tuple:
+    """
+    synthesize() through the chunk cache (refreshed when forced).
+    Returns (audio bytes, seconds spent in requests, whether it was cached).
+    """
+    path = CHUNK_CACHE_DIR / f"{cache_key(params)}.mp3"
+    if path.exists() and not force:
+        return path.read_bytes(), 0.0, True
+    audio, spent, _ = synthesize(client, params, limiter, retries, label)
+    write_atomic(path, audio)
+    return audio, spent, False
+
+
+def synthesize(client, params: dict, limiter: TokenBucket,
+               retries: int, label: str) -> tuple:
+    """
+    One TTS request, retried with backoff on transient errors.
+    Returns (audio bytes, seconds spent in requests, attempts).
+    """
+    spent = 0.0
+    for attempt in range(retries + 1):
+        limiter.acquire()
+        started = time.monotonic()
+        try:
+            audio = client.text_to_speech.convert(**params)
+            # Drain the stream inside the try: a drop mid-download is retried too
+            data = b"".join(audio)
+            limiter.note_request(time.monotonic() - started)
+            return data, spent + time.monotonic() - started, attempt + 1
+        except Exception as e:
+            limiter.note_request(time.monotonic() - started)
+            spent += time.monotonic() - started
+            if attempt == retries or not is_transient(e):
+                raise
+            delay = RETRY_BASE_S * 2 ** attempt * random.uniform(0.5, 1.5)
+            print(f"  ! {label}: {e} (retry {attempt + 1}/{retries} in {delay:.1f}s)")
+            limiter.note_backoff(delay)
+            time.sleep(delay)
+
+
+def write_atomic(path: Path, data: bytes) -> None:
+    """Write via a temp file in the same directory and rename into place."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
 def generate_chapter(
     client,
     chapter_id: str,
     text: str,
     config: dict,
     output_dir: Path,
-    dry_run: bool = False
-) -> Path:
-    """Generate audio for a single chapter."""
+    dry_run: bool = False,
+    limiter: TokenBucket | None = None,
+    retries: int = DEFAULT_RETRIES,
+    manifest: Manifest | None = None,
+    force: bool = False,
+    pool: ThreadPoolExecutor | None = None,
+) -> tuple:
+    """
+    Generate audio for a single chapter, unless the cached output is current.
+    TTS requests run on `pool` (shared between chapters, sized by --jobs).
+    Returns (path, seconds in requests, whether it came from the cache).
+    """
     output_path = output_dir / f"{chapter_id}.mp3"
-    
-    print(f"\n{'[DRY RUN] ' if dry_run else ''}Generating: {chapter_id}")
-    print(f"  Text length: {len(text)} characters")
-    print(f"  Output: {output_path}")
+    key = chapter_key(text, config)
+    cached = not force and manifest is not None and manifest.is_current(chapter_id, key, output_path)
+    max_chars, pause_ms = chunk_settings(config)
+    chunks = split_text(text, max_chars) if max_chars and len(text) > max_chars else [text]
     
     if dry_run:
+        print(f"\n[DRY RUN] {'Cached' if cached else 'Generating'}: {chapter_id}")
+        print(f"  Text length: {len(text)} characters in {len(chunks)} chunk(s)")
+        print(f"  Output: {output_path}")
         print(f"  Preview: {text[:100]}...")
-        return output_path
-    
-    # Generate audio
-    audio = client.text_to_speech.convert(
-        voice_id=config["voice_id"],
-        model_id=config.get("model_id", "eleven_monolingual_v1"),
-        text=text,
-        voice_settings={
-            "stability": config.get("stability", 0.5),
-            "similarity_boost": config.get("similarity_boost", 0.75),
-            "style": config.get("style", 0.45),
-            "use_speaker_boost": config.get("use_speaker_boost", True),
-        },
-        output_format=config.get("output_format", "mp3_44100_128"),
-    )
-    
-    # Save to file
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    
-    with open(output_path, "wb") as f:
-        for chunk in audio:
-            f.write(chunk)
-    
-    # Get file size
-    size_kb = output_path.stat().st_size / 1024
-    print(f"  ✓ Generated: {size_kb:.1f} KB")
+        return output_path, 0.0, cached
+    
+    if cached:
+        print(f"  = {chapter_id}: unchanged, using cached {output_path.name}")
+        return output_path, 0.0, True
+    
+    limiter = limiter or TokenBucket(DEFAULT_RATE)
+    if pool is None:
+        with ThreadPoolExecutor(max_workers=DEFAULT_JOBS) as own_pool:
+            return generate_chapter(client, chapter_id, text, config, output_dir, dry_run,
+                                    limiter, retries, manifest, force, own_pool)
+    
+    if len(chunks) == 1:
+        audio, spent, attempts = pool.submit(
+            synthesize, client, tts_params(text, config), limiter, retries, chapter_id
+        ).result()
+        detail = f", {attempts} attempts" if attempts > 1 else ""
+    else:
+        futures = [
+            pool.submit(synthesize_chunk, client, tts_params(chunk, config),
+                        limiter, retries, f"{chapter_id} chunk {n + 1}/{len(chunks)}", force)
+            for n, chunk in enumerate(chunks)
+        ]
+        # Wait for every chunk so the ones that succeeded are cached for next time
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append(e)
+        failed = [r for r in results if isinstance(r, Exception)]
+        if failed:
+            raise RuntimeError(f"{len(failed)} of {len(chunks)} chunks failed: {failed[0]}")
+        audio = stitch([data for data, _, _ in results], pause_ms)
+        spent = sum(seconds for _, seconds, _ in results)
+        reused = sum(1 for _, _, from_cache in results if from_cache)
+        detail = f", {len(chunks)} chunks ({reused} cached)"
+    
+    write_atomic(output_path, audio)
+    if manifest is not None:
+        manifest.record(chapter_id, key, audio)
+    
+    print(f"  ✓ {chapter_id}: {len(text)} chars -> {len(audio) / 1024:.1f} KB "
+          f"in {spent:.1f}s{detail}")
+    
+    return output_path, spent, False
+
+
+def generate_all(client, chapters: list, config: dict, args) -> tuple:
+    """
+    Run chapters through the worker pool.
+    Returns (generated, cached, errors, seconds in requests, estimated
+    seconds for the same requests one at a time).
+    """
+    scripts_dir = PROJECT_ROOT / "scripts"
+    limiter = TokenBucket(args.rate, burst=args.jobs)
+    manifest = Manifest(args.output_dir / MANIFEST_NAME)
+    generated = []
+    cached = []
+    errors = []
+    spent = 0.0
+    
+    def work(chapter):
+        text = get_chapter_text(chapter, scripts_dir)
+        return generate_chapter(
+            client, chapter["id"], text, config, args.output_dir,
+            args.dry_run, limiter, args.retries, manifest, args.force, request_pool,
+        )
+    
+    # Chapter threads only split, wait and stitch; every TTS request goes
+    # through the shared --jobs pool
+    with ThreadPoolExecutor(max_workers=args.jobs) as request_pool, \
+            ThreadPoolExecutor(max_workers=max(1, len(chapters))) as pool:
+        futures = {pool.submit(work, chapter): chapter["id"] for chapter in chapters}
+        for future in as_completed(futures):
+            try:
+                output, seconds, from_cache = future.result()
+                (cached if from_cache else generated).append(output)
+                spent += seconds
+            except Exception as e:
+                print(f"  ✗ {futures[future]}: {e}")
+                errors.append((futures[future], str(e)))
+    
+    return generated, cached, errors, spent, limiter.sequential_s
+
+
+def verify_outputs(chapters: list, config: dict, output_dir: Path) -> bool:
+    """Check outputs against the manifest and current inputs. True if all are current."""
+    scripts_dir = PROJECT_ROOT / "scripts"
+    manifest = Manifest(output_dir / MANIFEST_NAME)
+    current = True
     
-    return output_path
+    print(f"\nVerifying {output_dir} against {MANIFEST_NAME}\n")
+    for chapter in chapters:
+        try:
+            text = get_chapter_text(chapter, scripts_dir)
+        except (OSError, ValueError) as e:
+            print(f"  ✗ {chapter['id']:<16} {e}")
+            current = False
+            continue
+        key = chapter_key(text, config)
+        status = manifest.status(chapter["id"], key, output_dir / f"{chapter['id']}.mp3")
+        print(f"  {'✓' if status == 'ok' else '✗'} {chapter['id']:<16} {status}")
+        current = current and status == "ok"
+    return current
 
 
 def main():
@@ -220,6 +596,8 @@ Examples:
   %(prog)s --all                Generate all chapters
   %(prog)s --list-voices        List available voices
   %(prog)s 01_welcome --dry-run Preview without generating
+  %(prog)s --all --force        Regenerate even unchanged chapters
+  %(prog)s --verify             Check outputs against the cache manifest
         """
     )
     
@@ -255,28 +633,82 @@ Examples:
         default=PROJECT_ROOT / "src" / "audio",
         help="Output directory (default: src/audio)"
     )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=DEFAULT_JOBS,
+        help=f"Chapters to synthesize concurrently (default: {DEFAULT_JOBS})"
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=DEFAULT_RATE,
+        help=f"Max TTS requests started per second (default: {DEFAULT_RATE})"
+    )
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=DEFAULT_RETRIES,
+        help=f"Retries for transient API errors (default: {DEFAULT_RETRIES})"
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Regenerate even if the cached output is current"
+    )
+    parser.add_argument(
+        "--verify",
+        action="store_true",
+        help="Check outputs against the cache manifest without calling the API"
+    )
+    parser.add_argument(
+        "--fake-tts",
+        action="store_true",
+        help="Use the local TTS stand-in (scripts/fake_tts.py) instead of ElevenLabs"
+    )
+    parser.add_argument(
+        "--fake-error-rate",
+        type=float,
+        default=0.1,
+        help="Share of stand-in requests that fail transiently (default: 0.1)"
+    )
+    parser.add_argument(
+        "--fake-latency",
+        type=float,
+        default=0.5,
+        help="Base stand-in request latency in seconds (default: 0.5)"
+    )
     
     args = parser.parse_args()
     
     # Check dependencies
-    check_dependencies()
-    
-    # Check API key
-    api_key = os.environ.get("ELEVENLABS_API_KEY")
-    if not api_key:
-        print("Error: ELEVENLABS_API_KEY environment variable not set")
-        print("\nTo set it:")
-        print('  export ELEVENLABS_API_KEY="your-key-here"')
-        print("\nGet your API key from:")
-        print("  https://elevenlabs.io/app/settings/api-keys")
-        sys.exit(1)
+    check_dependencies(need_sdk=not (args.fake_tts or args.verify))
     
-    # Import ElevenLabs (after dependency check)
-    from elevenlabs import ElevenLabs
-    client = ElevenLabs(api_key=api_key)
+    if args.verify:
+        config = load_config(args.config)
+        ok = verify_outputs(config.get("chapters", []), config, args.output_dir)
+        sys.exit(0 if ok else 1)
+    
+    if args.fake_tts:
+        from fake_tts import FakeTTSClient
+        client = FakeTTSClient(latency_s=args.fake_latency, error_rate=args.fake_error_rate)
+    else:
+        # Check API key
+        api_key = os.environ.get("ELEVENLABS_API_KEY")
+        if not api_key:
+            print("Error: ELEVENLABS_API_KEY environment variable not set")
+            print("\nTo set it:")
+            print('  export ELEVENLABS_API_KEY="your-key-here"')
+            print("\nGet your API key from:")
+            print("  https://elevenlabs.io/app/settings/api-keys")
+            sys.exit(1)
+        
+        # Import ElevenLabs (after dependency check)
+        from elevenlabs import ElevenLabs
+        client = ElevenLabs(api_key=api_key)
     
     # Handle --list-voices
-    if args.list_voices:
+    if args.list_voices and not args.fake_tts:
         list_voices(client)
         return
     
@@ -290,13 +722,12 @@ Examples:
     config = load_config(args.config)
     
     # Check voice_id is set
-    if config.get("voice_id") == "YOUR_VOICE_ID_HERE":
+    if config.get("voice_id") == "YOUR_VOICE_ID_HERE" and not args.fake_tts:
         print("Error: voice_id not configured")
         print(f"\nEdit {args.config} and set your voice_id")
         print("Use --list-voices to see available voices")
         sys.exit(1)
     
-    scripts_dir = PROJECT_ROOT / "scripts"
     chapters_to_generate = []
     
     if args.all:
@@ -322,32 +753,24 @@ Examples:
     print(f"Voice ID: {config['voice_id'][:20]}...")
     print(f"Output:   {args.output_dir}")
     print(f"Chapters: {len(chapters_to_generate)}")
+    print(f"Workers:  {args.jobs} (max {args.rate:g} requests/s)\n")
     
-    generated = []
-    errors = []
-    
-    for chapter in chapters_to_generate:
-        try:
-            text = get_chapter_text(chapter, scripts_dir)
-            output = generate_chapter(
-                client,
-                chapter["id"],
-                text,
-                config,
-                args.output_dir,
-                args.dry_run
-            )
-            generated.append(output)
-        except Exception as e:
-            print(f"  ✗ Error: {e}")
-            errors.append((chapter["id"], str(e)))
+    started = time.monotonic()
+    generated, cached, errors, spent, sequential = generate_all(client, chapters_to_generate, config, args)
+    wall = time.monotonic() - started
     
     # Summary
     print(f"\n{'=' * 60}")
     print(f"Summary")
     print(f"{'=' * 60}")
     print(f"Generated: {len(generated)}")
+    print(f"Cached:    {len(cached)}")
     print(f"Errors:    {len(errors)}")
+    if not args.dry_run:
+        # Sequential baseline: the same requests, rate limit and backoff one after another
+        speedup = sequential / wall if wall else 1.0
+        print(f"Wall clock: {wall:.1f}s (sequential estimate: {sequential:.1f}s, {speedup:.1f}x; "
+              f"{spent:.1f}s in requests)")
     
     if errors:
         print("\nErrors:")
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+HelloHistory - Session Report
+
+Reads the player's session log (logs/sessions.bin, see src/session_log.py)
+and reports how far callers get: for each chapter, the share of calls
+that reached it, finished it and hung up during it (the drop-off curve)
+and how long those who reached it stayed; then calls by hour of day, how
+calls ended and what was dialled.
+
+The file is mapped read-only and viewed as a numpy record array, so the
+report is a handful of vectorised passes; millions of calls take well
+under a second. --synthesize writes a file of random calls to try that.
+
+Usage:
+    make sessions                                     # fetch from the Pi and report
+    python3 scripts/sessions.py logs/sessions.bin
+    python3 scripts/sessions.py logs/sessions.bin --days 30 --json
+    python3 scripts/sessions.py /tmp/sessions.bin --synthesize 2000000
+"""
+
+import sys
+import json
+import mmap
+import time
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+from tracks import load_track_table
+from frame_index import load_or_build
+from session_log import (HEADER, HEADER_BYTES, MAGIC, FORMAT, RECORD, RECORD_FIELDS, MAX_CHAPTERS,
+                         END_HANGUP, END_COMPLETE, END_NAMES, FLAG_RESUMED, FLAG_FAULT, read_header)
+
+FINISHED_FRACTION = 0.9  # Heard this much of a chapter counts as finishing it
+NUMPY_TYPES = {"I": "<u4", "H": "<u2", "B": "u1"}
+
+
+def record_dtype():
+    """numpy dtype of one record, from session_log.RECORD_FIELDS."""
+    fields = []
+    for name, code, count in RECORD_FIELDS:
+        if code == "x":
+            fields.append((name, f"V{count}"))
+        elif count == 1:
+            fields.append((name, NUMPY_TYPES[code]))
+        else:
+            fields.append((name, NUMPY_TYPES[code], (count,)))
+    dtype = np.dtype(fields)
+    assert dtype.itemsize == RECORD.size
+    return dtype
+
+
+def load(path):
+    """(records, calls ever written) - records is a read-only view of the mapped file."""
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    capacity, written = read_header(mapped[:HEADER_BYTES])
+    count = min(written, capacity, (len(mapped) - HEADER_BYTES) // RECORD.size)
+    return np.frombuffer(mapped, record_dtype(), count, HEADER_BYTES), written
+
+
+def chapter_seconds(audio_dir, tracks):
+    """Length of each chapter, or None where its MP3 isn't here."""
+    lengths = []
+    for name in tracks:
+        try:
+            index = load_or_build(Path(audio_dir) / name, save=False)
+            lengths.append(index.seconds(len(index)) if len(index) else None)
+        except OSError:
+            lengths.append(None)
+    return lengths
+
+
+def report(records, tracks, lengths, utc_offset_s):
+    """Every figure in the report, as plain numbers."""
+    calls = len(records)
+    chapters = len(tracks)
+    # Strided record fields are slow to scan; copy each one out once, chapters as rows
+    reached = np.ascontiguousarray(records["reached"])
+    furthest = np.ascontiguousarray(records["furthest"])
+    ends = np.ascontiguousarray(records["end"])
+    flags = np.ascontiguousarray(records["flags"])
+    dial_counts = np.ascontiguousarray(records["dial_count"])
+    started = np.ascontiguousarray(records["started"])
+    listened = np.ascontiguousarray(records["listened"][:, :chapters].T)
+
+    per_chapter = []
+    dropped = np.bincount(furthest[ends == END_HANGUP], minlength=MAX_CHAPTERS)
+    for chapter in range(chapters):
+        reached_here = int(np.count_nonzero(reached & (1 << chapter)))
+        heard = int(listened[chapter].sum(dtype=np.uint64))
+        finished = None
+        if lengths[chapter]:
+            finished = int(np.count_nonzero(listened[chapter] >= FINISHED_FRACTION * lengths[chapter]))
+        per_chapter.append({
+            "chapter": tracks[chapter],
+            "reached": reached_here,
+            "finished": finished,
+            "dropped": int(dropped[chapter]),
+            "mean_s": heard / reached_here if reached_here else 0.0,
+        })
+
+    # Hour of day in local time (today's UTC offset)
+    hour = (started + np.int64(utc_offset_s)) // 3600 % 24
+    per_call_s = listened.sum(axis=0, dtype=np.uint32)
+    hours = np.bincount(hour, minlength=24)
+    listen_by_hour = np.bincount(hour, weights=per_call_s, minlength=24)
+    first, last = (int(started.min()), int(started.max())) if calls else (None, None)
+    days = (last - first) // 86400 + 1 if calls else 1
+
+    # Most calls dial nothing; only look at the digits of those that did
+    dials = records["dials"][dial_counts > 0].ravel()
+    digits = np.bincount(dials, minlength=256)[:MAX_CHAPTERS]
+    return {
+        "calls": calls,
+        "first": first,
+        "last": last,
+        "days": days,
+        "listen_s": int(per_call_s.sum(dtype=np.uint64)),
+        "chapters": per_chapter,
+        "hours": [{"hour": hour, "calls": int(hours[hour]), "per_day": hours[hour] / days,
+                   "listen_s": float(listen_by_hour[hour])} for hour in range(24)],
+        "ends": {name: int(np.count_nonzero(ends == end)) for end, name in END_NAMES.items()},
+        "resumed": int(np.count_nonzero(flags & FLAG_RESUMED)),
+        "faults": int(np.count_nonzero(flags & FLAG_FAULT)),
+        "dialled": int(np.count_nonzero(dial_counts)),
+        "digits": [int(count) for count in digits],
+    }
+
+
+def share(count, total):
+    return f"{count / total:6.1%}" if total else "     -"
+
+
+def print_report(summary, written):
+    calls = summary["calls"]
+    print(f"{calls} calls", end="")
+    if written > calls:
+        print(f" (the log has wrapped; {written - calls} older calls overwritten)", end="")
+    print()
+    if not calls:
+        return
+    first = time.strftime("%Y-%m-%d %H:%M", time.localtime(summary["first"]))
+    last = time.strftime("%Y-%m-%d %H:%M", time.localtime(summary["last"]))
+    print(f"{first} to {last}, {summary['listen_s'] / 3600:.1f} h listened, "
+          f"{summary['listen_s'] / calls / 60:.1f} min per call")
+
+    print(f"\n{'Chapter':<24} {'reached':>8} {'finished':>8} {'hung up':>8} {'average':>8}")
+    for row in summary["chapters"]:
+        finished = "     -" if row["finished"] is None else share(row["finished"], calls)
+        print(f"{row['chapter']:<24} {share(row['reached'], calls):>8} {finished:>8} "
+              f"{share(row['dropped'], calls):>8} {row['mean_s'] / 60:>6.1f} m")
+
+    print(f"\n{'Hour':<6} {'calls':>8} {'per day':>8} {'listened':>9}")
+    busiest = max(row["calls"] for row in summary["hours"]) or 1
+    for row in summary["hours"]:
+        if row["calls"]:
+            bar = "#" * round(30 * row["calls"] / busiest)
+            print(f"{row['hour']:02d}:00  {row['calls']:>8} {row['per_day']:>8.1f} "
+                  f"{row['listen_s'] / 3600:>7.1f} h  {bar}")
+
+    print("\nEnded: " + ", ".join(f"{name} {share(count, calls).strip()}"
+                                  for name, count in summary["ends"].items()))
+    print(f"Resumed {share(summary['resumed'], calls).strip()}, "
+          f"device fault {share(summary['faults'], calls).strip()}, "
+          f"dialled {share(summary['dialled'], calls).strip()}")
+    if summary["dialled"]:
+        print("Digits dialled: " + ", ".join(f"{digit}: {count}"
+                                             for digit, count in enumerate(summary["digits"]) if count))
+
+
+def synthesize(path, calls, lengths, seed=1):
+    """Write a session log of `calls` random calls over the last year (for timing the report)."""
+    rng = np.random.default_rng(seed)
+    chapters = len(lengths)
+    lengths = np.array([length or 300.0 for length in lengths])
+    records = np.zeros(calls, record_dtype())
+    # Busy afternoons, quiet nights
+    day = rng.integers(0, 365, calls) * 86400
+    hour = np.clip(rng.normal(14, 3, calls), 0, 23.99) * 3600
+    midnight = int(time.time()) // 86400 * 86400 - time.localtime().tm_gmtoff
+    records["started"] = midnight - 365 * 86400 + day + hour.astype(np.int64)
+    # Each call drops off somewhere: part way through the chapter it got to
+    furthest = np.minimum(rng.geometric(0.3, calls) - 1, chapters - 1)
+    records["furthest"] = furthest
+    records["reached"] = (1 << (furthest + 1)) - 1
+    chapter = np.arange(chapters)
+    listened = np.where(chapter < furthest[:, None], lengths, 0.0)
+    listened[np.arange(calls), furthest] = rng.random(calls) * lengths[furthest]
+    records["listened"][:, :chapters] = listened.round()
+    complete = (furthest == chapters - 1) & (rng.random(calls) < 0.5)
+    records["listened"][complete, chapters - 1] = lengths[-1].round()
+    records["end"] = np.where(complete, END_COMPLETE, END_HANGUP)
+    records["flags"] = (rng.random(calls) < 0.05) * FLAG_RESUMED
+    records["dials"] = 0xFF
+    dialled = rng.random(calls) < 0.1
+    records["dial_count"] = dialled
+    records["dials"][dialled, 0] = rng.integers(0, chapters, int(dialled.sum()))
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, FORMAT, RECORD.size, calls, calls).ljust(HEADER_BYTES, b"\0"))
+        f.write(records.tobytes())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report on calls from the player's session log")
+    parser.add_argument("path", type=Path, help="Session log (logs/sessions.bin from the Pi)")
+    parser.add_argument("--days", type=float, help="Only the most recent N days")
+    parser.add_argument("--json", action="store_true", help="Print the figures as JSON")
+    parser.add_argument("--audio-dir", type=Path, default=PROJECT_ROOT / "src" / "audio",
+                        help="Chapter MP3s and tracks.json, for chapter names and what counts "
+                             "as finished (default: src/audio)")
+    parser.add_argument("--synthesize", type=int, metavar="N",
+                        help="First write N random calls to PATH (to time the report)")
+    args = parser.parse_args()
+
+    try:
+        tracks, _ = load_track_table(args.audio_dir)
+    except ValueError as e:
+        print(f"✗ {e}")
+        sys.exit(1)
+    lengths = chapter_seconds(args.audio_dir, tracks)
+    if args.synthesize:
+        synthesize(args.path, args.synthesize, lengths)
+        print(f"Wrote {args.synthesize} calls to {args.path} "
+              f"({args.path.stat().st_size / 1024 / 1024:.0f} MB)\n")
+
+    started = time.perf_counter()
+    try:
+        records, written = load(args.path)
+    except (OSError, ValueError) as e:
+        print(f"✗ {args.path}: {e}")
+        sys.exit(1)
+    if args.days and len(records):
+        records = records[records["started"] >= records["started"].max() - args.days * 86400]
+    summary = report(records, tracks, lengths, time.localtime().tm_gmtoff)
+    report_ms = (time.perf_counter() - started) * 1000
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return
+    print_report(summary, written)
+    print(f"\n({len(records)} records in {report_ms:.0f} ms)")
+
+
+if __name__ == "__main__":
+    main()
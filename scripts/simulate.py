@@ -0,0 +1,625 @@
+#!/usr/bin/env python3
+"""
+HelloHistory - Simulated-Time Player Run
+
+Runs the production PhonePlayer state machine headless, on a virtual
+clock, against hook and dial traces: hours of visitors in well under a
+second. Chapters "play" for their real durations (read from the MP3
+frame headers) in simulated time, so chapter boundaries, the gapless
+story stream, resume-on-pickup and the playlist end all happen as they
+would on the phone. Traces can also drop the audio device for a while,
+mid-track, to exercise fault detection and in-process recovery.
+
+Traces can be scripted, generated at random, or replayed from production
+phone.log files (hook transitions and dialled digits). After every step
+the run checks the state machine's invariants:
+
+    sound-on-hook      - audio audible while the handset is down
+    dead-air           - handset up, playlist not finished, nothing playing
+    muted-off-hook     - playing but still muted from the last hang-up
+    hook-mismatch      - debounced hook state disagrees with the settled line
+    wrong-chapter      - the file playing is not the current chapter's
+    teardown-stuck     - a hang-up's teardown never reported "stopped"
+    recovery-stuck     - the device came back but playback never resumed
+    wrong-resume       - after a fault, playback resumed somewhere else
+
+and reports them with the playlist-completion statistics.
+
+Trace file format, one event per line (# starts a comment):
+
+    12.0 lift            seconds from start, event, optional argument
+    14.5 dial 3
+    95 hangup 2          (hook events take a contact-bounce count)
+    60 fault 1500        (audio device gone for 1500 ms)
+
+Usage:
+    python3 scripts/simulate.py --random --hours 24
+    python3 scripts/simulate.py --trace visits.txt
+    python3 scripts/simulate.py --log logs/phone.log logs/phone.log.1
+    python3 scripts/simulate.py --random --faults 0.2
+    python3 scripts/simulate.py --random --save-trace /tmp/trace.txt
+"""
+
+import os
+import re
+import sys
+import time
+import heapq
+import random
+import logging
+import argparse
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+
+from fake_hardware import PROJECT_ROOT, FakeChip, install_fake_gpiod
+
+install_fake_gpiod()
+import phone_player
+from phone_player import PhonePlayer
+from bench_player import AudioBackend
+from mp3_frames import iter_frames
+from tracks import STORY_FILE, load_track_table
+
+START_MS = 30  # Simulated play() to first sound
+TEARDOWN_MS = 20  # Simulated stop() to "stopped"
+DEFAULT_TRACK_S = 120.0  # Duration of chapters whose MP3 isn't available
+TEARDOWN_LIMIT_S = 1.0  # Longer than this without "stopped" is a violation
+EXAMPLES = 3  # Violations of each kind kept for the report
+OUTAGES_MS = (50, 200, 1500, 5000)  # Random device faults last one of these
+RESUME_TOLERANCE_S = 0.5  # Slack on the position playback resumes from after a fault
+LOG_LINE = re.compile(
+    r"^(\d{4}-\d\d-\d\d \d\d:\d\d:\d\d,\d{3}) - "
+    r"(Handset LIFTED|Handset HUNG UP|Dialled (\d)|Phone player initialized)"
+)
+
+
+class VirtualClock:
+    """
+    Stands in for the time module inside phone_player: monotonic time only
+    moves when the simulation advances it. Everything else falls through
+    to the real module.
+    """
+
+    def __init__(self, start_ns=1_000_000_000):
+        self.now_ns = start_ns  # Non-zero: 0 reads as "no timestamp" in places
+
+    def monotonic_ns(self):
+        return self.now_ns
+
+    def monotonic(self):
+        return self.now_ns / 1e9
+
+    def perf_counter(self):
+        return self.now_ns / 1e9
+
+    def sleep(self, seconds):
+        self.now_ns += int(seconds * 1e9)
+
+    def advance_to(self, ns):
+        self.now_ns = max(self.now_ns, ns)
+
+    def __getattr__(self, name):
+        return getattr(time, name)
+
+
+@lru_cache(maxsize=None)
+def mp3_seconds(path):
+    """Playing time of an MP3 from its frame headers, or DEFAULT_TRACK_S."""
+    try:
+        data = Path(path).read_bytes()
+    except OSError:
+        return DEFAULT_TRACK_S
+    return sum(frame.samples / frame.sample_rate for frame in iter_frames(data)) or DEFAULT_TRACK_S
+
+
+class SimBackend(AudioBackend):
+    """
+    AudioBackend (and Mixer) on a virtual clock. A track is audible from
+    START_MS after play() until its real duration has elapsed; the engine
+    events the player listens for ("started", "ended", "stopped") are
+    queued with simulated timestamps and delivered by advance().
+
+    drop_device() pulls the output out from under it: the playing track
+    dies with "device_lost", and play() fails the same way until the
+    outage is over and the player has reopen()ed it.
+    """
+
+    def __init__(self, clock, durations=mp3_seconds, start_ms=START_MS, teardown_ms=TEARDOWN_MS):
+        self.clock = clock
+        self.durations = durations
+        self.start_ns = start_ms * 1_000_000
+        self.teardown_ns = teardown_ms * 1_000_000
+        self.track = None
+        self.offset = 0.0  # Position at play_ns + start_ns
+        self.play_ns = 0
+        self.generation = 0
+        self.scheduled = []  # heap of (due_ns, seq, generation, event kind)
+        self.seq = 0
+        self.events = []
+        self.wake_r, self.wake_w = os.pipe()
+        os.set_blocking(self.wake_r, False)
+        self.muted = False
+        self.gain_db = 0.0
+        self.finished = []  # Paths that played to the end, in order
+        self.down_until_ns = 0
+        self.reopens = 0
+
+    # AudioBackend interface -------------------------------------------------
+
+    def play(self, filepath):
+        self.generation += 1
+        if self.clock.now_ns < self.down_until_ns:
+            self.track = None
+            self.emit(("device_lost", "simulated output failure"))
+            return
+        self.track = str(filepath)
+        self.offset = 0.0
+        self.play_ns = self.clock.now_ns
+        self.schedule(self.play_ns + self.start_ns, "started", self.generation)
+
+    def seek(self, seconds):
+        self.offset = seconds
+        self.play_ns = self.clock.now_ns
+
+    def stop(self):
+        if self.track is not None:
+            self.schedule(self.clock.now_ns + self.teardown_ns, "stopped", None)
+        self.track = None
+        self.generation += 1
+
+    def is_playing(self):
+        return self.track is not None
+
+    def reopen(self):
+        self.reopens += 1
+        return self.clock.now_ns >= self.down_until_ns
+
+    def fileno(self):
+        return self.wake_r
+
+    def poll_events(self):
+        try:
+            while os.read(self.wake_r, 64):
+                pass
+        except BlockingIOError:
+            pass
+        events, self.events = self.events, []
+        return events
+
+    def emit(self, event):
+        self.events.append(event)
+        os.write(self.wake_w, b"!")
+
+    def cleanup(self):
+        os.close(self.wake_r)
+        os.close(self.wake_w)
+
+    # Mixer interface --------------------------------------------------------
+
+    def mute(self):
+        self.muted = True
+
+    def unmute(self):
+        self.muted = False
+
+    def set_gain(self, db):
+        self.gain_db = db
+
+    def reset(self):
+        pass
+
+    # Simulated time -----------------------------------------------------------
+
+    def schedule(self, due_ns, kind, generation):
+        """Queue an engine event; generation None delivers it even after a new play()."""
+        heapq.heappush(self.scheduled, (due_ns, self.seq, generation, kind))
+        self.seq += 1
+
+    def end_ns(self):
+        """When the playing track runs out, or None."""
+        if self.track is None:
+            return None
+        remaining = self.durations(self.track) - self.offset
+        return self.play_ns + self.start_ns + int(max(0.0, remaining) * 1e9)
+
+    def next_due(self):
+        due = [ns for ns in (self.end_ns(),) if ns is not None]
+        if self.scheduled:
+            due.append(self.scheduled[0][0])
+        return min(due) if due else None
+
+    def position(self):
+        """Seconds into the playing track (0 until its first sound)."""
+        elapsed = self.clock.now_ns - self.play_ns - self.start_ns
+        return self.offset + max(0, elapsed) / 1e9
+
+    def drop_device(self, down_ms):
+        """The output disappears for down_ms; returns (track, position) if it cut a track off."""
+        self.down_until_ns = self.clock.now_ns + down_ms * 1_000_000
+        if self.track is None:
+            return None
+        lost = (self.track, self.position())
+        self.track = None
+        self.generation += 1
+        self.emit(("device_lost", "simulated device removal"))
+        return lost
+
+    def audible(self):
+        return (self.track is not None and not self.muted
+                and self.clock.now_ns >= self.play_ns + self.start_ns)
+
+    def advance(self):
+        """Deliver every event due at the current simulated time."""
+        now = self.clock.now_ns
+        while self.scheduled and self.scheduled[0][0] <= now:
+            due, _, generation, kind = heapq.heappop(self.scheduled)
+            if generation is None or generation == self.generation:
+                self.emit((kind, due))  # A superseded track never "started"
+        end = self.end_ns()
+        if end is not None and end <= now:
+            self.finished.append(self.track)
+            self.track = None
+            self.generation += 1
+            self.emit(("ended", end))
+
+
+class SimPhonePlayer(PhonePlayer):
+    """PhonePlayer whose loop never blocks: the simulation owns time."""
+
+    def set_volume(self, percent):
+        pass
+
+    def next_timeout(self):
+        return 0
+
+    def wake_after(self):
+        """Seconds until the player next needs to run (debounce, chapter boundary)."""
+        return PhonePlayer.next_timeout(self)
+
+
+class EventCounter(logging.Handler):
+    """Counts the player log lines the report cares about."""
+
+    KEYS = ("Resuming", "Pickup during teardown", "Invalid chapter", "Playlist complete",
+            "Jump to chapter", "Audio device recovered", "Skipping")
+
+    def __init__(self):
+        super().__init__()
+        self.counts = dict.fromkeys(self.KEYS, 0)
+
+    def emit(self, record):
+        message = record.getMessage()
+        for key in self.KEYS:
+            if message.startswith(key):
+                self.counts[key] += 1
+
+
+# Traces -----------------------------------------------------------------------
+# A trace is a time-ordered list of (seconds, kind, argument), kind being
+# "lift", "hangup" (argument: bounce count), "dial" (argument: digit) or
+# "fault" (argument: outage in ms).
+
+def read_trace(path):
+    trace = []
+    for number, line in enumerate(Path(path).read_text().splitlines(), 1):
+        fields = line.split("#", 1)[0].split()
+        if not fields:
+            continue
+        if len(fields) not in (2, 3) or fields[1] not in ("lift", "hangup", "dial", "fault"):
+            raise ValueError(f"{path}:{number}: expected '<seconds> lift|hangup|dial|fault [n]'")
+        argument = int(fields[2]) if len(fields) == 3 else 0
+        trace.append((float(fields[0]), fields[1], argument))
+    return sorted(trace, key=lambda event: event[0])
+
+
+def write_trace(trace, path):
+    lines = [f"{seconds:.3f} {kind}" + (f" {argument}" if argument or kind == "dial" else "")
+             for seconds, kind, argument in trace]
+    Path(path).write_text("\n".join(lines) + "\n")
+
+
+def parse_logs(paths):
+    """
+    Hook transitions and dialled digits from phone.log files, as a trace
+    starting at the first event. A restart while off-hook ends that call.
+    """
+    events = []
+    for path in paths:
+        for line in Path(path).read_text(errors="replace").splitlines():
+            match = LOG_LINE.match(line)
+            if match:
+                stamp = datetime.strptime(match.group(1), "%Y-%m-%d %H:%M:%S,%f").timestamp()
+                events.append((stamp, match.group(2), match.group(3)))
+    events.sort(key=lambda event: event[0])
+    trace = []
+    lifted = False
+    for stamp, message, digit in events:
+        seconds = stamp - events[0][0]
+        if message == "Handset LIFTED" and not lifted:
+            trace.append((seconds, "lift", 0))
+            lifted = True
+        elif message == "Handset HUNG UP" and lifted:
+            trace.append((seconds, "hangup", 0))
+            lifted = False
+        elif message == "Phone player initialized" and lifted:
+            trace.append((seconds, "hangup", 0))
+            lifted = False
+        elif digit is not None:
+            trace.append((seconds, "dial", int(digit)))
+    return trace
+
+
+def random_trace(rng, hours, program_s, mean_gap_s=600.0, faults=0.0):
+    """
+    Visitors at random: most listen for a minute or two, some to the end,
+    some dial, some hang up and pick straight back up (resume), and the
+    hook contacts bounce now and then. A faults fraction of calls lose the
+    audio device at some point.
+    """
+    trace = []
+    t = rng.expovariate(1 / mean_gap_s)
+    while t < hours * 3600:
+        bounce = rng.choice((0, 0, 0, 1, 3))
+        trace.append((t, "lift", bounce))
+        if rng.random() < 0.2:
+            stay = program_s + rng.uniform(0, 30)  # The whole story
+        else:
+            stay = min(rng.lognormvariate(4.5, 1.0), program_s * 1.5)
+        for _ in range(rng.choice((0, 0, 1, 2))):
+            trace.append((t + rng.uniform(1, stay), "dial", rng.randrange(10)))
+        if rng.random() < faults:
+            trace.append((t + rng.uniform(1, stay), "fault", rng.choice(OUTAGES_MS)))
+        t += stay
+        trace.append((t, "hangup", rng.choice((0, 0, 1, 3))))
+        if rng.random() < 0.1:
+            t += rng.uniform(0.05, 20)  # Picked straight back up
+        else:
+            t += rng.expovariate(1 / mean_gap_s)
+    trace.sort(key=lambda event: event[0])
+    return trace
+
+
+# Simulation -------------------------------------------------------------------
+
+class Simulation:
+    def __init__(self, trace, audio_dir, start_ms=START_MS, teardown_ms=TEARDOWN_MS):
+        self.trace = trace
+        self.clock = VirtualClock()
+        phone_player.time = self.clock
+        phone_player.DEVICE_MONITOR = False  # Faults arrive through the backend
+        phone_player.VERIFY_AUDIO = False
+        phone_player.PREFETCH = False
+        phone_player.METRICS_FILE = None
+        phone_player.SESSION_LOG = None
+        phone_player.WATCH_AUDIO = False
+        phone_player.AUDIO_DIR = str(audio_dir)
+        self.backend = SimBackend(self.clock, start_ms=start_ms, teardown_ms=teardown_ms)
+        self.chip = FakeChip()
+        self.player = SimPhonePlayer(chip=self.chip, backend=self.backend, mixer=self.backend)
+        self.line = self.chip.request
+        self.origin_ns = self.clock.now_ns
+        self.counter = EventCounter()
+        log = logging.getLogger("phone")
+        log.addHandler(self.counter)
+        log.setLevel(logging.INFO)
+        log.propagate = False
+        self.violations = {}
+        self.sessions = []  # One dict per call
+        self.session = None
+        self.steps = 0
+        self.outage = None  # The fault being recovered from, while it cut a track off
+        self.recoveries = []  # Fault to replay, seconds
+        self.faults = 0
+
+    def now_s(self):
+        return (self.clock.now_ns - self.origin_ns) / 1e9
+
+    def apply(self, kind, argument):
+        now = self.clock.now_ns
+        if self.outage and kind in ("dial", "hangup"):
+            self.outage["moved"] = True  # Replay will (rightly) start somewhere else
+        if kind == "fault":
+            self.faults += 1
+            lost = self.backend.drop_device(argument)
+            if lost and not self.outage:
+                self.outage = {"start": now, "track": lost[0], "position": lost[1], "moved": False}
+        elif kind == "dial":
+            self.player.on_dial_digit(argument, now)
+            if self.session:
+                self.session["dials"] += 1
+        else:
+            self.line.set_level(phone_player.HOOK_LINE, kind == "lift", bounce=argument, timestamp_ns=now)
+
+    def run(self):
+        """Play the whole trace, then let a call still in progress run out."""
+        started = time.perf_counter()
+        pending = [(self.origin_ns + int(seconds * 1e9), kind, argument)
+                   for seconds, kind, argument in self.trace]
+        i = 0
+        while True:
+            due = []
+            if i < len(pending):
+                due.append(pending[i][0])
+            if self.backend.next_due() is not None:
+                due.append(self.backend.next_due())
+            wake = self.player.wake_after()
+            if wake is not None:
+                due.append(self.clock.now_ns + int(wake * 1e9))
+            if not due:
+                break
+            self.clock.advance_to(min(due))
+            while i < len(pending) and pending[i][0] <= self.clock.now_ns:
+                self.apply(pending[i][1], pending[i][2])
+                i += 1
+            self.backend.advance()
+            was_lifted = self.player.lifted
+            self.player.step()
+            self.steps += 1
+            self.track_sessions(was_lifted)
+            self.check()
+        if self.session:
+            self.end_session()
+        self.player.cleanup()
+        return time.perf_counter() - started
+
+    def track_sessions(self, was_lifted):
+        player = self.player
+        if player.lifted and not was_lifted:
+            self.session = {"start": self.clock.now_ns, "furthest": 0, "dials": 0,
+                            "finished_before": len(self.backend.finished), "complete": False}
+        if self.session:
+            self.session["furthest"] = max(self.session["furthest"], player.current_track)
+            if self.backend.finished[self.session["finished_before"]:] and self.playlist_done():
+                self.session["complete"] = True
+        if was_lifted and not player.lifted and self.session:
+            self.end_session()
+
+    def end_session(self):
+        self.session["seconds"] = (self.clock.now_ns - self.session["start"]) / 1e9
+        self.sessions.append(self.session)
+        self.session = None
+
+    def playlist_done(self):
+        """The last chapter (or the whole story stream) played to its end."""
+        if not self.backend.finished:
+            return False
+        last = Path(self.backend.finished[-1]).name
+        return last in (self.player.tracks[-1], STORY_FILE)
+
+    def violation(self, kind, detail):
+        found = self.violations.setdefault(kind, [])
+        found.append(f"t={self.now_s():.3f}s {detail}")
+
+    def check(self):
+        player, backend = self.player, self.backend
+        now = self.clock.now_ns
+        settled = not player.settle_pending and now - player.last_edge_ns >= player.debounce_ns
+        line_lifted = self.line.levels[phone_player.HOOK_LINE]
+        if settled and player.lifted != line_lifted:
+            self.violation("hook-mismatch", f"player lifted={player.lifted}, line={line_lifted}")
+        if not player.lifted and backend.audible():
+            self.violation("sound-on-hook", f"{backend.track} audible")
+        if (player.lifted and backend.track is None and player.fault_ns is None
+                and not self.session_complete()):
+            self.violation("dead-air", f"chapter {player.current_track}, nothing playing")
+        if player.lifted and backend.track is not None and backend.muted:
+            self.violation("muted-off-hook", f"{backend.track} muted")
+        if backend.track is not None and not player.story_active:
+            expected = f"{phone_player.AUDIO_DIR}/{player.tracks[player.current_track]}"
+            if backend.track != expected:
+                self.violation("wrong-chapter", f"{backend.track} playing, chapter {player.current_track}")
+        if player.hangup_edge_ns is not None and now - player.hangup_edge_ns > TEARDOWN_LIMIT_S * 1e9:
+            self.violation("teardown-stuck", f"hang-up at {(player.hangup_edge_ns - self.origin_ns) / 1e9:.3f}s")
+        back_s = (now - backend.down_until_ns) / 1e9
+        if player.fault_ns is not None and back_s > phone_player.RECOVERY_RETRY_S * 1.5:
+            self.violation("recovery-stuck", f"device back {back_s:.3f}s ago")
+        if self.outage and backend.track is not None:
+            self.check_resume()
+
+    def check_resume(self):
+        """First play after a fault: same track, just before where the audio cut out."""
+        outage, self.outage = self.outage, None
+        backend = self.backend
+        if outage["moved"] or self.player.fault_streak[1] > phone_player.MAX_RECOVERIES:
+            return  # Ended by the caller (or given up on), not replayed
+        self.recoveries.append((self.clock.now_ns - outage["start"]) / 1e9)
+        earliest = outage["position"] - phone_player.RECOVERY_REWIND_S - RESUME_TOLERANCE_S
+        if backend.track != outage["track"] or not earliest <= backend.offset <= outage["position"]:
+            self.violation("wrong-resume", f"lost {outage['track']} at {outage['position']:.1f}s, "
+                                           f"resumed {backend.track} at {backend.offset:.1f}s")
+
+    def session_complete(self):
+        return self.session is not None and self.session["complete"]
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))] if ordered else 0.0
+
+
+def report(sim, wall_s):
+    simulated = sim.now_s()
+    sessions = sim.sessions
+    print(f"\nSimulated {simulated / 3600:.1f} h in {wall_s:.2f} s "
+          f"({simulated / max(wall_s, 1e-9):,.0f}x real time, {sim.steps} steps)")
+    tracks = sim.player.tracks
+    mode = "story stream" if sim.player.story else "chapter files"
+    print(f"Mode: {mode}; program {sum(mp3_seconds(f'{phone_player.AUDIO_DIR}/{t}') for t in tracks) / 60:.1f} min")
+
+    counts = sim.counter.counts
+    print(f"\nCalls: {len(sessions)}")
+    if sessions:
+        complete = sum(1 for s in sessions if s["complete"])
+        listen = [s["seconds"] for s in sessions]
+        print(f"  Completed playlist: {complete} ({complete / len(sessions):.0%})")
+        print(f"  Listen time: p50 {percentile(listen, 50):.0f}s, p90 {percentile(listen, 90):.0f}s, "
+              f"max {max(listen):.0f}s")
+        print(f"  Resumed: {counts['Resuming']}, dial jumps: {counts['Jump to chapter']}, "
+              f"invalid digits: {counts['Invalid chapter']}, "
+              f"pickups during teardown: {counts['Pickup during teardown']}")
+        print("\n  Reached chapter:")
+        for number, track in enumerate(tracks):
+            reached = sum(1 for s in sessions if s["furthest"] >= number)
+            print(f"    {number} {track:<22} {reached:>6} {reached / len(sessions):>6.0%}")
+
+    if sim.faults:
+        recoveries = sim.recoveries
+        print(f"\nDevice faults: {sim.faults}, recovered: {counts['Audio device recovered']}, "
+              f"reopen attempts: {sim.backend.reopens}, chapters skipped: {counts['Skipping']}")
+        if recoveries:
+            print(f"  Fault to replay: p50 {percentile(recoveries, 50) * 1000:.0f} ms, "
+                  f"p90 {percentile(recoveries, 90) * 1000:.0f} ms, max {max(recoveries) * 1000:.0f} ms "
+                  f"({len(recoveries)} replays)")
+
+    if not sim.violations:
+        print("\n✓ No invariant violations")
+        return True
+    print("\n✗ Invariant violations:")
+    for kind, found in sim.violations.items():
+        print(f"  {kind}: {len(found)}")
+        for example in found[:EXAMPLES]:
+            print(f"      {example}")
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the player state machine on a virtual clock")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--trace", type=Path, help="Scripted trace file")
+    source.add_argument("--log", type=Path, nargs="+", help="Replay production phone.log files")
+    source.add_argument("--random", action="store_true", help="Generate visitors at random")
+    parser.add_argument("--hours", type=float, default=24.0, help="Length of a random trace (default: 24)")
+    parser.add_argument("--seed", type=int, default=1, help="Random trace seed")
+    parser.add_argument("--faults", type=float, default=0.0, metavar="P",
+                        help="Fraction of random calls that lose the audio device (default: 0)")
+    parser.add_argument("--audio-dir", type=Path, default=PROJECT_ROOT / "src" / "audio",
+                        help="Chapter MP3s, for real durations (default: src/audio)")
+    parser.add_argument("--start-ms", type=int, default=START_MS, help="Simulated play-to-sound time")
+    parser.add_argument("--teardown-ms", type=int, default=TEARDOWN_MS, help="Simulated stop time")
+    parser.add_argument("--save-trace", type=Path, metavar="PATH", help="Write the trace used")
+    args = parser.parse_args()
+
+    try:
+        if args.trace:
+            trace = read_trace(args.trace)
+        elif args.log:
+            trace = parse_logs(args.log)
+        else:
+            tracks, _ = load_track_table(args.audio_dir)
+            program_s = sum(mp3_seconds(str(args.audio_dir / track)) for track in tracks)
+            trace = random_trace(random.Random(args.seed), args.hours, program_s, faults=args.faults)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    if args.save_trace:
+        write_trace(trace, args.save_trace)
+    print(f"Trace: {len(trace)} events")
+
+    sim = Simulation(trace, args.audio_dir, args.start_ms, args.teardown_ms)
+    wall_s = sim.run()
+    sys.exit(0 if report(sim, wall_s) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Del Monte HelloHistory - Persistent Audio Engine
+
+Keeps a single mpg123 running in remote-control mode (mpg123 -R) for the
+life of the player, so changing chapters is a LOAD command over a pipe
+instead of a fork/exec, decoder startup and ALSA device open.
+
+Commands go to mpg123's stdin; its status lines (@P, @S, @E, ...) are read
+on a background thread and turned into events. A self-pipe is written on
+every event, so the player can select() on fileno() alongside the GPIO fd
+and learn about track ends without polling.
+
+Events (from poll_events):
+    ("started", timestamp_ns)  - decoder produced the first frame of a track
+    ("ended", timestamp_ns)    - track played to the end (not a stop())
+    ("stopped", timestamp_ns)  - mpg123 acknowledged a stop() and is idle
+    ("error", message)         - the track could not be played (bad file, ...)
+    ("device_lost", message)   - the audio device failed or mpg123 died under
+                                 a track; reopen() and play it again
+"""
+
+import os
+import time
+import queue
+import threading
+import subprocess
+from pathlib import Path
+
+from bench_player import AudioBackend
+from metrics import DECODER_SPAWN
+
+# mpg123 @E messages that mean the output failed, not the track
+DEVICE_ERRORS = ("alsa", "audio output", "output device", "out123", "no such device",
+                 "device or resource busy")
+
+
+def is_device_error(message):
+    message = message.lower()
+    return any(pattern in message for pattern in DEVICE_ERRORS)
+
+
+class Mpg123RemoteBackend(AudioBackend):
+    """
+    Long-lived mpg123 process driven through its remote-control protocol.
+    """
+
+    def __init__(self, command=("mpg123", "-R")):
+        self.command = list(command)
+        self.process: subprocess.Popen | None = None
+        self.events = queue.Queue()
+        self.wake_r, self.wake_w = os.pipe()
+        os.set_blocking(self.wake_r, False)
+        os.set_blocking(self.wake_w, False)
+        self.lock = threading.Lock()
+        self.playing = False
+        self.loading = False
+        self.stop_requested = False
+        self.teardown = False  # STOP sent, @P 0 not yet seen
+        self.load_ns = 0
+        self.last_start_latency_ms = None
+        self.start()
+
+    def start(self) -> None:
+        """Spawn mpg123 and the thread that reads its status lines."""
+        started = time.perf_counter()
+        self.process = subprocess.Popen(
+            self.command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            bufsize=1,
+        )
+        DECODER_SPAWN.observe(time.perf_counter() - started)
+        self.reader = threading.Thread(
+            target=self.read_status, args=(self.process,), daemon=True
+        )
+        self.reader.start()
+        # No per-frame @F progress lines; they only cost CPU
+        self.send("SILENCE")
+
+    def send(self, command: str) -> None:
+        if self.process is None or self.process.poll() is not None:
+            self.start()
+        self.process.stdin.write(command + "\n")
+        self.process.stdin.flush()
+
+    def emit(self, event) -> None:
+        self.events.put(event)
+        try:
+            os.write(self.wake_w, b"!")
+        except BlockingIOError:
+            pass
+
+    def read_status(self, process) -> None:
+        """Translate mpg123 remote status lines into events (reader thread)."""
+        for line in process.stdout:
+            line = line.strip()
+            now = time.monotonic_ns()
+
+            with self.lock:
+                if line.startswith("@S") or line == "@P 2":
+                    if self.loading:
+                        self.loading = False
+                        self.playing = True
+                        self.last_start_latency_ms = (now - self.load_ns) / 1e6
+                        self.emit(("started", now))
+                elif line == "@P 0":
+                    if self.teardown:
+                        # mpg123 has let go of the last track, even if a new one is loading
+                        self.teardown = False
+                        self.emit(("stopped", now))
+                    if self.loading:
+                        continue  # Stale stop of the previous track
+                    was_playing = self.playing
+                    self.playing = False
+                    if was_playing and not self.stop_requested:
+                        self.emit(("ended", now))
+                    self.stop_requested = False
+                elif line.startswith("@E"):
+                    self.loading = False
+                    self.playing = False
+                    message = line[2:].strip()
+                    self.emit(("device_lost" if is_device_error(message) else "error", message))
+
+        # mpg123 exited underneath us (reopen() retires a process quietly)
+        status = process.wait()
+        with self.lock:
+            if process is self.process and (self.playing or self.loading):
+                self.playing = False
+                self.loading = False
+                self.emit(("device_lost", f"mpg123 exited with status {status}"))
+
+    def play(self, filepath: Path) -> None:
+        with self.lock:
+            self.loading = True
+            self.stop_requested = False
+            self.load_ns = time.monotonic_ns()
+            self.send(f"LOAD {filepath}")
+
+    def stop(self) -> None:
+        with self.lock:
+            if self.playing or self.loading:
+                self.stop_requested = True
+                self.teardown = True
+                self.loading = False
+                self.playing = False
+                self.send("STOP")
+
+    def reopen(self) -> bool:
+        """Start a fresh mpg123 after a device fault; it opens the device on the next LOAD."""
+        with self.lock:
+            self.playing = False
+            self.loading = False
+            self.teardown = False
+            old, self.process = self.process, None
+            if old and old.poll() is None:
+                old.kill()
+            self.start()
+        if old:
+            old.wait()
+        return True
+
+    def seek(self, seconds: float) -> None:
+        """Jump to an absolute position in the current track."""
+        with self.lock:
+            self.send(f"JUMP {seconds:.3f}s")
+
+    def is_playing(self) -> bool:
+        with self.lock:
+            return self.playing or self.loading
+
+    def fileno(self) -> int:
+        """Readable whenever there are events waiting in poll_events()."""
+        return self.wake_r
+
+    def poll_events(self) -> list:
+        """Drain pending engine events without blocking."""
+        try:
+            while os.read(self.wake_r, 64):
+                pass
+        except BlockingIOError:
+            pass
+
+        events = []
+        while True:
+            try:
+                events.append(self.events.get_nowait())
+            except queue.Empty:
+                return events
+
+    def cleanup(self) -> None:
+        if self.process and self.process.poll() is None:
+            try:
+                self.process.stdin.write("QUIT\n")
+                self.process.stdin.flush()
+                self.process.wait(timeout=0.5)
+            except (OSError, subprocess.TimeoutExpired):
+                self.process.kill()
+        self.process = None
+        os.close(self.wake_r)
+        os.close(self.wake_w)
@@ -35,6 +35,8 @@ from pathlib import Path
 from enum import Enum, auto
 from abc import ABC, abstractmethod
 
+from integrity import verify_now
+
 # Detect platform
 IS_MACOS = sys.platform == "darwin"
 IS_LINUX = sys.platform.startswith("linux")
@@ -202,6 +204,11 @@ class BenchPlayer:
             print(f"Warning: Missing audio files: {missing}")
             print(f"Looking in: {self.audio_dir.absolute()}")
         
+        # Compare against checksums.json, if built (make audio-checksums)
+        corrupt = verify_now(self.audio_dir, [filename for filename, name in self.tracks])
+        if corrupt:
+            print(f"Warning: Audio files don't match their checksums: {corrupt}")
+        
         # Store original terminal settings for restoration
         self.old_settings = None
     
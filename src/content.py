@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Del Monte HelloHistory - Hot Content Reload
+
+Replacing a chapter shouldn't mean restarting the player: the phone is
+dead until the service is back, and whoever is mid-story gets cut off.
+The ContentWatcher puts inotify watches on the audio directory, its pcm/
+and backup/ subdirectories, and on the directory holding each symlink on
+the way there, since a release deploy (make sync) swaps the src symlink
+instead of touching any file. The player selects on its fd alongside the
+hook line.
+
+Once changes have settled, the player rebuilds everything it derives
+from the audio on a background thread at idle priority - the track
+table (tracks.json, if any), story index, PCM heads or assets, frame
+indexes and checksums - as one Content, and swaps that in whole at the
+next moment the handset is down and the old audio has been let go. A
+call in progress always finishes on the content it started with.
+"""
+
+import os
+import ctypes
+import struct
+from pathlib import Path
+
+from pcm_assets import ASSET_DIR, MANIFEST
+from integrity import BACKUP_DIR
+
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_DELETE_SELF = 0x400
+IN_MOVE_SELF = 0x800
+IN_Q_OVERFLOW = 0x4000
+IN_ONLYDIR = 0x01000000
+CHANGES = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+GONE = IN_DELETE_SELF | IN_MOVE_SELF
+EVENT = struct.Struct("iIII")  # wd, mask, cookie, name length
+
+libc = ctypes.CDLL(None, use_errno=True)
+
+
+class Content:
+    """Everything the player reads out of the audio directory, swapped in as one."""
+
+    def __init__(self, tracks, gains, story=None, audio=None, checksums=None):
+        self.tracks = tracks
+        self.gains = gains
+        self.story = story  # StoryIndex, or None to play chapter files
+        self.audio = audio  # (assets, PCM cache, frame indexes) for a PrimedBackend
+        self.checksums = checksums  # checksums.json entries for the Verifier
+
+    def close(self):
+        """Free the PCM of content that was never swapped in (or has been swapped out)."""
+        if self.audio:
+            assets, cache, _ = self.audio
+            cache.close()
+            if assets:
+                assets.close()
+
+
+class ContentWatcher:
+    """inotify watches on the audio directory, re-placed when a release symlink moves."""
+
+    def __init__(self, audio_dir):
+        self.audio_dir = Path(audio_dir)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.watches = {}  # wd -> (directory, names that matter or None for all, re-arm on change)
+        self.arm()
+
+    def fileno(self):
+        return self.fd
+
+    def arm(self):
+        """Watch the directories the audio directory resolves to right now."""
+        for wd in self.watches:
+            libc.inotify_rm_watch(self.fd, wd)
+        self.watches = {}
+        path = Path(self.audio_dir.anchor)
+        for part in self.audio_dir.parts[1:]:
+            if (path / part).is_symlink():
+                # A deploy renames a new link over this one
+                self.watch(path, {part}, rearm=True)
+            path = (path / part).resolve()
+        self.watch(path, None)
+        self.watch(path / ASSET_DIR, {MANIFEST})
+        self.watch(path / BACKUP_DIR, None)
+
+    def watch(self, directory, names, rearm=False):
+        wd = libc.inotify_add_watch(self.fd, os.fsencode(directory), CHANGES | GONE | IN_ONLYDIR)
+        if wd >= 0:
+            self.watches[wd] = (directory, names, rearm)
+
+    def read_events(self):
+        """Drain pending events. Returns the audio files that changed (or the release that did)."""
+        changed = []
+        rearm = False
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = EVENT.unpack_from(data, offset)
+                name = data[offset + EVENT.size:offset + EVENT.size + length].rstrip(b"\0")
+                offset += EVENT.size + length
+                name = os.fsdecode(name)
+                if mask & IN_Q_OVERFLOW:
+                    changed.append("(events overflowed)")
+                    rearm = True
+                    continue
+                if wd not in self.watches:
+                    continue
+                directory, names, rearms = self.watches[wd]
+                if mask & GONE:
+                    changed.append(str(directory))
+                    rearm = True
+                elif relevant(name) and (names is None or name in names):
+                    changed.append(name if directory.name != BACKUP_DIR else f"{BACKUP_DIR}/{name}")
+                    if rearms or mask & IN_CREATE:
+                        rearm = True  # A new release, or pcm/ or backup/ may have appeared
+        if rearm:
+            self.arm()
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+def relevant(name):
+    """Skip dotfiles (.frames/ the player writes itself) and half-written temp files."""
+    return bool(name) and not name.startswith(".") and not name.endswith(".tmp")
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Del Monte HelloHistory - Sound Card Hotplug Monitor
+
+The USB audio adapter can drop off the bus and re-enumerate (a marginal
+cable, a brown-out). Writes to the old device then fail, but only once
+something is playing. This listens to the kernel's uevents on a netlink
+socket instead, so the player learns the card went away or came back the
+moment it happens, on an fd it can select() on with everything else.
+
+No udev bindings needed: the kernel broadcasts uevents to any process
+that binds the netlink group, and each one is a handful of KEY=value
+strings.
+"""
+
+import socket
+
+NETLINK_KOBJECT_UEVENT = 15
+KERNEL_GROUP = 1  # Raw kernel events (udev re-broadcasts on group 2)
+
+
+class DeviceMonitor:
+    """Sound card add/remove events from the kernel."""
+
+    def __init__(self):
+        self.sock = socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM, NETLINK_KOBJECT_UEVENT)
+        self.sock.bind((0, KERNEL_GROUP))
+        self.sock.setblocking(False)
+
+    def fileno(self):
+        return self.sock.fileno()
+
+    def read_events(self):
+        """Drain pending uevents. Returns [(action, card)] for whole sound cards."""
+        events = []
+        while True:
+            try:
+                data = self.sock.recv(8192)
+            except BlockingIOError:
+                return events
+            fields = dict(
+                item.split("=", 1) for item in data.decode(errors="replace").split("\0") if "=" in item
+            )
+            card = fields.get("DEVPATH", "").rsplit("/", 1)[-1]
+            # Each card also reports its pcm/control nodes; the card itself is enough
+            if fields.get("SUBSYSTEM") == "sound" and card.startswith("card"):
+                events.append((fields.get("ACTION"), card))
+
+    def close(self):
+        self.sock.close()
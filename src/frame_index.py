@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Del Monte HelloHistory - MP3 Frame Index
+
+A per-file table of frame byte offsets, so seeking to a time is an O(1)
+lookup instead of decoding (or header-scanning) from the start of the
+file. Built once with scripts/build_frame_index.py and cached in
+src/audio/.frames/ as a small binary file:
+
+    header  - magic, format, sample rate, samples per frame, frame count,
+              source size and mtime (to detect a replaced MP3)
+    body    - one little-endian uint32 byte offset per frame
+
+If a cache file is missing or stale the index is rebuilt in memory (a
+few tens of ms per chapter) and saved when the directory is writable.
+"""
+
+import os
+import sys
+import struct
+from array import array
+from pathlib import Path
+
+from mp3_frames import iter_frames
+
+INDEX_DIR = ".frames"
+MAGIC = b"HHFI"
+FORMAT = 1
+HEADER = struct.Struct("<4sHIHIQQ")
+
+
+class FrameIndex:
+    """Byte offset of every audio frame in one MP3 file."""
+
+    def __init__(self, offsets, sample_rate, samples_per_frame, source_size, source_mtime):
+        self.offsets = offsets
+        self.sample_rate = sample_rate
+        self.samples_per_frame = samples_per_frame
+        self.source_size = source_size
+        self.source_mtime = source_mtime
+
+    def __len__(self):
+        return len(self.offsets)
+
+    @classmethod
+    def build(cls, path):
+        path = Path(path)
+        data = path.read_bytes()
+        stat = path.stat()
+        offsets = array("I")
+        sample_rate = samples = 0
+        for frame in iter_frames(data):
+            offsets.append(frame.offset)
+            sample_rate, samples = frame.sample_rate, frame.samples
+        return cls(offsets, sample_rate, samples, stat.st_size, stat.st_mtime_ns)
+
+    def frame_at(self, seconds):
+        """Frame that contains a time position, clamped to the file."""
+        # Tiny epsilon so exact frame boundaries don't floor to the frame before
+        frame = int(seconds * self.sample_rate / self.samples_per_frame + 1e-6)
+        return max(0, min(frame, len(self.offsets) - 1))
+
+    def byte_offset(self, frame):
+        return self.offsets[frame]
+
+    def seconds(self, frame):
+        return frame * self.samples_per_frame / self.sample_rate
+
+    def matches(self, path):
+        stat = Path(path).stat()
+        return (stat.st_size, stat.st_mtime_ns) == (self.source_size, self.source_mtime)
+
+    def save(self, index_path):
+        index_path = Path(index_path)
+        index_path.parent.mkdir(exist_ok=True)
+        tmp_path = index_path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(HEADER.pack(
+                MAGIC, FORMAT, self.sample_rate, self.samples_per_frame,
+                len(self.offsets), self.source_size, self.source_mtime,
+            ))
+            offsets = array("I", self.offsets)
+            if sys.byteorder == "big":
+                offsets.byteswap()
+            f.write(offsets.tobytes())
+        os.replace(tmp_path, index_path)
+
+    @classmethod
+    def load(cls, index_path):
+        data = Path(index_path).read_bytes()
+        magic, fmt, rate, spf, count, size, mtime = HEADER.unpack_from(data)
+        if magic != MAGIC or fmt != FORMAT:
+            raise ValueError(f"{index_path}: not a frame index")
+        offsets = array("I")
+        offsets.frombytes(data[HEADER.size:HEADER.size + 4 * count])
+        if sys.byteorder == "big":
+            offsets.byteswap()
+        return cls(offsets, rate, spf, size, mtime)
+
+
+def index_path_for(path):
+    path = Path(path)
+    return path.parent / INDEX_DIR / (path.name + ".idx")
+
+
+def load_or_build(path, save=True):
+    """Cached index for an MP3, rebuilding it if missing or stale."""
+    index_path = index_path_for(path)
+    try:
+        index = FrameIndex.load(index_path)
+        if index.matches(path):
+            return index
+    except (OSError, ValueError, struct.error):
+        pass
+
+    index = FrameIndex.build(path)
+    if save:
+        try:
+            index.save(index_path)
+        except OSError:
+            pass  # Read-only audio dir under systemd; keep it in memory
+    return index
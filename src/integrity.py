@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Del Monte HelloHistory - Background Audio Integrity Check
+
+SD cards in always-on Pis corrupt files, and a damaged chapter otherwise
+only shows up as a guest hearing garbage or nothing. checksums.json, next
+to the chapters (scripts/build_checksums.py, run by deploy), records the
+size and SHA-256 of every chapter, the story stream and the known-good
+copies in backup/:
+
+    {"format": 1, "files": {"01_welcome.mp3": {"size": ..., "sha256": ...},
+                            "backup/01_welcome.mp3": {...}, ...}}
+
+The Verifier re-hashes them on a background thread at idle CPU and I/O
+priority, in small reads with a pause after each, and only while the
+handset is down. Results are cached against each file's size and mtime
+(in the writable logs directory), so a reboot re-reads nothing that
+hasn't changed; a file is re-read anyway once its last check is older
+than REVERIFY_S, since rot doesn't touch the mtime. A chapter that fails
+is played from its backup copy instead, once that copy has checked out.
+"""
+
+import os
+import json
+import time
+import ctypes
+import hashlib
+import logging
+import platform
+import threading
+from pathlib import Path
+
+from prefetch import resident_fraction
+
+log = logging.getLogger("phone")
+
+CHECKSUM_FILE = "checksums.json"
+CHECKSUM_FORMAT = 1
+BACKUP_DIR = "backup"
+READ_BYTES = 64 * 1024  # One read per pause; a pickup waits behind at most this
+READ_RATE_MB = 2  # Throttle: average MB/s off the card
+REVERIFY_S = 7 * 24 * 3600  # Re-read files whose last check is older than this
+IDLE_WAIT_S = 60  # Between passes, and before the first one
+
+# ioprio_set(2) has no libc wrapper; syscall numbers per architecture
+IOPRIO_SYSCALL = {"x86_64": 251, "aarch64": 30, "armv7l": 314, "armv6l": 314}
+IOPRIO_WHO_PROCESS = 1
+IOPRIO_CLASS_IDLE = 3 << 13
+
+
+def sha256_file(path, stopping=None, pause_s=0.0, gate=None):
+    """
+    SHA-256 of a file, READ_BYTES at a time with pause_s after each read
+    and, if given, waiting for the gate event before each. Returns None if
+    stopping is set part way through.
+
+    Blocks that weren't in the page cache are dropped again once read, so
+    a pass doesn't push out what playback and the Prefetcher warmed; blocks
+    that were are left there (and hashed from memory).
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        fd = f.fileno()
+        if hasattr(os, "posix_fadvise"):
+            # No readahead: it would pull in the next block before it is probed
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_RANDOM)
+        offset = 0
+        while True:
+            if gate is not None:
+                gate.wait()
+            cold = hasattr(os, "posix_fadvise") and resident_fraction(fd, offset, READ_BYTES) == 0
+            block = f.read(READ_BYTES)
+            if not block:
+                return digest.hexdigest()
+            digest.update(block)
+            if cold:
+                os.posix_fadvise(fd, offset, len(block), os.POSIX_FADV_DONTNEED)
+            offset += len(block)
+            if stopping is not None and stopping.wait(pause_s):
+                return None
+
+
+def checked_names(audio_dir, tracks, story_file):
+    """Names the manifest covers: chapters, the story stream and backup copies that exist."""
+    audio_dir = Path(audio_dir)
+    names = list(tracks)
+    if (audio_dir / story_file).exists():
+        names.append(story_file)
+    names += [f"{BACKUP_DIR}/{name}" for name in tracks if (audio_dir / BACKUP_DIR / name).exists()]
+    return names
+
+
+def write_manifest(audio_dir, names):
+    """Hash names (relative to audio_dir) into checksums.json. Returns the file entries."""
+    audio_dir = Path(audio_dir)
+    files = {}
+    for name in names:
+        path = audio_dir / name
+        if path.exists():
+            files[name] = {"size": path.stat().st_size, "sha256": sha256_file(path)}
+    tmp_path = audio_dir / (CHECKSUM_FILE + ".tmp")
+    tmp_path.write_text(json.dumps({"format": CHECKSUM_FORMAT, "files": files}, indent=1) + "\n")
+    os.replace(tmp_path, audio_dir / CHECKSUM_FILE)
+    return files
+
+
+def load_manifest(audio_dir):
+    """The file entries of checksums.json, or None if it is missing or unreadable."""
+    try:
+        manifest = json.loads((Path(audio_dir) / CHECKSUM_FILE).read_text())
+    except (OSError, ValueError):
+        return None
+    if manifest.get("format") != CHECKSUM_FORMAT:
+        return None
+    return manifest["files"]
+
+
+def verify_now(audio_dir, names):
+    """Unthrottled check (bench player, tools): names that don't match checksums.json."""
+    files = load_manifest(audio_dir)
+    if files is None:
+        return []
+    failed = []
+    for name in names:
+        expected = files.get(name)
+        path = Path(audio_dir) / name
+        if expected is None or not path.exists():
+            continue
+        if path.stat().st_size != expected["size"] or sha256_file(path) != expected["sha256"]:
+            failed.append(name)
+    return failed
+
+
+def lower_priority():
+    """Idle I/O class and lowest CPU priority for the calling thread (Linux)."""
+    tid = threading.get_native_id()
+    try:
+        os.setpriority(os.PRIO_PROCESS, tid, 19)
+    except OSError:
+        pass
+    number = IOPRIO_SYSCALL.get(platform.machine())
+    if number is None:
+        return  # Best-effort I/O priority still follows the nice level
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        libc.syscall(number, IOPRIO_WHO_PROCESS, tid, IOPRIO_CLASS_IDLE)
+    except (OSError, AttributeError):
+        pass
+
+
+class Verifier:
+    """
+    Background re-hash of the files in checksums.json. Call idle(True)
+    while nobody is listening; reads only happen then.
+    """
+
+    def __init__(self, audio_dir, files, cache_path, rate_mb=READ_RATE_MB):
+        self.audio_dir = Path(audio_dir)
+        self.files = files
+        self.cache_path = Path(cache_path)
+        self.pause_s = READ_BYTES / (rate_mb * 1024 * 1024)
+        self.status = {}  # name -> "ok", "corrupt" or "missing"
+        self.lock = threading.Lock()
+        self.ready = threading.Event()  # Set while idle
+        self.stopping = threading.Event()
+        self.thread = None
+        self.cache = self.load_cache()
+
+    def load_cache(self):
+        """{name: {"size", "mtime_ns", "ok", "checked"}} from the last run."""
+        try:
+            return json.loads(self.cache_path.read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def save_cache(self):
+        try:
+            tmp_path = self.cache_path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps(self.cache))
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            log.warning(f"Integrity: could not save {self.cache_path}: {e}")
+
+    def start(self, idle=True):
+        self.idle(idle)
+        self.thread = threading.Thread(target=self.run, name="verify", daemon=True)
+        self.thread.start()
+
+    def idle(self, idle):
+        """Allow reads (handset down) or hold them off (a call in progress)."""
+        if idle:
+            self.ready.set()
+        else:
+            self.ready.clear()
+
+    def stop(self):
+        self.stopping.set()
+        self.ready.set()
+        if self.thread:
+            self.thread.join()
+
+    def playable(self, name):
+        """File to play for a chapter: its backup copy if it failed and the copy didn't."""
+        backup = f"{BACKUP_DIR}/{name}"
+        with self.lock:
+            if self.status.get(name, "ok") != "ok" and self.status.get(backup) == "ok":
+                return backup
+        return name
+
+    def failed(self, name):
+        with self.lock:
+            return self.status.get(name, "ok") != "ok"
+
+    def run(self):
+        lower_priority()
+        while not self.stopping.wait(IDLE_WAIT_S):
+            started = time.monotonic()
+            counts = {"ok": 0, "corrupt": 0, "missing": 0}
+            read = 0
+            for name in self.order():
+                result = self.check(name)
+                if result is None:
+                    return  # Stopping
+                status, was_read = result
+                counts[status] += 1
+                read += was_read
+                self.record(name, status)
+            if read:
+                log.info(f"Integrity: {counts['ok']} ok, {counts['corrupt']} corrupt, "
+                         f"{counts['missing']} missing ({read} re-read "
+                         f"in {time.monotonic() - started:.0f}s)")
+
+    def order(self):
+        """Chapters and the story stream first, then the backups they fall back on."""
+        return sorted(self.files, key=lambda name: name.startswith(BACKUP_DIR + "/"))
+
+    def check(self, name):
+        """(status, whether the file was read), or None if stopping."""
+        path = self.audio_dir / name
+        expected = self.files[name]
+        try:
+            stat = path.stat()
+        except OSError:
+            return "missing", False
+        if stat.st_size != expected["size"]:
+            return "corrupt", False
+        cached = self.cache.get(name)
+        if (cached and (cached["size"], cached["mtime_ns"]) == (stat.st_size, stat.st_mtime_ns)
+                and time.time() - cached["checked"] < REVERIFY_S):
+            return ("ok" if cached["ok"] else "corrupt"), False
+        try:
+            # Reads wait for the handset to go down, also part way through a file
+            digest = sha256_file(path, self.stopping, self.pause_s, self.ready)
+        except OSError as e:
+            log.warning(f"Integrity: could not read {name}: {e}")
+            return "corrupt", True
+        if digest is None:
+            return None
+        ok = digest == expected["sha256"]
+        self.cache[name] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+                            "ok": ok, "checked": time.time()}
+        self.save_cache()
+        return ("ok" if ok else "corrupt"), True
+
+    def record(self, name, status):
+        with self.lock:
+            previous = self.status.get(name)
+            self.status[name] = status
+        if status == previous or (status == "ok" and previous is None):
+            return
+        if status == "ok":
+            log.info(f"Integrity: {name} checks out again")
+        elif name.startswith(BACKUP_DIR + "/"):
+            log.warning(f"Integrity: backup copy {name} is {status}")
+        else:
+            backup = self.audio_dir / BACKUP_DIR / name
+            fallback = f"falling back to {BACKUP_DIR}/{name}" if backup.exists() else "no backup copy"
+            log.error(f"Integrity: {name} is {status} - {fallback}")
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Del Monte HelloHistory - Background Logging
+
+Keeps SD-card writes off the playback control loop. Log calls only put
+the record on a queue; a writer thread formats records, sends them to
+the journal and appends them to the log file in batches, at most once
+per flush interval (errors are written straight away).
+
+The file is rotated by size (in bytes, as written) and by age (counted
+from the timestamp on its first line, or from phone.log.start where that
+doesn't parse, so restarts and power cuts don't reset it), keeping a
+few numbered backups (phone.log.1, phone.log.2, ...) in the same
+directory - the only one the service is allowed to write to
+(ReadWritePaths in hellohistory.service).
+"""
+
+import os
+import sys
+import time
+import queue
+import logging
+import threading
+import logging.handlers
+
+FLUSH_INTERVAL_S = 2.0  # Longest a line waits in memory before hitting the card
+MAX_BATCH = 256  # Lines buffered before an early flush
+MAX_BYTES = 5 * 1024 * 1024  # Rotate when the file would grow past this
+MAX_AGE_S = 7 * 24 * 3600  # ...or when its first line is this old
+BACKUP_COUNT = 4  # Rotated files kept
+STARTED_SUFFIX = ".start"  # Sidecar holding when the current file was started
+QUEUE_SIZE = 10000  # Records held for the writer before new ones are dropped
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that never blocks or raises when the queue is full."""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class BatchingFileHandler(logging.Handler):
+    """
+    Appends formatted lines to a file in batches, rotating by size and age.
+    Only called from the writer thread.
+    """
+
+    def __init__(self, path, max_bytes=MAX_BYTES, max_age_s=MAX_AGE_S,
+                 backup_count=BACKUP_COUNT):
+        super().__init__()
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_age_s = max_age_s
+        self.backup_count = backup_count
+        self.lines = []
+        self.stream = None
+        self.size = 0
+        self.started_at = 0.0  # When the current file's first line was written
+        self.open()
+
+    def open(self):
+        self.stream = open(self.path, "ab")
+        self.size = self.stream.tell()
+        self.started_at = file_started(self.path, fresh=not self.size)
+
+    def emit(self, record):
+        try:
+            self.lines.append(self.format(record) + "\n")
+        except Exception:
+            self.handleError(record)
+            return
+        if len(self.lines) >= MAX_BATCH or record.levelno >= logging.ERROR:
+            self.flush()
+
+    def flush(self):
+        if not self.lines or self.stream is None:
+            return
+        data = "".join(self.lines).encode("utf-8", errors="backslashreplace")
+        self.lines = []
+        try:
+            if self.should_rotate(len(data)):
+                self.rotate()
+            self.stream.write(data)
+            self.stream.flush()
+            self.size += len(data)
+        except OSError as e:
+            sys.stderr.write(f"Log write failed: {e}\n")
+
+    def should_rotate(self, incoming):
+        if not self.size:
+            return False
+        return (self.size + incoming > self.max_bytes
+                or time.time() - self.started_at > self.max_age_s)
+
+    def rotate(self):
+        self.stream.close()
+        for n in range(self.backup_count - 1, 0, -1):
+            source = f"{self.path}.{n}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{n + 1}")
+        if self.backup_count:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self.open()
+
+    def close(self):
+        self.flush()
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+        super().close()
+
+
+def file_started(path, fresh=False):
+    """
+    When a log file was started: the time on its first line (asctime, as
+    setup_pipeline formats it), else the one in its .start sidecar. Every
+    write moves the mtime and ctime, so neither will do. A fresh file, or
+    one with neither, is stamped as starting now.
+    """
+    sidecar = f"{path}{STARTED_SUFFIX}"
+    if not fresh:
+        try:
+            with open(path, "rb") as f:
+                first = f.readline(64).decode(errors="replace")
+            return time.mktime(time.strptime(first[:19], "%Y-%m-%d %H:%M:%S"))
+        except ValueError:
+            pass
+        try:
+            with open(sidecar) as f:
+                return float(f.read())
+        except (OSError, ValueError):
+            pass
+    now = time.time()
+    try:
+        with open(sidecar, "w") as f:
+            f.write(f"{now:.0f}\n")
+    except OSError as e:
+        sys.stderr.write(f"Log start not recorded: {e}\n")
+    return now
+
+
+class LogPipeline:
+    """
+    Routes the "phone" logger (and anything else on the root logger)
+    through a queue to handlers run on a background writer thread.
+    """
+
+    def __init__(self, handlers, flush_interval=FLUSH_INTERVAL_S, queue_size=QUEUE_SIZE):
+        self.handlers = handlers
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue(queue_size)
+        self.handler = DroppingQueueHandler(self.queue)
+        self.thread = threading.Thread(target=self.run, name="log-writer", daemon=True)
+        self.stopping = object()
+
+    def start(self):
+        self.thread.start()
+
+    def run(self):
+        next_flush = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                record = self.queue.get(timeout=max(0.0, next_flush - time.monotonic()))
+            except queue.Empty:
+                record = None
+            if record is self.stopping:
+                return
+            if record is not None:
+                for handler in self.handlers:
+                    if record.levelno >= handler.level:
+                        handler.handle(record)
+            if time.monotonic() >= next_flush:
+                for handler in self.handlers:
+                    handler.flush()
+                next_flush = time.monotonic() + self.flush_interval
+
+    def stop(self):
+        """Write out everything queued so far and close the handlers."""
+        if self.thread.is_alive():
+            self.queue.put(self.stopping)
+            self.thread.join(timeout=5)
+        for handler in self.handlers:
+            handler.close()
+        if self.handler.dropped:
+            sys.stderr.write(f"Log queue overflowed: {self.handler.dropped} records dropped\n")
+
+
+def setup_pipeline(log_file, level=logging.INFO, fmt="%(asctime)s - %(message)s",
+                   flush_interval=FLUSH_INTERVAL_S, journal=True, extra_handlers=()):
+    """
+    Install the queue handler on the root logger and start the writer.
+    extra_handlers also run on the writer thread, with their own formatting.
+    """
+    formatter = logging.Formatter(fmt)
+    handlers = [BatchingFileHandler(log_file)]
+    if journal:
+        handlers.append(logging.StreamHandler())
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    handlers.extend(extra_handlers)
+
+    pipeline = LogPipeline(handlers, flush_interval)
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(pipeline.handler)
+    pipeline.start()
+    return pipeline
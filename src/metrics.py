@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Del Monte HelloHistory - Runtime Metrics
+
+In-memory counters and fixed-bucket histograms for the phone player,
+written out now and then as a Prometheus textfile (for node_exporter's
+textfile collector, or just cat) into the logs directory:
+
+    hellohistory_pickups_total 42
+    hellohistory_pickup_to_sound_seconds_bucket{le="0.05"} 40
+    ...
+
+Recording is a couple of integer adds into storage allocated at import:
+no dicts, strings or lists are created on the hot path, and nothing
+touches the SD card. Formatting and the write happen on the exporter
+thread, once a minute, as a temp file renamed over the last one, so a
+reader never sees half a file.
+
+Updates aren't locked. A count lost to a race between threads costs
+less than a lock taken on every loop iteration would.
+"""
+
+import os
+import logging
+import threading
+from array import array
+from bisect import bisect_left
+
+from tracks import MAX_TRACKS
+
+log = logging.getLogger("phone")
+
+EXPORT_INTERVAL_S = 60.0
+
+# Bucket upper bounds, seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+LOOP_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.1)
+LISTEN_BUCKETS = (5, 15, 30, 60, 120, 240, 480, 900)
+
+
+class Counter:
+    def __init__(self, name, help_text, **labels):
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self.value = 0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+    def samples(self):
+        yield self.name, self.labels, self.value
+
+
+class Histogram:
+    def __init__(self, name, help_text, buckets, **labels):
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self.bounds = tuple(buckets)
+        self.counts = array("Q", bytes(8 * (len(self.bounds) + 1)))  # Last one: +Inf
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+    def samples(self):
+        cumulative = 0
+        for bound, count in zip(self.bounds + ("+Inf",), self.counts):
+            cumulative += count
+            yield f"{self.name}_bucket", {**self.labels, "le": str(bound)}, cumulative
+        yield f"{self.name}_sum", self.labels, self.sum
+        yield f"{self.name}_count", self.labels, cumulative
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def counter(self, name, help_text, **labels):
+        return self.add(Counter(name, help_text, **labels))
+
+    def histogram(self, name, help_text, buckets, **labels):
+        return self.add(Histogram(name, help_text, buckets, **labels))
+
+    def add(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        """Prometheus text exposition format; one HELP/TYPE per name."""
+        lines = []
+        described = set()
+        for metric in self.metrics:
+            if metric.name not in described:
+                described.add(metric.name)
+                kind = "counter" if isinstance(metric, Counter) else "histogram"
+                lines.append(f"# HELP {metric.name} {metric.help}")
+                lines.append(f"# TYPE {metric.name} {kind}")
+            for name, labels, value in metric.samples():
+                label_text = ",".join(f'{key}="{val}"' for key, val in labels.items())
+                lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(self.render())
+        os.replace(tmp_path, path)
+
+
+REGISTRY = Registry()
+
+PICKUPS = REGISTRY.counter("hellohistory_pickups_total", "Handset lifts")
+HANGUPS = REGISTRY.counter("hellohistory_hangups_total", "Handset hang-ups")
+PICKUP_TO_SOUND = REGISTRY.histogram(
+    "hellohistory_pickup_to_sound_seconds", "Hook edge to first audio frame", LATENCY_BUCKETS)
+DECODER_SPAWN = REGISTRY.histogram(
+    "hellohistory_decoder_spawn_seconds", "Time to start a decoder process", LATENCY_BUCKETS)
+LOOP_TIME = REGISTRY.histogram(
+    "hellohistory_loop_seconds", "Main loop work per iteration, excluding the wait", LOOP_BUCKETS)
+LISTEN = [
+    REGISTRY.histogram("hellohistory_listen_seconds", "Time spent listening to a chapter per visit",
+                       LISTEN_BUCKETS, chapter=str(number))
+    for number in range(MAX_TRACKS)  # A reload may add chapters
+]
+ERRORS = {
+    kind: REGISTRY.counter("hellohistory_errors_total", "Errors by kind", kind=kind)
+    for kind in ("track", "device", "loop")
+}
+CHAPTER_STARTS = REGISTRY.counter(
+    "hellohistory_chapter_starts_total", "Chapter starts checked against the page cache")
+CHAPTER_CACHE_HITS = REGISTRY.counter(
+    "hellohistory_chapter_cache_hits_total", "Chapter starts whose opening was already cached")
+
+
+class Exporter:
+    """Writes the registry to a textfile every interval_s, and once more on stop() if started."""
+
+    def __init__(self, path, registry=REGISTRY, interval_s=EXPORT_INTERVAL_S):
+        self.path = path
+        self.registry = registry
+        self.interval_s = interval_s
+        self.stopping = threading.Event()
+        self.thread = threading.Thread(target=self.run, name="metrics", daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def run(self):
+        while not self.stopping.wait(self.interval_s):
+            self.export()
+
+    def export(self):
+        try:
+            self.registry.write(self.path)
+        except OSError as e:
+            log.warning(f"Metrics: could not write {self.path}: {e}")
+
+    def stop(self):
+        if not self.thread.is_alive():
+            return
+        self.stopping.set()
+        self.thread.join()
+        self.export()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Del Monte HelloHistory - Output Mixer Control
+
+Mutes the earpiece at the ALSA mixer the instant the handset goes down,
+so silence doesn't wait for the decoder to stop or for audio already
+queued in the device buffer to drain.
+
+Uses the ALSA control API in-process through pyalsaaudio. Without it,
+falls back to a fire-and-forget amixer call that is never waited on from
+the playback loop.
+
+Also levels the chapters: set_gain() offsets the volume by a chapter's
+gain in dB (tracks.TRACK_GAIN_DB) with one control write, relative to
+the level set_volume() chose. That needs a control with a dB scale and
+the bindings; otherwise chapters play at the base volume.
+"""
+
+import logging
+import subprocess
+
+try:
+    import alsaaudio
+except ImportError:
+    alsaaudio = None
+
+log = logging.getLogger("phone")
+
+
+class Mixer:
+    """Mute/unmute one ALSA simple mixer control (e.g. "Speaker")."""
+
+    def __init__(self, control="Speaker"):
+        self.control = control
+        self.mixer = None
+        self.can_mute = False
+        self.muted = False
+        self.saved_volume = None
+        self.base_db = None  # Hundredths of a dB, read back after set_volume()
+        self.db_range = None
+        self.gain_db = 0.0
+        if alsaaudio is None:
+            return
+        try:
+            self.mixer = alsaaudio.Mixer(control)
+            self.can_mute = any("Mute" in cap for cap in self.mixer.switchcap())
+        except alsaaudio.ALSAAudioError as e:
+            log.warning(f"Mixer: no control '{control}': {e}")
+
+    def reset(self):
+        """
+        The card re-enumerated: take a fresh handle and forget our mute
+        state, since its controls are back at their defaults.
+        """
+        self.muted = False
+        self.saved_volume = None
+        self.gain_db = 0.0
+        if alsaaudio is None:
+            return
+        try:
+            self.mixer = alsaaudio.Mixer(self.control)
+        except alsaaudio.ALSAAudioError as e:
+            log.warning(f"Mixer: no control '{self.control}': {e}")
+            self.mixer = None
+
+    def set_volume(self, percent):
+        """Set playback volume. Blocks on amixer when there are no ALSA bindings."""
+        if self.mixer is None:
+            subprocess.run(["amixer", "-q", "set", self.control, f"{percent}%"],
+                           capture_output=True, check=True)
+            return
+        if self.saved_volume is not None:
+            self.saved_volume = percent  # Muted by volume; applied on unmute
+        else:
+            self.mixer.setvolume(percent)
+        self.read_db_scale()
+
+    def read_db_scale(self):
+        """Remember the base level in dB so chapter gains are relative to it."""
+        self.gain_db = 0.0
+        if self.mixer is None or self.saved_volume is not None:
+            return
+        try:
+            self.db_range = self.mixer.getrange(units=alsaaudio.VOLUME_UNITS_DB)
+            self.base_db = self.mixer.getvolume(units=alsaaudio.VOLUME_UNITS_DB)[0]
+        except (alsaaudio.ALSAAudioError, AttributeError, TypeError) as e:
+            # Older bindings have no dB units; some controls have no dB scale
+            log.warning(f"Mixer: no dB scale on '{self.control}', chapter gain disabled: {e}")
+            self.base_db = None
+
+    def set_gain(self, db):
+        """Play at the base volume offset by db (clamped to the control's range)."""
+        if self.base_db is None or db == self.gain_db:
+            return
+        low, high = self.db_range
+        target = min(max(self.base_db + round(db * 100), low), high)
+        try:
+            self.mixer.setvolume(target, units=alsaaudio.VOLUME_UNITS_DB)
+            self.gain_db = db
+        except alsaaudio.ALSAAudioError as e:
+            log.warning(f"Mixer: could not apply {db:+.1f} dB: {e}")
+
+    def mute(self):
+        if not self.muted:
+            self.muted = True
+            self.set_muted(True)
+
+    def unmute(self):
+        if self.muted:
+            self.muted = False
+            self.set_muted(False)
+
+    def set_muted(self, muted):
+        if self.mixer is None:
+            # No ALSA bindings: don't wait for amixer, just start it
+            subprocess.Popen(
+                ["amixer", "-q", "set", self.control, "mute" if muted else "unmute"],
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            )
+            return
+        try:
+            if self.can_mute:
+                self.mixer.setmute(1 if muted else 0)
+            elif muted:
+                # No mute switch on this adapter: drop to zero and restore later
+                self.saved_volume = self.mixer.getvolume()[0]
+                self.mixer.setvolume(0)
+            elif self.saved_volume is not None:
+                self.mixer.setvolume(self.saved_volume)
+                self.saved_volume = None
+        except alsaaudio.ALSAAudioError as e:
+            log.warning(f"Mixer: could not {'mute' if muted else 'unmute'}: {e}")
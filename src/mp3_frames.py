@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Del Monte HelloHistory - MP3 Frame Parsing
+
+Just enough of the MPEG audio frame header to walk a file frame by frame
+without decoding it: byte offset, size and sample count of every frame.
+Used to build the gapless story stream and its chapter seek table.
+"""
+
+from collections import namedtuple
+
+# Bitrates in kbps, indexed [version_is_mpeg1][layer][index]
+BITRATES = {
+    True: {
+        1: (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+        2: (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+        3: (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    },
+    False: {
+        1: (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+        2: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+        3: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    },
+}
+SAMPLE_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+
+
+# offset      - byte offset of the frame header in the file
+# size        - frame length in bytes, header included
+# samples     - PCM samples per channel this frame decodes to
+# A namedtuple rather than a dataclass: importing dataclasses costs startup time
+Frame = namedtuple("Frame", "offset size samples sample_rate channels")
+
+
+def parse_header(data, offset):
+    """Parse the 4-byte frame header at offset. Returns a Frame or None."""
+    if offset + 4 > len(data):
+        return None
+    b1, b2, b3 = data[offset + 1], data[offset + 2], data[offset + 3]
+    if data[offset] != 0xFF or (b1 & 0xE0) != 0xE0:
+        return None
+
+    version = (b1 >> 3) & 0x03   # 3 = MPEG1, 2 = MPEG2, 0 = MPEG2.5
+    layer = 4 - ((b1 >> 1) & 0x03)
+    bitrate_index = b2 >> 4
+    rate_index = (b2 >> 2) & 0x03
+    if version == 1 or layer == 4 or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+
+    mpeg1 = version == 3
+    bitrate = BITRATES[mpeg1][layer][bitrate_index] * 1000
+    sample_rate = SAMPLE_RATES[version][rate_index]
+    padding = (b2 >> 1) & 0x01
+    channels = 1 if (b3 >> 6) == 3 else 2
+
+    if layer == 1:
+        samples = 384
+        size = (12 * bitrate // sample_rate + padding) * 4
+    else:
+        samples = 1152 if (layer == 2 or mpeg1) else 576
+        size = samples // 8 * bitrate // sample_rate + padding
+
+    return Frame(offset, size, samples, sample_rate, channels)
+
+
+def audio_start(data):
+    """Offset of the first byte after any ID3v2 tag."""
+    if data[:3] != b"ID3" or len(data) < 10:
+        return 0
+    size = 0
+    for byte in data[6:10]:
+        size = (size << 7) | (byte & 0x7F)
+    footer = 10 if data[5] & 0x10 else 0
+    return 10 + size + footer
+
+
+def is_info_frame(data, frame):
+    """True for a Xing/Info/VBRI header frame, which carries no audio."""
+    if frame.samples == 1152:  # MPEG1 Layer III
+        side_info = 32 if frame.channels == 2 else 17
+    else:
+        side_info = 17 if frame.channels == 2 else 9
+    xing = frame.offset + 4 + side_info
+    vbri = frame.offset + 4 + 32
+    return (data[xing:xing + 4] in (b"Xing", b"Info")
+            or data[vbri:vbri + 4] == b"VBRI")
+
+
+def silent_frame(header):
+    """
+    A frame in the same format as the 4-byte header that decodes to
+    silence: no padding, no CRC, all-zero side info and main data.
+    """
+    header = bytes([header[0], header[1] | 0x01, header[2] & 0xFD, header[3]])
+    frame = parse_header(header, 0)
+    return header + bytes(frame.size - 4)
+
+
+def iter_frames(data, skip_info=True):
+    """
+    Yield every audio frame in an MP3 file's bytes. Resynchronises past
+    junk between frames and stops at a trailing ID3v1 tag.
+    """
+    offset = audio_start(data)
+    first = True
+    while offset + 4 <= len(data):
+        if data[offset:offset + 3] == b"TAG" and len(data) - offset == 128:
+            return
+        frame = parse_header(data, offset)
+        if frame is None or frame.size <= 4:
+            offset += 1
+            continue
+        if not (first and skip_info and is_info_frame(data, frame)):
+            yield frame
+        first = False
+        offset += frame.size
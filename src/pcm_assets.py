@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Del Monte HelloHistory - Pre-Decoded PCM Assets
+
+Chapters transcoded offline (scripts/build_pcm_assets.py) to the audio
+adapter's native sample rate, channel count and sample format, stored as
+raw interleaved little-endian PCM in src/audio/pcm/ with a manifest:
+
+    {"format": 1, "rate": 48000, "channels": 2, "sample_format": "S16_LE",
+     "files": {"01_welcome.mp3": {"file": "01_welcome.pcm", "frames": ...,
+               "bytes": ..., "sha256": ..., "source_size": ...,
+               "source_mtime_ns": ...}, ...}}
+
+The player memory-maps these and writes them straight to the device: no
+decoder process and no resampling anywhere in the playback path.
+"""
+
+import json
+import mmap
+from pathlib import Path
+
+ASSET_DIR = "pcm"
+MANIFEST = "manifest.json"
+MANIFEST_FORMAT = 1
+SAMPLE_BYTES = {"S16_LE": 2, "S24_3LE": 3, "S32_LE": 4}
+
+
+class PcmAssets:
+    """Memory-mapped raw PCM for a set of source MP3s, all in one format."""
+
+    def __init__(self, directory, manifest):
+        self.directory = Path(directory)
+        self.rate = manifest["rate"]
+        self.channels = manifest["channels"]
+        self.sample_format = manifest["sample_format"]
+        self.frame_bytes = self.channels * SAMPLE_BYTES[self.sample_format]
+        self.files = manifest["files"]
+        self.maps = {}
+
+    def __contains__(self, name):
+        return name in self.files
+
+    def file_path(self, name):
+        return self.directory / self.files[name]["file"]
+
+    def byte_offset(self, seconds):
+        return int(seconds * self.rate) * self.frame_bytes
+
+    def view(self, name, seconds=0.0):
+        """PCM for a source file from a time position, as a memoryview."""
+        if name not in self.maps:
+            with open(self.file_path(name), "rb") as f:
+                self.maps[name] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        data = self.maps[name]
+        offset = min(self.byte_offset(seconds), len(data))
+        return memoryview(data)[offset:]
+
+    def close(self):
+        for data in self.maps.values():
+            try:
+                data.close()
+            except BufferError:
+                pass  # A stream still holds a view (reload); freed along with it
+        self.maps = {}
+
+
+def load_assets(audio_dir, names):
+    """
+    Assets for every name in `names`, or None unless all of them are built,
+    present and newer than the MP3 they came from. Checksums are checked by
+    the build script, not at startup.
+    """
+    directory = Path(audio_dir) / ASSET_DIR
+    try:
+        manifest = json.loads((directory / MANIFEST).read_text())
+        if manifest.get("format") != MANIFEST_FORMAT:
+            return None
+        if manifest["sample_format"] not in SAMPLE_BYTES:
+            return None
+        for name in names:
+            entry = manifest["files"][name]
+            source = (Path(audio_dir) / name).stat()
+            if (source.st_size, source.st_mtime_ns) != (entry["source_size"], entry["source_mtime_ns"]):
+                return None
+            if (directory / entry["file"]).stat().st_size != entry["bytes"]:
+                return None
+    except (OSError, ValueError, KeyError):
+        return None
+    return PcmAssets(directory, manifest)
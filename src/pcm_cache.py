@@ -0,0 +1,444 @@
+#!/usr/bin/env python3
+"""
+Del Monte HelloHistory - RAM-Resident PCM Heads
+
+The first sound a guest hears should not depend on the SD card or a cold
+MP3 decoder. At startup the intro, plus the first few seconds of every
+chapter, are decoded once into a single anonymous mmap and mlock()ed so
+the pages can never be swapped or evicted.
+
+PrimedBackend plays a track by writing its cached head straight into a
+held-open ALSA PCM handle, while an mpg123 decoder (skipping exactly the
+MPEG frames already cached) starts in the background. When the head runs
+out, the decoder's output is streamed into the same handle, so the
+handoff is sample-accurate with no device reopen. Tracks without a cached
+head fall through to the wrapped backend.
+
+With pre-decoded assets (pcm_assets.py) the device is opened in their
+native format instead and every track streams straight from its memory
+map, with no decoder at all.
+
+Requires pyalsaaudio (sudo apt install python3-alsaaudio). Without it the
+cache is skipped and everything plays through the wrapped backend.
+"""
+
+import mmap
+import time
+import ctypes
+import logging
+import threading
+import subprocess
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+from bench_player import AudioBackend
+from frame_index import load_or_build
+from metrics import DECODER_SPAWN
+
+try:
+    import alsaaudio
+except ImportError:
+    alsaaudio = None
+
+log = logging.getLogger("phone")
+
+PCM_RATE = 44100
+PCM_CHANNELS = 2
+PCM_FRAME_BYTES = PCM_CHANNELS * 2  # Signed 16-bit little-endian
+MPEG_FRAME_SAMPLES = 1152  # Samples per MPEG-1 Layer III frame
+PERIOD_FRAMES = 1024
+DECODE_WORKERS = 4  # Parallel mpg123 decodes at startup (Zero 2 W has 4 cores)
+
+
+def decode_pcm(path, skip_frames=0, max_frames=None):
+    """Command line for mpg123 decoding to raw S16LE stereo on stdout."""
+    cmd = ["mpg123", "-q", "-s", "-e", "s16", "--stereo", "-r", str(PCM_RATE)]
+    if skip_frames:
+        cmd += ["-k", str(skip_frames)]
+    if max_frames is not None:
+        cmd += ["-n", str(max_frames)]
+    return cmd + [str(path)]
+
+
+def head_frames(seconds):
+    """Whole MPEG frames needed to cover at least `seconds` of audio."""
+    return int(seconds * PCM_RATE / MPEG_FRAME_SAMPLES) + 1
+
+
+def mlock(buffer):
+    """Lock an mmap's pages into RAM. Returns False if the kernel refuses."""
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        view = ctypes.c_char.from_buffer(buffer)
+        ok = libc.mlock(ctypes.addressof(view), ctypes.c_size_t(len(buffer))) == 0
+        del view  # Release the buffer export so the mmap can be closed later
+        return ok
+    except (OSError, AttributeError):
+        return False
+
+
+class PcmCache:
+    """
+    Decoded PCM for the start of each track (or of each chapter in the
+    story stream), held in one locked mmap.
+    """
+
+    def __init__(self):
+        self.buffer = None
+        self.heads = {}  # (filename, start_frame) -> (offset, length, resume_frame)
+        self.audio_dir = None  # Where the heads were decoded from
+        self.locked = False
+
+    @classmethod
+    def build(cls, audio_dir, segments, budget_mb):
+        """
+        Decode segments in playback order until the budget runs out. Each
+        segment is (filename, start_frame, frame_count); a frame_count of
+        None caches the rest of the file.
+        """
+        cache = cls()
+        cache.audio_dir = Path(audio_dir)
+        budget = int(budget_mb * 1024 * 1024)
+        started = time.monotonic()
+
+        def decode(segment):
+            filename, start_frame, frame_count = segment
+            try:
+                return subprocess.run(
+                    decode_pcm(Path(audio_dir) / filename,
+                               skip_frames=start_frame, max_frames=frame_count),
+                    capture_output=True, check=True,
+                ).stdout
+            except (OSError, subprocess.CalledProcessError) as e:
+                log.warning(f"PCM cache: could not decode {filename}: {e}")
+                return None
+
+        # Decode concurrently, then fill the budget in playback order
+        with ThreadPoolExecutor(DECODE_WORKERS) as pool:
+            decoded = list(pool.map(decode, segments))
+
+        chunks = []
+        used = 0
+        for (filename, start_frame, frame_count), pcm in zip(segments, decoded):
+            if pcm is None:
+                continue
+
+            if used + len(pcm) > budget:
+                log.warning(f"PCM cache: budget of {budget_mb} MB reached at {filename}")
+                break
+            # Where the decoder picks up after the head; -1 when cached whole
+            resume = -1 if frame_count is None else start_frame + frame_count
+            chunks.append(((filename, start_frame), pcm, resume))
+            used += len(pcm)
+
+        if not used:
+            return cache
+
+        cache.buffer = mmap.mmap(-1, used)
+        offset = 0
+        for key, pcm, resume in chunks:
+            cache.buffer[offset:offset + len(pcm)] = pcm
+            cache.heads[key] = (offset, len(pcm), resume)
+            offset += len(pcm)
+
+        cache.locked = mlock(cache.buffer)
+        log.info(
+            f"PCM cache: {len(cache.heads)} heads, {used / 1024 / 1024:.1f} MB "
+            f"{'locked' if cache.locked else 'NOT locked'} "
+            f"in {time.monotonic() - started:.1f}s"
+        )
+        return cache
+
+    def head(self, filename, start_frame=0):
+        """(memoryview of PCM, frame to resume decoding at) or None."""
+        key = (filename, start_frame)
+        if key not in self.heads:
+            return None
+        offset, length, resume = self.heads[key]
+        return memoryview(self.buffer)[offset:offset + length], resume
+
+    def close(self):
+        """Free the buffer once a content reload has replaced it."""
+        self.heads = {}
+        if self.buffer:
+            try:
+                self.buffer.close()
+            except BufferError:
+                pass  # A finished stream's view not yet collected; freed along with it
+            self.buffer = None
+
+
+def build_indexes(paths):
+    """Frame indexes for MP3s, loaded (or built), keyed by path string."""
+    indexes = {}
+    for path in paths:
+        try:
+            indexes[str(path)] = load_or_build(path)
+        except OSError as e:
+            log.warning(f"Frame index: {e}")
+    return indexes
+
+
+class PrimedBackend(AudioBackend):
+    """
+    Plays cached heads from RAM, then hands off to a background decoder.
+    Events go through the wrapped backend's queue so the player sees a
+    single event stream on fallback.fileno().
+    """
+
+    def __init__(self, fallback, cache, device="default", assets=None):
+        self.fallback = fallback
+        self.cache = cache
+        self.assets = assets
+        self.frame_bytes = assets.frame_bytes if assets else PCM_FRAME_BYTES
+        self.source_dir = assets.directory.parent if assets else cache.audio_dir
+        self.pcm = None
+        self.generation = 0
+        self.stopped_generation = None  # Stream to report as "stopped" when it exits
+        self.active = False
+        self.filepath = None
+        self.indexes = {}
+        self.lock = threading.Lock()
+        self.device = threading.Lock()  # Held by the stream thread writing to the PCM
+        self.device_name = device
+        if alsaaudio is None:
+            log.warning("PCM cache: pyalsaaudio not installed, playing from disk")
+            return
+        try:
+            self.open_device()
+        except alsaaudio.ALSAAudioError as e:
+            log.warning(f"PCM cache: could not open {device}: {e}")
+
+    def open_device(self):
+        """Open the PCM handle, held for the life of the player (no per-track open)."""
+        if self.assets:
+            channels, rate = self.assets.channels, self.assets.rate
+            sample_format = getattr(alsaaudio, f"PCM_FORMAT_{self.assets.sample_format}")
+        else:
+            channels, rate = PCM_CHANNELS, PCM_RATE
+            sample_format = alsaaudio.PCM_FORMAT_S16_LE
+        self.pcm = alsaaudio.PCM(
+            alsaaudio.PCM_PLAYBACK, device=self.device_name, channels=channels,
+            rate=rate, format=sample_format, periodsize=PERIOD_FRAMES,
+        )
+
+    def reopen(self):
+        """
+        Drop the PCM handle after a device fault and open a new one. True
+        once the device is usable again.
+        """
+        self.stop()
+        if alsaaudio is None:
+            return self.fallback.reopen()
+        with self.device:  # The stream thread has let go of the old handle
+            if self.pcm:
+                try:
+                    self.pcm.close()
+                except alsaaudio.ALSAAudioError:
+                    pass
+            self.pcm = None
+            try:
+                self.open_device()
+            except alsaaudio.ALSAAudioError:
+                return False  # Not back yet; the player retries
+        self.prewarm()
+        return self.fallback.reopen()
+
+    def swap(self, cache, assets, indexes):
+        """
+        Play from new heads, assets and frame indexes (a content reload,
+        between calls). The device is reopened only if the assets' format
+        changed. Returns the old (assets, cache) for the caller to free.
+        """
+        self.stop()
+        with self.device:  # The stream thread has let go of the old PCM
+            old = (self.assets, self.cache)
+            reformat = native_format(assets) != native_format(self.assets)
+            self.cache = cache
+            self.assets = assets
+            self.indexes = dict(indexes)
+            self.frame_bytes = assets.frame_bytes if assets else PCM_FRAME_BYTES
+            self.source_dir = assets.directory.parent if assets else cache.audio_dir
+            if self.pcm and reformat:
+                self.pcm.close()
+                self.pcm = None
+                try:
+                    self.open_device()
+                except alsaaudio.ALSAAudioError as e:
+                    log.warning(f"PCM cache: could not reopen {self.device_name}: {e}")
+        if reformat:
+            self.prewarm()
+        return old
+
+    def prewarm(self):
+        """Push a period of silence so the device is running before the first pickup."""
+        if self.pcm:
+            try:
+                self.pcm.write(bytes(PERIOD_FRAMES * self.frame_bytes))
+            except alsaaudio.ALSAAudioError as e:
+                log.warning(f"PCM cache: prewarm failed: {e}")
+
+    def play(self, filepath: Path) -> None:
+        filepath = str(filepath)
+        self.stop()
+        head = self.head(self.cached_name(filepath)) if self.pcm else None
+        if head is None:
+            self.fallback.play(filepath)
+            return
+        self.start_stream(filepath, head)
+
+    def cached_name(self, filepath):
+        """Name heads and assets are keyed by; None for a file from elsewhere (a backup copy)."""
+        filepath = Path(filepath)
+        return filepath.name if filepath.parent == self.source_dir else None
+
+    def head(self, name, start_frame=0, seconds=0.0):
+        """Cached PCM to start a track with: the whole pre-decoded asset if there is one."""
+        if name is None:
+            return None
+        if self.assets and name in self.assets:
+            return self.assets.view(name, seconds), -1
+        return self.cache.head(name, start_frame)
+
+    def start_stream(self, filepath, head):
+        with self.lock:
+            self.generation += 1
+            self.active = True
+            self.filepath = filepath
+            generation = self.generation
+        threading.Thread(
+            target=self.stream, args=(filepath, head, generation), daemon=True
+        ).start()
+
+    def current(self, generation):
+        return generation == self.generation
+
+    def write(self, data, generation):
+        """Write PCM to the device in period-sized chunks. False if stopped."""
+        step = PERIOD_FRAMES * self.frame_bytes
+        for start in range(0, len(data), step):
+            if not self.current(generation):
+                return False
+            self.pcm.write(data[start:start + step])
+        return True
+
+    def load_indexes(self, paths):
+        """Load (or build) frame indexes up front, off the playback path."""
+        self.indexes.update(build_indexes(paths))
+
+    def open_decoder(self, filepath, frame):
+        """
+        Start mpg123 decoding from an MPEG frame. With a frame index the
+        file is handed over already positioned at the byte offset, so no
+        frames are scanned; decoding starts one frame early and drops it
+        so the bit reservoir is primed.
+        """
+        if filepath not in self.indexes:
+            self.load_indexes([filepath])
+        index = self.indexes.get(filepath)
+        started = time.perf_counter()
+
+        if index is None or frame <= 0 or frame >= len(index):
+            decoder = subprocess.Popen(
+                decode_pcm(filepath, skip_frames=frame),
+                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            )
+        else:
+            with open(filepath, "rb") as source:
+                source.seek(index.byte_offset(frame - 1))
+                decoder = subprocess.Popen(
+                    decode_pcm("-", skip_frames=1),
+                    stdin=source, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                )
+        DECODER_SPAWN.observe(time.perf_counter() - started)
+        return decoder
+
+    def stream(self, filepath, head, generation):
+        """Playback thread: cached head first, then the decoder's output."""
+        pcm, resume = head
+        decoder = None
+        if resume >= 0:
+            # Start decoding the remainder now so it is ready at the handoff
+            decoder = self.open_decoder(filepath, resume)
+        try:
+            # A stream being stopped may be mid-period; queue behind it
+            with self.device:
+                if not self.current(generation):
+                    return
+                self.fallback.emit(("started", time.monotonic_ns()))
+                if not self.write(pcm, generation):
+                    return
+                if decoder:
+                    while self.current(generation):
+                        data = decoder.stdout.read(PERIOD_FRAMES * self.frame_bytes)
+                        if not data:
+                            break
+                        self.pcm.write(data)
+            if self.current(generation):
+                self.active = False
+                status = decoder.wait() if decoder else 0
+                if status:
+                    # Killed or crashed mid-track: replay from here rather than skip
+                    self.fallback.emit(("device_lost", f"decoder exited with status {status}"))
+                else:
+                    self.fallback.emit(("ended", time.monotonic_ns()))
+        except alsaaudio.ALSAAudioError as e:
+            if self.current(generation):
+                self.active = False
+                self.fallback.emit(("device_lost", f"ALSA: {e}"))
+        finally:
+            # Device already released; reaping here never holds up the next stream
+            if decoder:
+                self.reap(decoder)
+            if generation == self.stopped_generation:
+                self.fallback.emit(("stopped", time.monotonic_ns()))
+
+    def reap(self, decoder):
+        started = time.monotonic_ns()
+        decoder.kill()
+        decoder.wait()
+        log.info(f"Decoder reaped in {(time.monotonic_ns() - started) / 1e6:.1f} ms")
+
+    def stop(self) -> None:
+        with self.lock:
+            if self.active:
+                self.stopped_generation = self.generation
+                self.generation += 1
+                self.active = False
+        self.fallback.stop()
+
+    def seek(self, seconds: float) -> None:
+        if not self.active:
+            self.fallback.seek(seconds)
+            return
+        # Restart the primed stream at the frame, from RAM if it is cached
+        frame = round(seconds * PCM_RATE / MPEG_FRAME_SAMPLES)
+        index = self.indexes.get(self.filepath)
+        if index is not None:
+            frame = index.frame_at(seconds)
+        head = self.head(self.cached_name(self.filepath), frame, seconds) or (b"", frame)
+        self.start_stream(self.filepath, head)
+
+    def is_playing(self) -> bool:
+        return self.active or self.fallback.is_playing()
+
+    def fileno(self) -> int:
+        return self.fallback.fileno()
+
+    def poll_events(self) -> list:
+        return self.fallback.poll_events()
+
+    def cleanup(self) -> None:
+        self.stop()
+        if self.pcm:
+            self.pcm.close()
+        if self.assets:
+            self.assets.close()
+        self.fallback.cleanup()
+
+
+def native_format(assets):
+    """(rate, channels, sample format) the device is opened in for a set of assets."""
+    if assets:
+        return assets.rate, assets.channels, assets.sample_format
+    return PCM_RATE, PCM_CHANNELS, "S16_LE"
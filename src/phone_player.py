@@ -4,117 +4,774 @@ Del Monte Phone Player - Production Version
 Starts automatically on boot, plays audio when handset is lifted.
 """
 import gpiod
+import os
+import sys
 import time
-import subprocess
+import signal
+import queue
+import select
 import logging
-from gpiod.line import Direction, Bias
+import threading
+from collections import deque
+from gpiod.line import Direction, Bias, Edge, Value
+
+from audio_engine import Mpg123RemoteBackend
+from mixer import Mixer
+from pcm_cache import PcmCache, PrimedBackend, head_frames, build_indexes
+from pcm_assets import load_assets
+from story_stream import load_story
+from tracks import TRACKS, TRACK_GAIN_DB, STORY_INDEX, load_track_table
+from rotary_dial import DialReader
+from device_monitor import DeviceMonitor
+from integrity import Verifier, load_manifest, lower_priority
+from content import Content, ContentWatcher
+from prefetch import Prefetcher
+from profiling import Profiler
+from session_log import (Session, SessionLog, SessionLogHandler, END_HANGUP, END_COMPLETE, END_SHUTDOWN,
+                         END_NAMES, FLAG_FAULT)
+from metrics import PICKUPS, HANGUPS, PICKUP_TO_SOUND, LOOP_TIME, LISTEN, ERRORS, Exporter
+from log_pipeline import setup_pipeline
+from sd_notify import notify
 
-# Setup logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(message)s",
-    handlers=[
-        logging.FileHandler("/home/pi/delmonte/logs/phone.log"),
-        logging.StreamHandler()
-    ]
-)
 log = logging.getLogger("phone")
 
 AUDIO_DIR = "/home/pi/delmonte/src/audio"
-VOLUME_PERCENT = 60  # Set volume level (0-100)
-TRACKS = [
-    "00_intro.mp3",
-    "01_welcome.mp3",
-    "02_marys_story.mp3",
-    "03_building.mp3",
-    "04_design.mp3",
-    "05_other_work.mp3",
-    "06_closing.mp3",
-    "07_song.mp3",
-]
+VOLUME_PERCENT = 60  # Base volume level (0-100); chapters are offset by TRACK_GAIN_DB
+MIXER_CONTROL = "Speaker"  # ALSA control for volume, chapter gain and hang-up mute
+HOOK_LINE = 17  # GPIO line for the hook switch (ACTIVE = handset lifted)
+DEBOUNCE_MS = 30  # Ignore hook edges closer together than this
+PCM_HEAD_SECONDS = 5  # Seconds of each chapter kept decoded in RAM
+PCM_BUDGET_MB = 32  # Upper bound on RAM for decoded heads (Zero 2 W has 512 MB)
+RESUME_WINDOW_S = 120  # Pick up within this long after hanging up to resume (0 = off)
+RESUME_REWIND_S = 3  # Back up this far on resume so the sentence makes sense
+DIAL_ENABLED = True  # Decode the rotary dial (see rotary_dial.py for wiring)
+DEVICE_MONITOR = True  # Watch for the USB audio adapter dropping off the bus and returning
+RECOVERY_RETRY_S = 0.5  # While the audio device is gone, try to re-open it this often
+RECOVERY_REWIND_S = 2  # Replay this much from before the point the audio cut out
+MAX_RECOVERIES = 3  # Device faults on one chapter before it is skipped instead of replayed
+VERIFY_AUDIO = True  # Re-hash the audio against checksums.json in the background
+VERIFY_CACHE = "/home/pi/delmonte/logs/integrity.json"  # Last results, by size and mtime
+PREFETCH = True  # Read the next chapter into the page cache while one plays; pin the intro
+PREFETCH_MB = 8  # Most of the next chapter to read ahead
+WATCH_AUDIO = True  # Reload chapters and indexes when the audio changes, between calls
+RELOAD_SETTLE_S = 5  # Wait this long after the last change before rebuilding
+METRICS_FILE = "/home/pi/delmonte/logs/hellohistory.prom"  # Prometheus textfile (None = off)
+PROFILE_DIR = "/home/pi/delmonte/logs"  # Reports from SIGUSR1/SIGUSR2 (see profiling.py)
+SESSION_LOG = "/home/pi/delmonte/logs/sessions.bin"  # One binary record per call (None = off)
+SESSION_LOG_MB = 8  # Ring size; the oldest calls are overwritten past this
+LOG_FILE = "/home/pi/delmonte/logs/phone.log"
+LOG_FLUSH_S = 2.0  # Batch log writes to the SD card at most this often
 
 class PhonePlayer:
-    def __init__(self):
-        self.chip = gpiod.Chip("/dev/gpiochip0")
+    def __init__(self, chip=None, backend=None, mixer=None, debounce_ms=DEBOUNCE_MS):
+        # Startup phases in ms; volume runs alongside GPIO and audio setup
+        self.startup_ms = {"python": process_age_s() * 1000}
+        self.phase_ns = time.monotonic_ns()
+        self.mixer = mixer or Mixer(MIXER_CONTROL)
+        volume = threading.Thread(target=self.set_volume, args=(VOLUME_PERCENT,), name="volume")
+        volume.start()
+        self.chip = chip or gpiod.Chip("/dev/gpiochip0")
         self.request = self.chip.request_lines(
             consumer="phone_player",
-            config={17: gpiod.LineSettings(direction=Direction.INPUT, bias=Bias.PULL_UP)}
+            config={HOOK_LINE: gpiod.LineSettings(
+                direction=Direction.INPUT,
+                bias=Bias.PULL_UP,
+                edge_detection=Edge.BOTH,
+            )}
         )
-        self.process = None
+        self.phase("gpio")
+        try:
+            self.tracks, self.gains = load_track_table(AUDIO_DIR)
+        except ValueError as e:
+            log.warning(f"Ignoring track manifest: {e}")
+            self.tracks, self.gains = list(TRACKS), dict(TRACK_GAIN_DB)
+        # Gapless story stream, if built and up to date (build_story_stream.py)
+        self.story = load_story(AUDIO_DIR, self.tracks, STORY_INDEX)
+        self.story_active = False
+        self.origin_ns = 0  # When position 0 of the playing file was (notionally) heard
+        self.resume_point = None  # (track, position, hung up at) for resume-on-pickup
+        if self.story:
+            log.info(f"Using gapless story stream ({len(self.story)} chapters)")
+        self.phase("story")
+        self.verifier = None
+        files = load_manifest(AUDIO_DIR) if VERIFY_AUDIO else None
+        if files:
+            self.verifier = Verifier(AUDIO_DIR, files, VERIFY_CACHE)
+        self.assets = None  # Pre-decoded PCM the backend plays from, if any
+        self.backend = backend or self.create_backend()
+        self.phase("audio")
+        self.prefetcher = None
+        if PREFETCH:
+            self.prefetcher = Prefetcher()
+            path, _, end = self.read_range(0)
+            self.prefetcher.pin(path, end)
+        self.phase("prefetch")
         self.current_track = 0
-        self.set_volume(VOLUME_PERCENT)
+        self.debounce_ns = debounce_ms * 1_000_000
+        self.lifted = self.is_lifted()
+        self.last_edge_ns = 0
+        self.settle_pending = False
+        self.pickup_edge_ns = None
+        self.pickup_latencies_ms = deque(maxlen=100)
+        self.sound_edge_ns = None
+        self.track_end_ns = None
+        self.hangup_edge_ns = None  # Set until the backend reports teardown done
+        self.fault_ns = None  # Set while the audio device is lost
+        self.fault_point = None  # (track, position) to play once it is back
+        self.fault_streak = (None, 0)  # (track, faults) since a chapter last ended normally
+        self.retry_ns = 0
+        self.listen_chapter = None  # Chapter whose listen time is being counted
+        self.listen_ns = 0
+        self.exporter = Exporter(METRICS_FILE) if METRICS_FILE else None
+        self.session = None  # The call in progress, for the session log
+        self.running = True
+        # Other threads hand work to the main loop through inbox + wake pipe
+        self.inbox = queue.SimpleQueue()
+        self.wake_r, self.wake_w = os.pipe()
+        os.set_blocking(self.wake_r, False)
+        self.dial = None
+        if DIAL_ENABLED:
+            try:
+                self.dial = DialReader(self.chip, self.on_dial_digit)
+            except Exception as e:
+                log.warning(f"Rotary dial unavailable: {e}")
+        self.monitor = None
+        if DEVICE_MONITOR:
+            try:
+                self.monitor = DeviceMonitor()
+            except OSError as e:
+                log.warning(f"Sound card monitor unavailable: {e}")
+        self.watcher = None
+        if WATCH_AUDIO:
+            try:
+                self.watcher = ContentWatcher(AUDIO_DIR)
+            except OSError as e:
+                log.warning(f"Audio watch unavailable: {e}")
+        self.reload_ns = None  # When settled audio changes are due to be rebuilt
+        self.reloading = False  # A rebuild is running on its own thread
+        self.pending_content = None  # Rebuilt, waiting for the handset to go down
+        self.phase("dial")
+        volume.join()
+        self.phase("volume")
         log.info("Phone player initialized")
     
+    def phase(self, name):
+        """Record how long a startup phase took since the previous one"""
+        now = time.monotonic_ns()
+        self.startup_ms[name] = (now - self.phase_ns) / 1e6
+        self.phase_ns = now
+    
+    def create_backend(self):
+        """Startup stage: decode the intro and chapter heads into RAM"""
+        assets, cache, indexes = self.prepare_audio(self.tracks, self.story)
+        if assets:
+            log.info(f"Using pre-decoded PCM assets ({assets.rate} Hz {assets.sample_format})")
+            self.assets = assets
+        backend = PrimedBackend(Mpg123RemoteBackend(), cache, assets=assets)
+        backend.prewarm()
+        backend.indexes.update(indexes)
+        return backend
+    
+    def prepare_audio(self, tracks, story):
+        """(assets, PCM cache, frame indexes) for a track table; runs on the reload thread too"""
+        names = [story.path.name] if story else tracks
+        assets = load_assets(AUDIO_DIR, names)
+        if assets:
+            # Pre-decoded in the device's own format (build_pcm_assets.py): nothing to decode
+            return assets, PcmCache(), {}
+        head = head_frames(PCM_HEAD_SECONDS)
+        if story:
+            chapters = story.chapters
+            # Intro whole (up to chapter 1), then the head of every chapter
+            segments = [(story.path.name, 0, chapters[1]["frame"] if len(chapters) > 1 else None)]
+            segments += [(story.path.name, ch["frame"], head) for ch in chapters[1:]]
+            paths = [story.path]
+        else:
+            segments = [(tracks[0], 0, None)]
+            segments += [(track, 0, head) for track in tracks[1:]]
+            paths = [f"{AUDIO_DIR}/{track}" for track in tracks]
+        cache = PcmCache.build(AUDIO_DIR, segments, PCM_BUDGET_MB)
+        return None, cache, build_indexes(paths)
+    
     def set_volume(self, percent):
         """Set system volume to specified percentage"""
         try:
-            subprocess.run(["amixer", "set", "Speaker", f"{percent}%"], 
-                         capture_output=True, check=True)
+            self.mixer.set_volume(percent)
             log.info(f"Volume set to {percent}%")
         except Exception as e:
             log.warning(f"Could not set volume: {e}")
     
     def is_lifted(self):
-        return self.request.get_value(17) == gpiod.line.Value.ACTIVE
+        return self.request.get_value(HOOK_LINE) == Value.ACTIVE
     
-    def play_track(self, index):
+    def play_track(self, index, position=0.0):
+        if self.fault_ns is not None:
+            # Nothing to play on; start here once the device is back
+            self.fault_point = (index, position)
+            return
+        if self.story and self.verifier and self.verifier.failed(self.story.path.name):
+            log.warning("Story stream failed its checksum - playing chapter files")
+            self.stop_audio()
+            self.story = None
+        if self.story:
+            self.play_chapter(index, position or None)
+            return
         self.stop_audio()
         self.current_track = index
-        path = f"{AUDIO_DIR}/{TRACKS[index]}"
-        log.info(f"Playing: {TRACKS[index]}")
-        self.process = subprocess.Popen(["mpg123", "-q", path])
+        self.listen_mark(index)
+        path = self.track_path(index)
+        log.info(f"Playing: {self.tracks[index]}" + (f" from {position:.1f}s" if position else ""))
+        self.mixer.unmute()
+        self.mixer.set_gain(self.gains.get(self.tracks[index], 0.0))
+        self.chapter_start(index, position)
+        self.backend.play(path)
+        if position:
+            self.backend.seek(position)
+        self.origin_ns = time.monotonic_ns() - int(position * 1e9)
+        self.record_pickup_latency()
+    
+    def track_path(self, index):
+        """A chapter's file: its known-good backup copy if the chapter failed its checksum"""
+        name = self.tracks[index]
+        if self.verifier:
+            name = self.verifier.playable(name)
+        return f"{AUDIO_DIR}/{name}"
+    
+    def play_chapter(self, index, position=None):
+        """Story stream mode: seek to a chapter instead of loading a file"""
+        self.current_track = index
+        self.listen_mark(index)
+        start = self.story.start_seconds(index) if position is None else position
+        log.info(f"Playing: {self.tracks[index]} (story at {start:.1f}s)")
+        self.mixer.unmute()
+        self.mixer.set_gain(self.gains.get(self.tracks[index], 0.0))
+        self.chapter_start(index, start)
+        if self.story_active:
+            self.backend.seek(start)
+        else:
+            self.backend.play(self.story.path)
+            if start:
+                self.backend.seek(start)
+            self.story_active = True
+        self.origin_ns = time.monotonic_ns() - int(start * 1e9)
+        self.record_pickup_latency()
+    
+    def read_range(self, index, position=0.0):
+        """Where playing a chapter from a position reads: (file, first byte, end byte or None)"""
+        if self.story:
+            name = self.story.path.name
+            if self.assets and name in self.assets:
+                start = position or self.story.start_seconds(index)
+                return (self.assets.file_path(name), self.assets.byte_offset(start),
+                        self.assets.byte_offset(self.story.end_seconds(index)))
+            first, end = self.story.byte_range(index)
+            return self.story.path, first, end
+        path = self.track_path(index)
+        name = self.tracks[index]
+        if self.assets and name in self.assets and path == f"{AUDIO_DIR}/{name}":
+            return self.assets.file_path(name), self.assets.byte_offset(position), None
+        return path, 0, None
+    
+    def chapter_start(self, index, position=0.0):
+        """Note how warm this chapter's opening is, and start reading the next one in"""
+        if not self.prefetcher:
+            return
+        path, first, _ = self.read_range(index, position)
+        self.prefetcher.chapter_start(path, first)
+        self.prefetch_next(index)
+    
+    def prefetch_next(self, index):
+        if not self.prefetcher or index + 1 >= len(self.tracks):
+            return
+        path, first, end = self.read_range(index + 1)
+        length = PREFETCH_MB * 1024 * 1024
+        if end is not None:
+            length = min(length, end - first)
+        self.prefetcher.prefetch(path, first, length)
+    
+    def playback_position(self):
+        """Seconds into the playing file (the story stream or the chapter)"""
+        return (time.monotonic_ns() - self.origin_ns) / 1e9
+    
+    def track_story_position(self):
+        """Follow chapter boundaries in the story stream by elapsed time"""
+        chapter = self.story.chapter_at(self.playback_position())
+        if chapter > self.current_track:
+            self.current_track = chapter
+            self.listen_mark(chapter)
+            self.mixer.set_gain(self.gains.get(self.tracks[chapter], 0.0))
+            log.info(f"Chapter: {self.tracks[chapter]}")
+            self.prefetch_next(chapter)
+    
+    def jump_to_chapter(self, number):
+        """Jump to a chapter by number (0 = intro), as the dial does"""
+        if not self.lifted:
+            return
+        if 0 <= number < len(self.tracks):
+            log.info(f"Jump to chapter {number}")
+            self.play_track(number)
+        else:
+            log.info(f"Invalid chapter: {number}")
+    
+    def record_pickup_latency(self):
+        """Record edge-to-play time for the pickup that started playback"""
+        if self.pickup_edge_ns is None:
+            return
+        latency_ms = (time.monotonic_ns() - self.pickup_edge_ns) / 1e6
+        self.sound_edge_ns = self.pickup_edge_ns
+        self.pickup_edge_ns = None
+        self.pickup_latencies_ms.append(latency_ms)
+        worst = max(self.pickup_latencies_ms)
+        log.info(f"Pickup latency: {latency_ms:.1f} ms "
+                 f"(worst of last {len(self.pickup_latencies_ms)}: {worst:.1f} ms)")
+    
+    def listen_mark(self, chapter):
+        """Close the running chapter's listen time and start counting `chapter`'s (None: silence)"""
+        now = time.monotonic_ns()
+        if self.listen_chapter is not None:
+            seconds = (now - self.listen_ns) / 1e9
+            LISTEN[self.listen_chapter].observe(seconds)
+            if self.session:
+                self.session.listen(self.listen_chapter, seconds)
+        if chapter is not None and self.session:
+            self.session.reach(chapter)
+        self.listen_chapter = chapter
+        self.listen_ns = now
     
     def stop_audio(self):
-        if self.process:
-            self.process.terminate()
-            try:
-                self.process.wait(timeout=0.5)
-            except:
-                self.process.kill()
-            self.process = None
+        self.listen_mark(None)
+        self.backend.stop()
+        self.story_active = False
+        self.sound_edge_ns = None
+        self.track_end_ns = None
     
     def check_track_ended(self):
-        if self.process and self.process.poll() is not None:
-            self.current_track += 1
-            if self.current_track < len(TRACKS):
-                self.play_track(self.current_track)
-            else:
-                log.info("Playlist complete")
-                self.current_track = 0
-                self.process = None
+        """Handle events from the audio engine; advance when a track ends"""
+        for kind, detail in self.backend.poll_events():
+            if kind == "started":
+                if self.sound_edge_ns is not None:
+                    PICKUP_TO_SOUND.observe((detail - self.sound_edge_ns) / 1e9)
+                    log.info(f"Pickup to sound: {(detail - self.sound_edge_ns) / 1e6:.1f} ms")
+                    self.sound_edge_ns = None
+                if self.track_end_ns is not None:
+                    log.info(f"Chapter transition: {(detail - self.track_end_ns) / 1e6:.1f} ms")
+                    self.track_end_ns = None
+            elif kind == "error":
+                ERRORS["track"].inc()
+                log.warning(f"Audio engine: {detail}")
+                if self.story_active:
+                    # Fall back to per-chapter files for the rest of the run
+                    log.warning("Story stream failed - playing chapter files")
+                    self.story = None
+                    self.story_active = False
+                    self.play_track(self.current_track)
+                else:
+                    self.advance_track(time.monotonic_ns())
+            elif kind == "device_lost":
+                self.on_device_lost(detail)
+            elif kind == "ended":
+                self.listen_mark(None)
+                self.fault_streak = (None, 0)
+                if self.story_active:
+                    log.info("Playlist complete")
+                    self.session.complete = True
+                    self.story_active = False
+                    self.current_track = 0
+                else:
+                    self.advance_track(detail)
+            elif kind == "stopped":
+                self.on_stopped(detail)
+        
+        if self.story_active:
+            self.track_story_position()
+    
+    def advance_track(self, ended_ns):
+        self.current_track += 1
+        if self.current_track < len(self.tracks):
+            self.play_track(self.current_track)
+            self.track_end_ns = ended_ns
+        else:
+            log.info("Playlist complete")
+            self.session.complete = True
+            self.current_track = 0
+    
+    def wait_for_events(self, timeout):
+        """
+        Block on the line request fd and the audio engine's event fd until
+        something happens or timeout. Returns a list of (lifted, timestamp_ns)
+        hook transitions that survived debouncing. Edge timestamps come from
+        the kernel (CLOCK_MONOTONIC).
+        """
+        watched = [self.request.fd, self.backend.fileno(), self.wake_r]
+        if self.monitor:
+            watched.append(self.monitor)
+        if self.watcher:
+            watched.append(self.watcher)
+        ready, _, _ = select.select(watched, [], [], timeout)
+        transitions = []
+        
+        if self.monitor in ready:
+            for action, card in self.monitor.read_events():
+                log.info(f"Sound card {card}: {action}")
+                if action == "remove":
+                    self.on_device_lost(f"{card} removed", self.story_active or self.backend.is_playing())
+                elif action == "add" and self.fault_ns is not None:
+                    self.retry_ns = 0  # Back already; don't wait for the next retry
+        
+        if self.watcher in ready:
+            changed = self.watcher.read_events()
+            if changed:
+                shown = ", ".join(changed[:5]) + (f" and {len(changed) - 5} more" if len(changed) > 5 else "")
+                log.info(f"Audio changed: {shown}")
+                self.reload_ns = time.monotonic_ns() + int(RELOAD_SETTLE_S * 1e9)
+        
+        if self.wake_r in ready:
+            try:
+                while os.read(self.wake_r, 64):
+                    pass
+            except BlockingIOError:
+                pass
+        
+        if self.request.fd in ready:
+            for event in self.request.read_edge_events():
+                lifted = event.event_type == gpiod.EdgeEvent.Type.RISING_EDGE
+                if event.timestamp_ns - self.last_edge_ns < self.debounce_ns:
+                    # Contact bounce - reconcile with the real level once settled
+                    self.settle_pending = True
+                    continue
+                self.last_edge_ns = event.timestamp_ns
+                self.settle_pending = True
+                if lifted != self.lifted:
+                    self.lifted = lifted
+                    transitions.append((lifted, event.timestamp_ns))
+        
+        if self.settle_pending and time.monotonic_ns() - self.last_edge_ns >= self.debounce_ns:
+            # Bounce has died down; trust the line level over the edge stream
+            self.settle_pending = False
+            lifted = self.is_lifted()
+            if lifted != self.lifted:
+                self.lifted = lifted
+                transitions.append((lifted, time.monotonic_ns()))
+        
+        return transitions
+    
+    def next_timeout(self):
+        """How long the loop may block: forever unless debouncing or a chapter boundary is due"""
+        timeout = None
+        if self.settle_pending:
+            timeout = self.debounce_ns / 1e9
+        if self.story_active and self.current_track + 1 < len(self.story):
+            boundary_ns = self.origin_ns + int(self.story.end_seconds(self.current_track) * 1e9)
+            # A millisecond late so the boundary has definitely passed
+            until = max(0.0, (boundary_ns - time.monotonic_ns()) / 1e9) + 0.001
+            timeout = until if timeout is None else min(timeout, until)
+        if self.fault_ns is not None:
+            until = max(0.0, (self.retry_ns - time.monotonic_ns()) / 1e9)
+            timeout = until if timeout is None else min(timeout, until)
+        if self.reload_ns is not None and not self.reloading:
+            until = max(0.0, (self.reload_ns - time.monotonic_ns()) / 1e9)
+            timeout = until if timeout is None else min(timeout, until)
+        return timeout
+    
+    def on_lifted(self, timestamp_ns):
+        log.info("Handset LIFTED")
+        PICKUPS.inc()
+        if self.verifier:
+            self.verifier.idle(False)
+        if self.hangup_edge_ns is not None:
+            # The backend starts the new track once the old one has let go
+            log.info("Pickup during teardown - queued behind stop")
+        self.pickup_edge_ns = timestamp_ns
+        resume, self.resume_point = self.resume_point, None
+        resume = resume if resume and time.monotonic() - resume[2] <= RESUME_WINDOW_S else None
+        self.session = Session(resumed=resume is not None)
+        if resume:
+            track, position, _ = resume
+            position = max(0.0, position - RESUME_REWIND_S)
+            if self.story:
+                track = self.story.chapter_at(position)
+            log.info(f"Resuming {self.tracks[track]} at {position:.1f}s")
+            self.play_track(track, position)
+        else:
+            self.play_track(0)
+    
+    def on_hung_up(self, timestamp_ns):
+        # Silence first, at the mixer; the decoder and device wind down behind it
+        self.mixer.mute()
+        silent_ns = time.monotonic_ns()
+        log.info("Handset HUNG UP")
+        HANGUPS.inc()
+        log.info(f"Hang-up to silence: {(silent_ns - timestamp_ns) / 1e6:.1f} ms")
+        if self.verifier:
+            self.verifier.idle(True)
+        playing = self.story_active or self.backend.is_playing()
+        if RESUME_WINDOW_S and playing:
+            self.resume_point = (self.current_track, self.playback_position(), time.monotonic())
+        elif RESUME_WINDOW_S and self.fault_point:
+            # Audio already cut by a device fault; resume from there (it rewinds again)
+            track, position = self.fault_point
+            self.resume_point = (track, position + RESUME_REWIND_S, time.monotonic())
+        self.fault_point = None
+        self.stop_audio()
+        self.end_session(END_COMPLETE if self.session and self.session.complete else END_HANGUP)
+        self.current_track = 0
+        if playing:
+            self.hangup_edge_ns = timestamp_ns
+        else:
+            self.on_stopped(time.monotonic_ns(), timestamp_ns)
+    
+    def end_session(self, end):
+        """Hand the finished call to the log writer thread for the session log"""
+        session, self.session = self.session, None
+        if not session or not SESSION_LOG:
+            return
+        log.info(f"Call ended ({END_NAMES[end]}), furthest chapter {session.furthest}",
+                 extra={"session_record": session.pack(end)})
+    
+    def on_stopped(self, timestamp_ns, hangup_ns=None):
+        """Backend finished tearing down; ready for the next pickup"""
+        hangup_ns = hangup_ns or self.hangup_edge_ns
+        if hangup_ns is None:
+            return
+        self.hangup_edge_ns = None
+        log.info(f"Hang-up to ready: {(timestamp_ns - hangup_ns) / 1e6:.1f} ms")
+    
+    def on_device_lost(self, reason, playing=True):
+        """The audio device failed: stop, remember the spot, and start re-opening it"""
+        if self.fault_ns is None:
+            ERRORS["device"].inc()
+            self.fault_ns = time.monotonic_ns()
+            self.retry_ns = self.fault_ns
+            log.warning(f"Audio device lost: {reason}")
+        if self.session:
+            self.session.flags |= FLAG_FAULT
+        if playing and self.lifted and self.fault_point is None:
+            track = self.current_track
+            position = max(0.0, self.playback_position() - RECOVERY_REWIND_S)
+            faults = self.fault_streak[1] + 1 if self.fault_streak[0] == track else 1
+            self.fault_streak = (track, faults)
+            if faults > MAX_RECOVERIES:
+                # Keeps failing at this chapter; it's probably the file, not the device
+                log.warning(f"Skipping {self.tracks[track]} after {faults} faults")
+                track, position = track + 1, 0.0
+            if track < len(self.tracks):
+                self.fault_point = (track, position)
+        self.stop_audio()
+    
+    def try_recover(self):
+        """Re-open the audio device; carry on where the audio cut out once it is back"""
+        if not self.backend.reopen():
+            self.retry_ns = time.monotonic_ns() + int(RECOVERY_RETRY_S * 1e9)
+            return
+        # A re-enumerated card comes back with default mixer settings
+        self.mixer.reset()
+        self.set_volume(VOLUME_PERCENT)
+        recovery_ms = (time.monotonic_ns() - self.fault_ns) / 1e6
+        self.fault_ns = None
+        point, self.fault_point = self.fault_point, None
+        if point and self.lifted:
+            track, position = point
+            log.info(f"Audio device recovered in {recovery_ms:.0f} ms - "
+                     f"resuming {self.tracks[track]} at {position:.1f}s")
+            self.play_track(track, position)
+        else:
+            log.info(f"Audio device recovered in {recovery_ms:.0f} ms")
+    
+    def start_reload(self):
+        """Rebuild the content from the changed audio directory on its own thread"""
+        self.reload_ns = None
+        self.reloading = True
+        threading.Thread(target=self.reload, name="reload", daemon=True).start()
+    
+    def reload(self):
+        """Reload thread: everything derived from the audio, at idle CPU and I/O priority"""
+        lower_priority()  # Inherited by the decoders it starts
+        started = time.monotonic()
+        try:
+            tracks, gains = load_track_table(AUDIO_DIR)
+            story = load_story(AUDIO_DIR, tracks, STORY_INDEX)
+            audio = self.prepare_audio(tracks, story) if isinstance(self.backend, PrimedBackend) else None
+            checksums = load_manifest(AUDIO_DIR) if VERIFY_AUDIO else None
+            content = Content(tracks, gains, story, audio, checksums)
+            log.info(f"Audio rebuilt in {time.monotonic() - started:.1f}s - "
+                     f"swapping in at the next hang-up")
+        except Exception as e:
+            # Keep playing what we have; the next change tries again
+            log.warning(f"Audio reload failed: {e}")
+            content = None
+        self.inbox.put(("content", content))
+        os.write(self.wake_w, b"!")
+    
+    def swap_content(self):
+        """Handset down, old audio let go: switch every table and index over in one step"""
+        content, self.pending_content = self.pending_content, None
+        self.tracks, self.gains = content.tracks, content.gains
+        self.story = content.story
+        self.current_track = 0
+        # Positions and fault counts in the old audio mean nothing in the new
+        self.resume_point = None
+        self.fault_streak = (None, 0)
+        if content.audio:
+            assets, cache, indexes = content.audio
+            old_assets, old_cache = self.backend.swap(cache, assets, indexes)
+            old_cache.close()
+            if old_assets:
+                old_assets.close()
+            self.assets = assets
+        if self.verifier:
+            self.verifier.stop()
+            self.verifier = None
+        if content.checksums:
+            self.verifier = Verifier(AUDIO_DIR, content.checksums, VERIFY_CACHE)
+            self.verifier.start(idle=True)
+        if self.prefetcher:
+            self.prefetcher.unpin()
+            path, _, end = self.read_range(0)
+            self.prefetcher.pin_later(path, end)
+        story = f", story stream of {len(self.story)} chapters" if self.story else ""
+        log.info(f"Audio reloaded: {len(self.tracks)} chapters{story}")
+    
+    def on_dial_digit(self, digit, rest_ns):
+        """Called on the dial thread; hands the digit to the main loop"""
+        self.inbox.put(("dial", digit, rest_ns))
+        os.write(self.wake_w, b"!")
+    
+    def handle_inbox(self):
+        while True:
+            try:
+                message = self.inbox.get_nowait()
+            except queue.Empty:
+                return
+            if message[0] == "content":
+                self.reloading = False
+                if message[1] is None:
+                    continue  # Failed; keep whatever is already waiting
+                if self.pending_content:
+                    self.pending_content.close()  # Overtaken by a newer rebuild
+                self.pending_content = message[1]
+            elif message[0] == "dial":
+                _, digit, rest_ns = message
+                log.info(f"Dialled {digit}")
+                if self.lifted:
+                    if self.session:
+                        self.session.dial(digit)
+                    self.jump_to_chapter(digit)
+                    log.info(f"Dial to chapter: {(time.monotonic_ns() - rest_ns) / 1e6:.1f} ms")
     
     def run(self):
         log.info("Phone player running - waiting for handset")
-        was_lifted = False
+        if self.dial:
+            self.dial.start()
+        if self.lifted:
+            self.on_lifted(time.monotonic_ns())
+        self.notify_ready()
+        if self.verifier:
+            self.verifier.start(idle=not self.lifted)
+        if self.exporter:
+            self.exporter.start()
         
-        while True:
+        while self.running:
             try:
-                lifted = self.is_lifted()
-                
-                if lifted and not was_lifted:
-                    log.info("Handset LIFTED")
-                    self.play_track(0)
-                elif not lifted and was_lifted:
-                    log.info("Handset HUNG UP")
-                    self.stop_audio()
-                    self.current_track = 0
-                
-                if lifted:
-                    self.check_track_ended()
-                
-                was_lifted = lifted
-                time.sleep(0.1)
-                
+                self.step()
             except Exception as e:
+                ERRORS["loop"].inc()
                 log.error(f"Error: {e}")
                 time.sleep(1)
     
+    def notify_ready(self):
+        """Tell systemd (Type=notify) the player can answer a pickup; log the startup profile"""
+        self.phase("run")
+        notify("READY=1\nSTATUS=Waiting for handset")
+        phases = ", ".join(f"{name} {ms:.0f}" for name, ms in self.startup_ms.items())
+        log.info(f"Ready: {process_age_s():.2f}s after process start, "
+                 f"{boot_age_s():.1f}s after boot ({phases} ms)")
+    
+    def step(self):
+        """One loop iteration: wait for hook or engine events and act on them"""
+        transitions = self.wait_for_events(self.next_timeout())
+        started = time.perf_counter()
+        for lifted, timestamp_ns in transitions:
+            if lifted:
+                self.on_lifted(timestamp_ns)
+            else:
+                self.on_hung_up(timestamp_ns)
+        
+        self.handle_inbox()
+        
+        if self.lifted:
+            self.check_track_ended()
+        else:
+            # Only teardown matters while hung up; other engine events are stale
+            for kind, detail in self.backend.poll_events():
+                if kind == "stopped":
+                    self.on_stopped(detail)
+                elif kind == "device_lost":
+                    self.on_device_lost(detail, playing=False)
+        
+        if self.fault_ns is not None and time.monotonic_ns() >= self.retry_ns:
+            self.try_recover()
+        
+        if self.reload_ns is not None and not self.reloading and time.monotonic_ns() >= self.reload_ns:
+            self.start_reload()
+        if (self.pending_content and not self.lifted and self.hangup_edge_ns is None
+                and self.fault_ns is None):
+            self.swap_content()
+        LOOP_TIME.observe(time.perf_counter() - started)
+    
     def cleanup(self):
         self.stop_audio()
+        self.end_session(END_SHUTDOWN)
+        if self.dial:
+            self.dial.stop()
+        self.backend.cleanup()
+        if self.verifier:
+            self.verifier.stop()
+        if self.prefetcher:
+            self.prefetcher.close()
+        if self.exporter:
+            self.exporter.stop()
+        if self.monitor:
+            self.monitor.close()
+        if self.watcher:
+            self.watcher.close()
+        if self.pending_content:
+            self.pending_content.close()
         self.request.release()
         log.info("Phone player stopped")
 
+def boot_age_s():
+    return time.clock_gettime(time.CLOCK_BOOTTIME)
+
+def process_age_s():
+    """Seconds since this process was started (interpreter and imports included)"""
+    try:
+        with open("/proc/self/stat") as f:
+            # Field 22 (starttime), counted after the parenthesised command name
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        return boot_age_s() - start_ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return 0.0
+
+def setup_logging():
+    """File, journal and session log output, written by a background thread (see log_pipeline.py)"""
+    extra_handlers = []
+    problem = None
+    if SESSION_LOG:
+        try:
+            extra_handlers.append(SessionLogHandler(SessionLog(SESSION_LOG, SESSION_LOG_MB)))
+        except (OSError, ValueError) as e:
+            problem = e
+    pipeline = setup_pipeline(LOG_FILE, flush_interval=LOG_FLUSH_S, extra_handlers=extra_handlers)
+    if problem:
+        log.warning(f"Session log unavailable: {problem}")
+    return pipeline
+
 if __name__ == "__main__":
+    log_pipeline = setup_logging()
+    # systemctl stop: unwind through finally so buffered log lines get written
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    # kill -USR1 / -USR2: profile the running player (make profile)
+    Profiler(PROFILE_DIR).install()
     player = PhonePlayer()
     try:
         player.run()
@@ -122,3 +779,4 @@ if __name__ == "__main__":
         log.info("Shutting down...")
     finally:
         player.cleanup()
+        log_pipeline.stop()
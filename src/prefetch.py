@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Del Monte HelloHistory - Page-Cache Prefetch
+
+Chapters are read from the SD card as they play, so right after boot (or
+once the kernel has evicted it) the start of the next chapter is a cold
+read on a slow card. While a chapter plays, the Prefetcher asks the
+kernel to read the next one into the page cache (posix_fadvise WILLNEED,
+the same readahead(2) does) on a background thread. The intro is mapped
+and mlock()ed for the life of the player, so every pickup starts warm
+whichever backend reads it.
+
+At each chapter start it records how much of the chapter's opening was
+already in the page cache (mincore) and how long reading its first block
+took: the cache-hit ratio and the cold-read latency.
+"""
+
+import os
+import mmap
+import time
+import queue
+import ctypes
+import logging
+import threading
+from collections import deque
+from pathlib import Path
+
+from metrics import CHAPTER_STARTS, CHAPTER_CACHE_HITS
+
+log = logging.getLogger("phone")
+
+PROBE_BYTES = 64 * 1024  # Opening of a chapter checked and timed at its start
+
+libc = ctypes.CDLL(None, use_errno=True)
+libc.mmap.restype = ctypes.c_void_p
+libc.mmap.argtypes = [ctypes.c_void_p, ctypes.c_size_t, ctypes.c_int, ctypes.c_int,
+                      ctypes.c_int, ctypes.c_long]
+libc.munmap.argtypes = [ctypes.c_void_p, ctypes.c_size_t]
+libc.mlock.argtypes = [ctypes.c_void_p, ctypes.c_size_t]
+libc.mincore.argtypes = [ctypes.c_void_p, ctypes.c_size_t, ctypes.POINTER(ctypes.c_ubyte)]
+MAP_FAILED = ctypes.c_void_p(-1).value
+
+
+def map_shared(fd, length):
+    """Read-only shared mapping of a file's first `length` bytes: its page-cache pages."""
+    address = libc.mmap(None, length, mmap.PROT_READ, mmap.MAP_SHARED, fd, 0)
+    if address in (None, MAP_FAILED):
+        raise OSError(ctypes.get_errno(), "mmap failed")
+    return address
+
+
+def resident_fraction(fd, offset, length):
+    """Fraction of the pages covering [offset, offset + length) that are in the page cache."""
+    end = min(offset + length, os.fstat(fd).st_size)
+    if end <= offset:
+        return 1.0
+    first = offset - offset % mmap.PAGESIZE
+    pages = (end - first + mmap.PAGESIZE - 1) // mmap.PAGESIZE
+    address = map_shared(fd, end)
+    try:
+        vector = (ctypes.c_ubyte * pages)()
+        if libc.mincore(address + first, end - first, vector) != 0:
+            raise OSError(ctypes.get_errno(), "mincore failed")
+        return sum(page & 1 for page in vector) / pages
+    finally:
+        libc.munmap(address, end)
+
+
+class Prefetcher:
+    """Warms the page cache ahead of playback and measures how warm each chapter start was."""
+
+    def __init__(self):
+        self.pinned = []  # (address, length) of mlock()ed mappings
+        self.requests = queue.SimpleQueue()
+        self.read_ms = deque(maxlen=100)  # First-block read time of recent chapter starts
+        self.thread = threading.Thread(target=self.run, name="prefetch", daemon=True)
+        self.thread.start()
+
+    def pin(self, path, length=None):
+        """Keep a file (or its first `length` bytes) resident until close()."""
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError as e:
+            log.warning(f"Prefetch: could not pin {path}: {e}")
+            return
+        try:
+            length = length or os.fstat(fd).st_size
+            address = map_shared(fd, length)
+        except OSError as e:
+            log.warning(f"Prefetch: could not pin {path}: {e}")
+            return
+        finally:
+            os.close(fd)  # The mapping holds its own reference
+        self.pinned.append((address, length))
+        locked = libc.mlock(address, length) == 0
+        log.info(f"Prefetch: pinned {Path(path).name} ({length / 1024 / 1024:.1f} MB) "
+                 f"{'locked' if locked else 'NOT locked'}")
+
+    def pin_later(self, path, length=None):
+        """pin() on the prefetch thread, so a cold read never holds up the caller."""
+        self.requests.put(("pin", str(path), 0, length))
+
+    def unpin(self):
+        """Release everything pinned so far (the intro of content a reload replaced)."""
+        pinned, self.pinned = self.pinned, []
+        for address, length in pinned:
+            libc.munmap(address, length)
+
+    def prefetch(self, path, offset=0, length=0):
+        """Read a file region into the page cache in the background (length 0: to the end)."""
+        self.requests.put(("prefetch", str(path), offset, length))
+
+    def chapter_start(self, path, offset=0):
+        """
+        Call just before playback opens a chapter: records whether its opening
+        is already cached, then times reading it on the prefetch thread.
+        """
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            resident = resident_fraction(fd, offset, PROBE_BYTES)
+        except OSError:
+            resident = None
+        finally:
+            os.close(fd)
+        self.requests.put(("measure", str(path), offset, resident))
+
+    def hit_ratio(self):
+        """Share of chapter starts whose opening was fully cached."""
+        return CHAPTER_CACHE_HITS.value / CHAPTER_STARTS.value if CHAPTER_STARTS.value else 0.0
+
+    def run(self):
+        while True:
+            request = self.requests.get()
+            if request is None:
+                return
+            kind, path, offset, argument = request
+            if kind == "pin":
+                self.pin(path, argument)
+                continue
+            try:
+                fd = os.open(path, os.O_RDONLY)
+            except OSError:
+                continue
+            try:
+                if kind == "prefetch":
+                    os.posix_fadvise(fd, offset, argument, os.POSIX_FADV_WILLNEED)
+                else:
+                    self.measure(fd, path, offset, argument)
+            except OSError as e:
+                log.warning(f"Prefetch: {Path(path).name}: {e}")
+            finally:
+                os.close(fd)
+
+    def measure(self, fd, path, offset, resident):
+        started = time.perf_counter()
+        os.pread(fd, PROBE_BYTES, offset)
+        read_ms = (time.perf_counter() - started) * 1000
+        CHAPTER_STARTS.inc()
+        if resident == 1.0:
+            CHAPTER_CACHE_HITS.inc()
+        self.read_ms.append(read_ms)
+        cached = "?" if resident is None else f"{resident:.0%}"
+        log.info(f"Chapter read: {Path(path).name} {cached} cached, first "
+                 f"{PROBE_BYTES // 1024} KB in {read_ms:.2f} ms "
+                 f"(hit ratio {self.hit_ratio():.0%} of {CHAPTER_STARTS.value}, "
+                 f"worst read {max(self.read_ms):.2f} ms)")
+
+    def close(self):
+        self.requests.put(None)
+        self.thread.join()
+        self.unpin()
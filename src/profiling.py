@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Del Monte HelloHistory - On-Demand Profiling
+
+Lets a running player be profiled without stopping the service:
+
+    kill -USR1 <pid>   start / stop a sampling profiler
+    kill -USR2 <pid>   start / stop tracemalloc; stopping writes the top
+                       allocators and the growth since it was started
+
+Reports go to the logs directory (the only one the service may write):
+
+    profile-<time>.txt     hottest functions, self and inclusive, per thread
+    profile-<time>.folded  collapsed stacks for flamegraph.pl / speedscope
+    memory-<time>.txt      top allocators, and the diff against the start
+
+The signal handlers only queue the request (SimpleQueue.put is safe in a
+signal handler). Sampling, snapshots and report writing all happen on a
+separate thread, so the main loop is interrupted for microseconds and
+playback, which has its own threads, not at all. The sampler reads
+sys._current_frames() every SAMPLE_INTERVAL_S. That is plain Python and
+costs one short GIL hold per sample, and nothing when it is off.
+
+Capture one from a workstation with `make profile` (scripts/capture_profile.py).
+"""
+
+import os
+import sys
+import time
+import queue
+import signal
+import logging
+import threading
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+
+log = logging.getLogger("phone")
+
+SAMPLE_INTERVAL_S = 0.005
+MAX_DEPTH = 64  # Frames kept per sampled stack
+TOP_FUNCTIONS = 25
+TOP_ALLOCATORS = 25
+TRACEMALLOC_FRAMES = 8
+
+
+class Profiler:
+    """SIGUSR1: sampling profiler. SIGUSR2: tracemalloc snapshots."""
+
+    def __init__(self, out_dir):
+        self.out_dir = Path(out_dir)
+        self.requests = queue.SimpleQueue()
+        self.stacks = None  # Counter of (thread name, frames) while sampling
+        self.sampling_since = 0.0
+        self.baseline = None  # tracemalloc snapshot while tracing
+        self.thread = threading.Thread(target=self.run, name="profiler", daemon=True)
+
+    def install(self):
+        """Hook the signals (main thread only) and start the worker."""
+        self.thread.start()
+        signal.signal(signal.SIGUSR1, self.on_signal)
+        signal.signal(signal.SIGUSR2, self.on_signal)
+
+    def on_signal(self, signum, frame):
+        self.requests.put(signum)
+
+    def run(self):
+        while True:
+            try:
+                timeout = SAMPLE_INTERVAL_S if self.stacks is not None else None
+                signum = self.requests.get(timeout=timeout)
+            except queue.Empty:
+                self.sample()
+                continue
+            try:
+                if signum == signal.SIGUSR1:
+                    self.toggle_sampling()
+                else:
+                    self.toggle_tracemalloc()
+            except OSError as e:
+                log.warning(f"Profiler: could not write report: {e}")
+
+    # Sampling profiler -------------------------------------------------------
+
+    def toggle_sampling(self):
+        if self.stacks is None:
+            self.stacks = Counter()
+            self.sampling_since = time.monotonic()
+            log.info(f"Profiler: sampling every {SAMPLE_INTERVAL_S * 1000:.0f} ms")
+            return
+        stacks, self.stacks = self.stacks, None
+        path = self.write_profile(stacks, time.monotonic() - self.sampling_since)
+        log.info(f"Profiler: {sum(stacks.values())} samples written to {path}")
+
+    def sample(self):
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        me = threading.get_ident()
+        for ident, frame in sys._current_frames().items():
+            if ident == me:
+                continue
+            frames = []
+            while frame is not None and len(frames) < MAX_DEPTH:
+                code = frame.f_code
+                frames.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            self.stacks[(names.get(ident, str(ident)), tuple(reversed(frames)))] += 1
+
+    def write_profile(self, stacks, seconds):
+        stem = self.out_dir / f"profile-{time.strftime('%Y%m%d-%H%M%S')}"
+        with open(f"{stem}.folded", "w") as f:
+            for (thread, frames), count in stacks.most_common():
+                f.write(";".join((thread,) + frames) + f" {count}\n")
+
+        lines = [f"Sampled {seconds:.1f}s every {SAMPLE_INTERVAL_S * 1000:.0f} ms, "
+                 f"{sum(stacks.values())} samples, pid {os.getpid()}"]
+        for thread in sorted({thread for thread, _ in stacks}):
+            own = {frames: count for (name, frames), count in stacks.items() if name == thread and frames}
+            total = sum(own.values())
+            self_counts, inclusive = Counter(), Counter()
+            for frames, count in own.items():
+                self_counts[strip_line(frames[-1])] += count
+                for function in {strip_line(frame) for frame in frames}:
+                    inclusive[function] += count
+            lines.append(f"\n== Thread {thread}: {total} samples")
+            for title, counts in (("self", self_counts), ("inclusive", inclusive)):
+                lines.append(f"\n  {title:>9}  function")
+                for function, count in counts.most_common(TOP_FUNCTIONS):
+                    lines.append(f"  {count / total:>9.1%}  {function}")
+        Path(f"{stem}.txt").write_text("\n".join(lines) + "\n")
+        return f"{stem}.txt"
+
+    # tracemalloc -------------------------------------------------------------
+
+    def toggle_tracemalloc(self):
+        if self.baseline is None:
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+            self.baseline = tracemalloc.take_snapshot()
+            log.info("Profiler: tracemalloc started")
+            return
+        snapshot = tracemalloc.take_snapshot()
+        baseline, self.baseline = self.baseline, None
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        path = self.write_memory(snapshot, baseline, current, peak)
+        log.info(f"Profiler: allocation report written to {path}")
+
+    def write_memory(self, snapshot, baseline, current, peak):
+        # Leave out tracemalloc's own bookkeeping and this module's
+        ignore = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+        snapshot = snapshot.filter_traces(ignore)
+        baseline = baseline.filter_traces(ignore)
+        lines = [f"Traced {current / 1024:.0f} KB now, {peak / 1024:.0f} KB peak, pid {os.getpid()}",
+                 f"\n== Top {TOP_ALLOCATORS} allocators"]
+        for stat in snapshot.statistics("lineno")[:TOP_ALLOCATORS]:
+            lines.append(f"  {stat.size / 1024:>9.1f} KB {stat.count:>7}  {stat.traceback}")
+        lines.append("\n== Growth since tracemalloc started")
+        for stat in snapshot.compare_to(baseline, "lineno")[:TOP_ALLOCATORS]:
+            lines.append(f"  {stat.size_diff / 1024:>+9.1f} KB {stat.count_diff:>+7}  {stat.traceback}")
+        path = self.out_dir / f"memory-{time.strftime('%Y%m%d-%H%M%S')}.txt"
+        path.write_text("\n".join(lines) + "\n")
+        return path
+
+
+def strip_line(frame):
+    """'name (file.py:12)' -> 'name (file.py)', so one function is one row."""
+    return frame.rsplit(":", 1)[0] + ")"
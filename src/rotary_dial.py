@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Del Monte HelloHistory - Rotary Dial Decoder
+
+Decodes digits from the ITT 500's dial contacts:
+
+    pulse       - normally closed; opens once per count as the dial
+                  returns (10 pulses per second nominal, 60/40 break/make)
+    off-normal  - closed while the dial is away from its rest position
+
+Both contacts are wired to ground with the Pi's pull-ups, so a closed
+contact reads INACTIVE (low). Edges are captured as kernel-timestamped
+gpiod events on a dedicated thread; the digit is complete the moment
+the off-normal contact opens (dial back at rest). Without an off-normal
+wire, a digit ends after DIGIT_GAP_MS with no pulses.
+
+Worn mechanisms bounce and run fast or slow, so pulse breaks are
+debounced and any pulse spacing from 7 to 14 pps is accepted.
+
+Offline mode, for testing without hardware:
+    python3 src/rotary_dial.py --record trace.csv   # on the Pi
+    python3 src/rotary_dial.py --replay trace.csv   # anywhere
+
+Trace lines are "timestamp_ns,line,level" with line "pulse" or
+"off_normal" and level 1 (high/open) or 0 (low/closed).
+"""
+
+import os
+import sys
+import time
+import select
+import logging
+import threading
+
+log = logging.getLogger("phone")
+
+PULSE_LINE = 27  # GPIO for the pulse contact
+OFF_NORMAL_LINE = 22  # GPIO for the off-normal contact (None if not wired)
+PULSE_DEBOUNCE_MS = 12  # Bounce shorter than this is not a new pulse
+DIGIT_GAP_MS = 250  # No off-normal wire: silence that ends a digit
+MAX_PULSE_PERIOD_MS = 145  # Slower than ~7 pps means the dial stalled
+
+
+class PulseDecoder:
+    """
+    Turns (line, level, timestamp_ns) edges into dialled digits. Pure
+    state machine with no I/O, so live capture and replayed traces share it.
+    """
+
+    def __init__(self, use_off_normal=True):
+        self.use_off_normal = use_off_normal
+        self.off_normal = False
+        self.pulse_open = False
+        self.count = 0
+        self.last_pulse_ns = None
+        self.last_close_ns = None
+        self.rejected = False
+
+    def feed(self, line, level, timestamp_ns):
+        """Process one edge. Returns (digit, timestamp_ns) when a digit completes."""
+        if line == "off_normal":
+            off_normal = level == 0
+            if off_normal and not self.off_normal:
+                self.reset()
+            self.off_normal = off_normal
+            if not off_normal:
+                return self.finish(timestamp_ns)
+            return None
+
+        opened = level == 1
+        if not opened:
+            if self.pulse_open:
+                self.last_close_ns = timestamp_ns
+            self.pulse_open = False
+            return None
+        if self.pulse_open:
+            return None
+
+        self.pulse_open = True
+        if (self.last_close_ns is not None
+                and timestamp_ns - self.last_close_ns < PULSE_DEBOUNCE_MS * 1_000_000):
+            return None  # Contact bounce: closed too briefly to be a make
+        if self.last_pulse_ns is not None:
+            gap_ms = (timestamp_ns - self.last_pulse_ns) / 1e6
+            if gap_ms > MAX_PULSE_PERIOD_MS and self.use_off_normal:
+                self.rejected = True  # Dial dragged or jammed mid-return
+        self.count += 1
+        self.last_pulse_ns = timestamp_ns
+        return None
+
+    def timeout(self, now_ns):
+        """Seconds until a pending digit times out (no off-normal wire)."""
+        if self.use_off_normal or self.last_pulse_ns is None:
+            return None
+        deadline = self.last_pulse_ns + DIGIT_GAP_MS * 1_000_000
+        return max(0.0, (deadline - now_ns) / 1e9)
+
+    def poll(self, now_ns):
+        """Complete a digit by timeout when there is no off-normal wire."""
+        if self.use_off_normal or self.last_pulse_ns is None:
+            return None
+        if now_ns - self.last_pulse_ns >= DIGIT_GAP_MS * 1_000_000:
+            return self.finish(now_ns)
+        return None
+
+    def finish(self, timestamp_ns):
+        count, rejected = self.count, self.rejected
+        self.reset()
+        if count == 0 or count > 10 or rejected:
+            if count:
+                log.info(f"Dial: ignored {count} pulses (irregular or out of range)")
+            return None
+        return (0 if count == 10 else count), timestamp_ns
+
+    def reset(self):
+        self.count = 0
+        self.last_pulse_ns = None
+        self.last_close_ns = None
+        self.rejected = False
+
+
+def replay(edges, use_off_normal=True):
+    """Decode a recorded trace: iterable of (timestamp_ns, line, level)."""
+    decoder = PulseDecoder(use_off_normal)
+    digits = []
+    for timestamp_ns, line, level in edges:
+        for digit in (decoder.poll(timestamp_ns), decoder.feed(line, level, timestamp_ns)):
+            if digit:
+                digits.append(digit)
+    if not use_off_normal and decoder.last_pulse_ns is not None:
+        digit = decoder.poll(decoder.last_pulse_ns + DIGIT_GAP_MS * 1_000_000)
+        if digit:
+            digits.append(digit)
+    return digits
+
+
+def read_trace(path):
+    edges = []
+    with open(path) as f:
+        for row in f:
+            row = row.strip()
+            if not row or row.startswith("#"):
+                continue
+            timestamp_ns, line, level = row.split(",")
+            edges.append((int(timestamp_ns), line, int(level)))
+    return edges
+
+
+class DialReader:
+    """
+    Watches the dial lines on its own thread and calls on_digit(digit,
+    rest_timestamp_ns) from that thread for every digit dialled.
+    """
+
+    def __init__(self, chip, on_digit):
+        import gpiod
+        from gpiod.line import Direction, Bias, Edge
+
+        self.on_digit = on_digit
+        self.lines = {PULSE_LINE: "pulse"}
+        if OFF_NORMAL_LINE is not None:
+            self.lines[OFF_NORMAL_LINE] = "off_normal"
+        settings = gpiod.LineSettings(
+            direction=Direction.INPUT, bias=Bias.PULL_UP, edge_detection=Edge.BOTH,
+        )
+        self.request = chip.request_lines(
+            consumer="phone_dial",
+            config={tuple(self.lines): settings},
+        )
+        self.rising = gpiod.EdgeEvent.Type.RISING_EDGE
+        self.decoder = PulseDecoder(use_off_normal=OFF_NORMAL_LINE is not None)
+        self.stop_r, self.stop_w = os.pipe()
+        self.thread = threading.Thread(target=self.run, name="dial", daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def events(self):
+        """Yield (timestamp_ns, line, level) for pending edge events."""
+        for event in self.request.read_edge_events():
+            level = 1 if event.event_type == self.rising else 0
+            yield event.timestamp_ns, self.lines[event.line_offset], level
+
+    def run(self):
+        while True:
+            timeout = self.decoder.timeout(time.monotonic_ns())
+            ready, _, _ = select.select([self.request.fd, self.stop_r], [], [], timeout)
+            if self.stop_r in ready:
+                return
+            try:
+                digit = self.decoder.poll(time.monotonic_ns())
+                if digit:
+                    self.on_digit(*digit)
+                if self.request.fd in ready:
+                    for edge in self.events():
+                        digit = self.decoder.feed(edge[1], edge[2], edge[0])
+                        if digit:
+                            self.on_digit(*digit)
+            except Exception as e:
+                log.error(f"Dial error: {e}")
+
+    def stop(self):
+        os.write(self.stop_w, b"!")
+        if self.thread.is_alive():
+            self.thread.join(timeout=1)
+        self.request.release()
+
+
+def record(path, seconds):
+    """Capture raw dial edges from the Pi's GPIO to a trace file."""
+    import gpiod
+
+    reader = DialReader(gpiod.Chip("/dev/gpiochip0"), lambda *digit: None)
+    deadline = time.monotonic() + seconds
+    count = 0
+    with open(path, "w") as f:
+        f.write("# timestamp_ns,line,level\n")
+        while time.monotonic() < deadline:
+            if reader.request.wait_edge_events(deadline - time.monotonic()):
+                for timestamp_ns, line, level in reader.events():
+                    f.write(f"{timestamp_ns},{line},{level}\n")
+                    count += 1
+    reader.request.release()
+    print(f"Recorded {count} edges to {path}")
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Rotary dial decoder tools")
+    parser.add_argument("--replay", type=str, help="Decode a recorded edge trace")
+    parser.add_argument("--record", type=str, help="Record dial edges to a trace file")
+    parser.add_argument("--seconds", type=float, default=30,
+                        help="How long to record (default: 30)")
+    parser.add_argument("--no-off-normal", action="store_true",
+                        help="Decode by pulse timing only, ignoring off-normal edges")
+    args = parser.parse_args()
+
+    if args.record:
+        record(args.record, args.seconds)
+    elif args.replay:
+        edges = read_trace(args.replay)
+        if args.no_off_normal:
+            edges = [edge for edge in edges if edge[1] == "pulse"]
+        start_ns = edges[0][0] if edges else 0
+        for digit, timestamp_ns in replay(edges, use_off_normal=not args.no_off_normal):
+            print(f"{(timestamp_ns - start_ns) / 1e9:8.3f}s  digit {digit}")
+    else:
+        parser.print_help()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""
+Del Monte HelloHistory - systemd Notification
+
+Minimal sd_notify(3): sends state strings such as "READY=1" to the socket
+systemd passes in $NOTIFY_SOCKET, so a Type=notify unit is only marked
+started once the player can actually answer a pickup. No-op when not
+run under systemd.
+"""
+
+import os
+import socket
+
+
+def notify(state):
+    """Send a state string to systemd. Returns False if there is no socket."""
+    address = os.environ.get("NOTIFY_SOCKET")
+    if not address:
+        return False
+    if address.startswith("@"):
+        address = "\0" + address[1:]  # Abstract namespace
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sock:
+            sock.connect(address)
+            sock.sendall(state.encode())
+        return True
+    except OSError:
+        return False
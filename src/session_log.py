@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Del Monte HelloHistory - Session Log
+
+One fixed-size binary record per call (pickup to hang-up), appended to a
+ring file in the logs directory that never grows past its capacity: the
+oldest calls are overwritten once it is full. At 40 bytes a record, the
+default 8 MB holds about 200,000 calls.
+
+    header   64 bytes: magic, format, record size, capacity, records
+             ever written (the next slot is written % capacity)
+    records  RECORD_FIELDS, little-endian:
+             started     uint32   pickup, Unix seconds
+             reached     uint16   bitmask of chapters that played
+             furthest    uint8    highest chapter that played
+             end         uint8    END_* - how the call ended
+             flags       uint8    FLAG_* - resumed, device fault
+             dial_count  uint8    digits dialled (may exceed MAX_DIALS)
+             dials       uint8[MAX_DIALS]     first digits dialled (0xFF unused)
+             listened    uint16[MAX_CHAPTERS] seconds heard of each chapter
+
+A record is written with one pwrite() when the call ends, then the
+header's count; a crash in between loses that call, nothing else. The
+player doesn't write it itself: it logs the packed record with the
+"Call ended" line, and SessionLogHandler writes it from the log writer
+thread (log_pipeline.py), so a slow SD card never holds up a hang-up.
+scripts/sessions.py maps the file with numpy for the reports.
+"""
+
+import os
+import sys
+import time
+import struct
+import logging
+
+MAGIC = b"HHSL"
+FORMAT = 1
+HEADER = struct.Struct("<4sHHIQ")
+HEADER_BYTES = 64
+MAX_CHAPTERS = 10  # Dial digits 0-9
+MAX_DIALS = 8
+
+END_HANGUP = 1  # Hung up part way through
+END_COMPLETE = 2  # Heard the playlist to the end, then hung up
+END_SHUTDOWN = 3  # Service stopped with the handset off the hook
+END_NAMES = {END_HANGUP: "hang-up", END_COMPLETE: "complete", END_SHUTDOWN: "shutdown"}
+
+FLAG_RESUMED = 1  # Picked up where the last call left off
+FLAG_FAULT = 2  # The audio device dropped out during the call
+
+# (name, struct code, count); the numpy dtype in scripts/sessions.py follows this
+RECORD_FIELDS = [
+    ("started", "I", 1),
+    ("reached", "H", 1),
+    ("furthest", "B", 1),
+    ("end", "B", 1),
+    ("flags", "B", 1),
+    ("dial_count", "B", 1),
+    ("dials", "B", MAX_DIALS),
+    ("listened", "H", MAX_CHAPTERS),
+    ("pad", "x", 2),
+]
+RECORD = struct.Struct("<" + "".join(f"{count}{code}" for _, code, count in RECORD_FIELDS))
+
+
+class Session:
+    """One call in progress."""
+
+    def __init__(self, started=None, resumed=False):
+        self.started = time.time() if started is None else started
+        self.reached = 0
+        self.furthest = 0
+        self.flags = FLAG_RESUMED if resumed else 0
+        self.complete = False
+        self.dials = []
+        self.dial_count = 0
+        self.listened = [0.0] * MAX_CHAPTERS
+
+    def reach(self, chapter):
+        self.reached |= 1 << chapter
+        self.furthest = max(self.furthest, chapter)
+
+    def listen(self, chapter, seconds):
+        self.listened[chapter] += seconds
+
+    def dial(self, digit):
+        self.dial_count += 1
+        if len(self.dials) < MAX_DIALS:
+            self.dials.append(digit)
+
+    def pack(self, end):
+        dials = self.dials + [0xFF] * (MAX_DIALS - len(self.dials))
+        listened = [min(round(seconds), 0xFFFF) for seconds in self.listened]
+        return RECORD.pack(int(self.started), self.reached, self.furthest, end, self.flags,
+                           min(self.dial_count, 0xFF), *dials, *listened)
+
+
+class SessionLog:
+    """The ring file, held open for appends."""
+
+    def __init__(self, path, capacity_mb=8):
+        self.path = path
+        capacity = int(capacity_mb * 1024 * 1024) // RECORD.size
+        if capacity < 1:
+            raise ValueError(f"{capacity_mb} MB holds no session records")
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            self.capacity, self.written = read_header(os.pread(self.fd, HEADER_BYTES, 0))
+        except ValueError:
+            # New, or from another format: start over (the old file is kept aside)
+            if os.fstat(self.fd).st_size:
+                os.replace(path, f"{path}.old")
+                os.close(self.fd)
+                self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+            self.capacity, self.written = capacity, 0
+            self.write_header()
+
+    def write_header(self):
+        header = HEADER.pack(MAGIC, FORMAT, RECORD.size, self.capacity, self.written)
+        os.pwrite(self.fd, header.ljust(HEADER_BYTES, b"\0"), 0)
+
+    def append(self, record):
+        """Write one packed record (Session.pack) over the oldest slot once full."""
+        slot = self.written % self.capacity
+        os.pwrite(self.fd, record, HEADER_BYTES + slot * RECORD.size)
+        self.written += 1
+        self.write_header()
+
+    def close(self):
+        os.close(self.fd)
+
+
+class SessionLogHandler(logging.Handler):
+    """Appends the records carried by log records (extra={"session_record": ...})."""
+
+    def __init__(self, session_log):
+        super().__init__()
+        self.session_log = session_log
+
+    def emit(self, record):
+        data = getattr(record, "session_record", None)
+        if data is None:
+            return
+        try:
+            self.session_log.append(data)
+        except OSError as e:
+            sys.stderr.write(f"Session log write failed: {e}\n")
+
+    def close(self):
+        self.session_log.close()
+        super().close()
+
+
+def read_header(data):
+    """(capacity, records ever written) from a file's first HEADER_BYTES."""
+    if len(data) < HEADER.size:
+        raise ValueError("no session log header")
+    magic, fmt, record_size, capacity, written = HEADER.unpack_from(data)
+    if magic != MAGIC or fmt != FORMAT or record_size != RECORD.size or not capacity:
+        raise ValueError("not a session log in this format")
+    return capacity, written
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Del Monte HelloHistory - Gapless Story Stream
+
+All chapters concatenated frame by frame into one MP3 (no re-encode), so
+the decoder never stops between chapters. A small JSON seek table next to
+it records where each chapter starts, in bytes, MPEG frames and samples;
+chapter N in the table is TRACKS[N], the same numbering the dial and
+BenchPlayer.jump_to_chapter use.
+
+Build with:
+    python3 scripts/build_story_stream.py
+"""
+
+import os
+import json
+from pathlib import Path
+
+from mp3_frames import iter_frames
+
+INDEX_FORMAT = 1
+
+
+class StoryIndex:
+    """Chapter seek table for the story stream."""
+
+    def __init__(self, data, audio_dir):
+        self.path = Path(audio_dir) / data["file"]
+        self.sample_rate = data["sample_rate"]
+        self.chapters = data["chapters"]
+        self.total_samples = data["total_samples"]
+
+    def __len__(self):
+        return len(self.chapters)
+
+    def start_seconds(self, chapter):
+        return self.chapters[chapter]["sample"] / self.sample_rate
+
+    def end_seconds(self, chapter):
+        if chapter + 1 < len(self.chapters):
+            return self.start_seconds(chapter + 1)
+        return self.total_samples / self.sample_rate
+
+    def byte_range(self, chapter):
+        """(first byte, end byte) of a chapter in the stream; None as the end of the last."""
+        end = self.chapters[chapter + 1]["byte"] if chapter + 1 < len(self.chapters) else None
+        return self.chapters[chapter]["byte"], end
+
+    def chapter_at(self, seconds):
+        """Chapter number playing at a position in the stream."""
+        sample = seconds * self.sample_rate
+        current = 0
+        for number, chapter in enumerate(self.chapters):
+            if chapter["sample"] <= sample:
+                current = number
+        return current
+
+
+def load_story(audio_dir, tracks, index_name):
+    """
+    Load the seek table if it exists and still matches the track list and
+    the chapter files it was built from. Returns None otherwise.
+    """
+    index_path = Path(audio_dir) / index_name
+    try:
+        data = json.loads(index_path.read_text())
+    except (OSError, ValueError):
+        return None
+
+    if data.get("format") != INDEX_FORMAT:
+        return None
+    if [chapter["track"] for chapter in data["chapters"]] != list(tracks):
+        return None
+    for chapter in data["chapters"]:
+        source = Path(audio_dir) / chapter["track"]
+        try:
+            if int(source.stat().st_mtime) > data["built"]:
+                return None  # A chapter was replaced after the build
+        except OSError:
+            return None
+    if not (Path(audio_dir) / data["file"]).exists():
+        return None
+    return StoryIndex(data, audio_dir)
+
+
+def build_story(audio_dir, tracks, story_name, index_name):
+    """
+    Concatenate the audio frames of every track into story_name and write
+    the seek table to index_name. All tracks must share a sample rate and
+    channel count. Returns the index data.
+    """
+    audio_dir = Path(audio_dir)
+    story_path = audio_dir / story_name
+    tmp_path = story_path.with_suffix(".tmp")
+
+    chapters = []
+    byte = frame_count = sample = 0
+    sample_rate = channels = None
+
+    with open(tmp_path, "wb") as out:
+        for track in tracks:
+            data = (audio_dir / track).read_bytes()
+            chapters.append({
+                "track": track, "byte": byte, "frame": frame_count, "sample": sample,
+            })
+            for frame in iter_frames(data):
+                if sample_rate is None:
+                    sample_rate, channels = frame.sample_rate, frame.channels
+                elif (frame.sample_rate, frame.channels) != (sample_rate, channels):
+                    out.close()
+                    tmp_path.unlink()
+                    raise ValueError(
+                        f"{track}: {frame.sample_rate} Hz/{frame.channels} ch does not "
+                        f"match {sample_rate} Hz/{channels} ch; re-encode it first"
+                    )
+                out.write(data[frame.offset:frame.offset + frame.size])
+                byte += frame.size
+                frame_count += 1
+                sample += frame.samples
+
+    os.replace(tmp_path, story_path)
+
+    index = {
+        "format": INDEX_FORMAT,
+        "file": story_name,
+        "built": int(story_path.stat().st_mtime),
+        "sample_rate": sample_rate,
+        "channels": channels,
+        "total_bytes": byte,
+        "total_frames": frame_count,
+        "total_samples": sample,
+        "chapters": chapters,
+    }
+    index_path = audio_dir / index_name
+    tmp_index = index_path.with_suffix(".tmp")
+    tmp_index.write_text(json.dumps(index, indent=1) + "\n")
+    os.replace(tmp_index, index_path)
+    return index
@@ -0,0 +1,70 @@
+"""
+Del Monte HelloHistory - Track List
+
+Playback order shared by the production player and the build scripts.
+The index of a track is its chapter number on the dial (0 = intro).
+
+The player can take the order and gains from tracks.json in the audio
+directory instead, so chapters can be added or reordered with the audio
+and picked up without a restart (content.py):
+
+    {"tracks": ["00_intro.mp3", ...], "gains": {"01_welcome.mp3": -1.5}}
+"""
+
+import json
+from pathlib import Path
+
+TRACKS = [
+    "00_intro.mp3",
+    "01_welcome.mp3",
+    "02_marys_story.mp3",
+    "03_building.mp3",
+    "04_design.mp3",
+    "05_other_work.mp3",
+    "06_closing.mp3",
+    "07_song.mp3",
+]
+
+# Playback gain per chapter in dB, applied at the mixer when the chapter
+# starts. Written by the offline loudness scan (make audio-gains), which
+# levels every chapter to the median loudness of the set.
+TRACK_GAIN_DB = {
+    "00_intro.mp3": 0.0,
+    "01_welcome.mp3": 0.0,
+    "02_marys_story.mp3": 0.0,
+    "03_building.mp3": 0.0,
+    "04_design.mp3": 0.0,
+    "05_other_work.mp3": 0.0,
+    "06_closing.mp3": 0.0,
+    "07_song.mp3": 0.0,
+}
+
+# Gapless single-stream build of TRACKS (scripts/build_story_stream.py)
+STORY_FILE = "story.mp3"
+STORY_INDEX = "story.json"
+
+# Optional override of TRACKS and TRACK_GAIN_DB, next to the audio
+TRACK_MANIFEST = "tracks.json"
+MAX_TRACKS = 10  # One per digit on the dial
+
+
+def load_track_table(audio_dir):
+    """
+    (tracks, gains) from the audio directory's track manifest, or TRACKS
+    and TRACK_GAIN_DB if it has none. Raises ValueError for a manifest
+    that is there but unusable.
+    """
+    try:
+        data = json.loads((Path(audio_dir) / TRACK_MANIFEST).read_text())
+    except FileNotFoundError:
+        return list(TRACKS), dict(TRACK_GAIN_DB)
+    except (OSError, ValueError) as e:
+        raise ValueError(f"{TRACK_MANIFEST}: {e}")
+    tracks = data.get("tracks") if isinstance(data, dict) else None
+    if (not isinstance(tracks, list) or not 0 < len(tracks) <= MAX_TRACKS
+            or not all(isinstance(track, str) and track for track in tracks)):
+        raise ValueError(f"{TRACK_MANIFEST}: \"tracks\" must list 1 to {MAX_TRACKS} file names")
+    gains = data.get("gains", {})
+    if not isinstance(gains, dict) or not all(isinstance(db, (int, float)) for db in gains.values()):
+        raise ValueError(f"{TRACK_MANIFEST}: \"gains\" must map file names to dB")
+    return tracks, {track: float(gains.get(track, TRACK_GAIN_DB.get(track, 0.0))) for track in tracks}